@@ -7,6 +7,57 @@ class InvestigatorApp {
         this.timelines = {};
         this.foiaRequests = [];
         this.chainOfCustody = {};
+        this.dataRoot = 'data';
+        this.caseDetails = {};
+        this.searchShards = {};
+    }
+
+    async fetchJSON(path) {
+        const response = await fetch(`${this.dataRoot}/${path}`);
+        if (!response.ok) {
+            throw new Error(`Failed to load ${path}: ${response.status}`);
+        }
+        return response.json();
+    }
+
+    // Data comes from the bundle built by site_bundle.py; each view
+    // fetches only the shards it needs and keeps them for reuse.
+    async loadCaseIndex() {
+        this.cases = await this.fetchJSON('index.json');
+        return this.cases;
+    }
+
+    async loadCase(caseId) {
+        if (!this.caseDetails[caseId]) {
+            this.caseDetails[caseId] = await this.fetchJSON(`cases/${encodeURIComponent(caseId)}.json`);
+        }
+        return this.caseDetails[caseId];
+    }
+
+    async searchCases(query) {
+        const terms = (query.toLowerCase().match(/\w+/g) || []);
+        let matches = null;
+        for (const term of terms) {
+            const key = term.slice(0, 2);
+            if (!(key in this.searchShards)) {
+                try {
+                    this.searchShards[key] = await this.fetchJSON(`search/${encodeURIComponent(key)}.json`);
+                } catch (e) {
+                    this.searchShards[key] = {};
+                }
+            }
+            const postings = this.searchShards[key][term] || {};
+            const scores = {};
+            for (const [caseId, count] of Object.entries(postings)) {
+                if (matches === null || caseId in matches) {
+                    scores[caseId] = (matches ? matches[caseId] : 0) + count;
+                }
+            }
+            matches = scores;
+        }
+        return Object.entries(matches || {})
+            .sort((a, b) => b[1] - a[1])
+            .map(([caseId, score]) => ({ caseId, score }));
     }
 
     addCase(caseDetails) {
@@ -21,8 +72,26 @@ class InvestigatorApp {
         return this.authoritySources;
     }
 
-    generateLinkGraph(caseId) {
-        // Implement graph generation logic here
+    async generateLinkGraph(caseId, container = document.getElementById('graph')) {
+        // Layout is precomputed by link_graph.py; the browser only draws it
+        if (!this.linkGraphs[caseId]) {
+            this.linkGraphs[caseId] = await this.fetchJSON(`graphs/${encodeURIComponent(caseId)}.json`);
+        }
+        const graph = this.linkGraphs[caseId];
+        if (container && typeof vis !== 'undefined') {
+            const nodes = graph.nodes.map(n => ({
+                id: n.id, label: n.label, title: n.type,
+                x: n.x, y: n.y, group: n.cluster, value: n.degree
+            }));
+            const edges = [];
+            for (const [source, targets] of Object.entries(graph.adjacency)) {
+                for (const target of targets) {
+                    if (source < target) edges.push({ from: source, to: target });
+                }
+            }
+            new vis.Network(container, { nodes, edges }, { physics: false });
+        }
+        return graph;
     }
 
     visualizeTimeline(caseId) {
@@ -33,7 +102,23 @@ class InvestigatorApp {
         this.foiaRequests.push(requestDetails);
     }
 
+    // Records come from custody_ledger.py via the bundle's custody/<id>.json;
+    // entries logged in the browser are kept after them, unchained, until
+    // they are recorded server side.
+    async loadChainOfCustody(caseId) {
+        if (!this.chainOfCustody[caseId]) {
+            const custody = await this.fetchJSON(`custody/${encodeURIComponent(caseId)}.json`);
+            this.chainOfCustody[caseId] = { seq: custody.seq, head: custody.head, records: custody.records };
+        }
+        return this.chainOfCustody[caseId];
+    }
+
     logChainOfCustody(caseId, custodyDetails) {
-        this.chainOfCustody[caseId] = custodyDetails;
+        if (!this.chainOfCustody[caseId]) {
+            this.chainOfCustody[caseId] = { seq: 0, head: null, records: [] };
+        }
+        const record = { ...custodyDetails, timestamp: new Date().toISOString(), pending: true };
+        this.chainOfCustody[caseId].records.push(record);
+        return record;
     }
 }
\ No newline at end of file
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+PERFORMANCE BENCHMARKS FOR INVESTIGATOR-DESK
+
+Times the desk, report generation, bulk linking, the Lexis Nexis text
+parser and the legal search bot on synthetic data of configurable size,
+writes the results as JSON and compares them against a stored baseline
+so scaling regressions fail the run.
+
+Usage:
+    python benchmarks.py --scale medium --output bench.json
+    python benchmarks.py --scale medium --save-baseline benchmark_baseline.json
+    python benchmarks.py --scale medium --baseline benchmark_baseline.json
+
+Exit status is 1 when any benchmark is slower than its baseline by more
+than the tolerance (default 25%). The imports group times each
+entry-point module with -X importtime, and each script's start up to
+its main function, and fails if either loads a heavy module (asyncio,
+subprocess, requests, prover9 or the profilers) that should be
+deferred.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import List, Dict, Optional, Callable
+
+from investigator import InvestigatorDesk, Investigation, AuthoritySource
+
+
+# Scale name -> generator parameters
+SCALES = {
+    'tiny': {'cases': 3, 'sources': 20, 'evidence': 3, 'connections': 2,
+             'text_bytes': 20_000, 'bot_queries': 5, 'repeat': 1},
+    'small': {'cases': 20, 'sources': 100, 'evidence': 5, 'connections': 3,
+              'text_bytes': 500_000, 'bot_queries': 20, 'repeat': 3},
+    'medium': {'cases': 100, 'sources': 500, 'evidence': 10, 'connections': 5,
+               'text_bytes': 2_000_000, 'bot_queries': 50, 'repeat': 3},
+    'large': {'cases': 500, 'sources': 2000, 'evidence': 10, 'connections': 8,
+              'text_bytes': 8_000_000, 'bot_queries': 100, 'repeat': 3},
+}
+
+AUTHORITY_TYPES = ["Executive", "Governance", "Judicial", "Agency", "Business", "Individual"]
+EVIDENCE_TYPES = ["Court Record", "Address", "Phone Number", "Legal Document", "Financial Policy"]
+STREETS = ["Main Street", "Oak Avenue", "Pine Road", "Elm Drive", "Cedar Lane", "Park Boulevard"]
+NAMES = ["Jane Doe", "Michael Smith", "Maria Garcia", "Wei Chen", "Aisha Khan", "Tom Brown"]
+
+
+def make_investigation(investigation_id: str, n_sources: int, evidence_per_source: int,
+                       connections_per_source: int, seed: int = 0) -> Investigation:
+    """
+    Build a synthetic investigation.
+
+    Args:
+        investigation_id: ID of the investigation
+        n_sources: Number of authority sources
+        evidence_per_source: Evidence entries per source
+        connections_per_source: Random connections made from each source
+        seed: Random seed, so equal arguments give equal investigations
+
+    Returns:
+        The populated Investigation
+    """
+    rng = random.Random(seed)
+    inv = Investigation(investigation_id, f"Synthetic case {investigation_id}",
+                        "Generated for benchmarking")
+    ids = [f"AUTH-{i:06d}" for i in range(n_sources)]
+    for i, source_id in enumerate(ids):
+        inv.add_authority_source(AuthoritySource(
+            source_id, f"{rng.choice(NAMES)} {i}", "Synthetic authority source",
+            rng.choice(AUTHORITY_TYPES)))
+        inv.add_evidence_batch(source_id, [
+            {'type': rng.choice(EVIDENCE_TYPES),
+             'description': f"{rng.randint(1, 9999)} {rng.choice(STREETS)}, Phoenix, AZ 85001",
+             'source': f"Synthetic record {i}-{k}"}
+            for k in range(evidence_per_source)
+        ])
+    if n_sources > 1:
+        for source_id in ids:
+            inv.add_connections(source_id, rng.sample(ids, min(connections_per_source, n_sources)))
+    for k in range(max(1, n_sources // 50)):
+        inv.add_note(f"Synthetic note {k}")
+    return inv
+
+
+def make_lexis_text(size_bytes: int, seed: int = 0) -> str:
+    """Build Lexis Nexis style report text of roughly size_bytes."""
+    rng = random.Random(seed)
+    blocks = []
+    size = 0
+    n = 0
+    while size < size_bytes:
+        block = (
+            f"Subject: {rng.choice(NAMES)}\n\n"
+            f"Addresses:\n{rng.randint(1, 9999)} {rng.choice(STREETS)}, Phoenix, AZ 850{rng.randint(10, 99)}\n\n"
+            f"Phone Numbers:\n({rng.randint(200, 999)}) 555-{rng.randint(1000, 9999)}\n\n"
+            f"Known Associates:\n{rng.choice(NAMES)}\n{rng.choice(NAMES)}\n\n"
+            f"Court Records:\nCase Number: CV{2000 + n % 25}-{n:06d}\n"
+            f"{'Judgment entered.' if n % 7 == 0 else ''}\n\n"
+        )
+        blocks.append(block)
+        size += len(block)
+        n += 1
+    return "".join(blocks)
+
+
+def measure(func: Callable, repeat: int = 3, setup: Optional[Callable] = None) -> Dict:
+    """
+    Time func() repeat times; setup(), if given, runs untimed before each call.
+
+    Returns median and best wall time in seconds.
+    """
+    timings = []
+    for _ in range(max(1, repeat)):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return {'seconds': round(statistics.median(timings), 6), 'best': round(min(timings), 6),
+            'runs': len(timings)}
+
+
+class _StubCourtListener(BaseHTTPRequestHandler):
+    """Answers every GET with a fixed CourtListener-shaped search response."""
+
+    body = json.dumps({'results': [
+        {'caseName': f"Doe v. State {i}", 'court': "Supreme Court", 'dateFiled': "2020-01-01",
+         'citation': [f"{i} U.S. {i}"], 'snippet': "authority " * 20,
+         'absolute_url': f"/opinion/{i}/", 'docketNumber': f"{i}-100", 'status': "Published"}
+        for i in range(20)
+    ]}).encode()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def bench_desk(params: Dict, work_dir: str) -> Dict[str, Dict]:
+    """Desk save, cold load, report generation and bulk linking."""
+    repeat = params['repeat']
+    cases = [make_investigation(f"BENCH-{i:05d}", params['sources'], params['evidence'],
+                                params['connections'], seed=i)
+             for i in range(params['cases'])]
+    data_dir = os.path.join(work_dir, "desk")
+    desk = InvestigatorDesk(data_dir=data_dir)
+
+    def save_all():
+        for inv in cases:
+            desk.save_investigation(inv)
+
+    results = {'desk_save': measure(save_all, repeat)}
+    results['desk_load'] = measure(lambda: InvestigatorDesk(data_dir=data_dir), repeat)
+    desk.investigations = {inv.investigation_id: inv for inv in cases}
+    results['generate_report'] = measure(lambda: desk.generate_report(cases[0].investigation_id), repeat)
+
+    n = params['sources']
+    pairs = [(f"AUTH-{i:06d}", f"AUTH-{(i * 7 + k) % n:06d}")
+             for i in range(n) for k in range(1, params['connections'] + 1)]
+
+    def fresh():
+        inv = Investigation("BENCH-LINK", "Linking", "Bulk linking benchmark")
+        for i in range(n):
+            inv.add_authority_source(AuthoritySource(f"AUTH-{i:06d}", str(i), "", "Type"))
+        return inv
+
+    def link(inv):
+        for a, b in pairs:
+            inv.add_connection(a, b)
+
+    results['add_connection_bulk'] = measure(link, repeat, setup=fresh)
+    size_bytes = sum(os.path.getsize(desk._get_investigation_file(inv.investigation_id))
+                     for inv in cases)
+    for name in ('desk_save', 'desk_load'):
+        results[name]['bytes'] = size_bytes
+    results['add_connection_bulk']['pairs'] = len(pairs)
+    return results
+
+
+def bench_parser(params: Dict, work_dir: str) -> Dict[str, Dict]:
+    """LexisNexisParser._parse_text_content on multi-megabyte text."""
+    from lexis_nexis_parser import LexisNexisParser
+
+    text = make_lexis_text(params['text_bytes'])
+    parser = LexisNexisParser()
+    result = measure(lambda: parser._parse_text_content(text), params['repeat'])
+    result['bytes'] = len(text)
+    return {'parse_text_content': result}
+
+
+def bench_bot(params: Dict, work_dir: str) -> Dict[str, Dict]:
+    """LegalSearchBot searches against a local stub CourtListener server."""
+    try:
+        import requests  # noqa: F401  (the bot imports it lazily)
+    except ImportError as e:
+        return {'bot_search': {'skipped': str(e)}}
+    from lexis_search_bot import LegalSearchBot
+
+    server = HTTPServer(('127.0.0.1', 0), _StubCourtListener)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        bot = LegalSearchBot(rate_limit=0)
+        bot.COURTLISTENER_API = f"http://127.0.0.1:{server.server_port}/api/rest/v3"
+
+        def search():
+            for k in range(params['bot_queries']):
+                bot.search_courtlistener_cases(f"authority {k}", limit=20)
+
+        result = measure(search, params['repeat'])
+        result['queries'] = params['bot_queries']
+        return {'bot_search': result}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# Modules whose import time is tracked, and heavy modules they must not load
+IMPORT_MODULES = ['investigator', 'lexis_nexis_parser', 'lexis_search_bot']
+DEFERRED_MODULES = ['asyncio', 'subprocess', 'requests', 'prover9',
+                    'cProfile', 'pstats', 'tracemalloc']
+
+
+def measure_import(module: str) -> Dict:
+    """
+    Import a module in a fresh interpreter under -X importtime.
+
+    Returns its cumulative import time in seconds and which of
+    DEFERRED_MODULES the import pulled in.
+    """
+    code = (f"import sys, json; import {module}; "
+            f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed: {proc.stderr.strip()[-500:]}")
+    cumulative_us = 0
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1])
+    return {'seconds': cumulative_us / 1e6, 'loaded': json.loads(proc.stdout.strip().splitlines()[-1])}
+
+
+def measure_script_start(module: str) -> Dict:
+    """
+    Start <module>.py as __main__ in a fresh interpreter, stopping before main.
+
+    The script runs exactly as from the command line, including its
+    __main__ block, except that profiling.run_entry_point returns without
+    calling main. Returns the wall time of the whole process in seconds,
+    interpreter start included, and which of DEFERRED_MODULES it loaded.
+    """
+    script = f"{module}.py"
+    code = ("import sys, json, runpy, profiling\n"
+            "profiling.run_entry_point = lambda main, default_prefix=None: 0\n"
+            f"sys.argv = [{script!r}]\n"
+            "try:\n"
+            f"    runpy.run_path({script!r}, run_name='__main__')\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"Starting {script} failed: {proc.stderr.strip()[-500:]}")
+    return {'seconds': elapsed, 'loaded': json.loads(proc.stdout.strip().splitlines()[-1])}
+
+
+def bench_imports(params: Dict, work_dir: str) -> Dict[str, Dict]:
+    """
+    Cold import time (python -X importtime) and script start time of each
+    entry point. Raises RuntimeError if any of them loads a deferred module.
+    """
+    results = {}
+    for module in IMPORT_MODULES:
+        for name, measure_one in ((f"import_{module}", measure_import),
+                                  (f"start_{module}", measure_script_start)):
+            runs = [measure_one(module) for _ in range(max(1, params['repeat']))]
+            timings = [run['seconds'] for run in runs]
+            loaded = sorted({m for run in runs for m in run['loaded']})
+            if loaded:
+                raise RuntimeError(f"{name} loaded deferred modules: {', '.join(loaded)}")
+            results[name] = {
+                'seconds': round(statistics.median(timings), 6), 'best': round(min(timings), 6),
+                'runs': len(runs), 'deferred_loaded': loaded
+            }
+    return results
+
+
+BENCHMARKS = {
+    'desk': bench_desk,
+    'parser': bench_parser,
+    'bot': bench_bot,
+    'imports': bench_imports,
+}
+
+
+def run_benchmarks(scale: str = 'small', only: Optional[List[str]] = None) -> Dict:
+    """
+    Run the benchmark groups at a scale.
+
+    Args:
+        scale: Key of SCALES
+        only: Benchmark groups to run (default all of BENCHMARKS)
+
+    Returns:
+        Report dict with 'scale', 'params', machine info and 'results'
+    """
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale: {scale}. Known: {list(SCALES)}")
+    params = SCALES[scale]
+    work_dir = tempfile.mkdtemp(prefix="investigator-bench-")
+    results: Dict[str, Dict] = {}
+    try:
+        for group in only or list(BENCHMARKS):
+            if group not in BENCHMARKS:
+                raise ValueError(f"Unknown benchmark group: {group}. Known: {list(BENCHMARKS)}")
+            results.update(BENCHMARKS[group](params, work_dir))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'scale': scale,
+        'params': params,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float = 0.25) -> List[Dict]:
+    """
+    Compare a report against a baseline report of the same scale.
+
+    Returns one row per benchmark present in both, with the ratio of
+    current to baseline median time and whether it is a regression
+    (ratio above 1 + tolerance).
+    """
+    if report.get('scale') != baseline.get('scale'):
+        raise ValueError(f"Scale mismatch: {report.get('scale')} vs baseline {baseline.get('scale')}")
+    rows = []
+    for name, current in sorted(report['results'].items()):
+        base = baseline.get('results', {}).get(name)
+        if not base or 'seconds' not in base or 'seconds' not in current:
+            continue
+        ratio = current['seconds'] / base['seconds'] if base['seconds'] else 1.0
+        rows.append({'name': name, 'baseline': base['seconds'], 'current': current['seconds'],
+                     'ratio': round(ratio, 3), 'regression': ratio > 1 + tolerance})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description="INVESTIGATOR-DESK performance benchmarks")
+    parser.add_argument("--scale", default="small", choices=list(SCALES))
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="benchmark groups to run")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="compare against this JSON report")
+    parser.add_argument("--save-baseline", help="write the JSON report here as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown before failing (default 0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.scale, args.only)
+    for name, result in sorted(report['results'].items()):
+        if 'skipped' in result:
+            print(f"  {name:<22} skipped: {result['skipped']}")
+        else:
+            print(f"  {name:<22} {result['seconds'] * 1000:10.2f} ms (best {result['best'] * 1000:.2f} ms)")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.tolerance)
+        regressions = [row for row in rows if row['regression']]
+        for row in rows:
+            flag = "REGRESSION" if row['regression'] else "ok"
+            print(f"  {row['name']:<22} x{row['ratio']:<6} {flag}")
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed beyond {args.tolerance:.0%}",
+                  file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+CONTENT-ADDRESSED EVIDENCE BLOB STORE FOR INVESTIGATOR-DESK
+
+Large evidence payloads (raw report text, search snippets, proof output)
+are stored once, zlib-compressed, under the SHA-256 of their content.
+Evidence entries keep only the digest under the 'blob' key, so the
+payload is never duplicated across investigations, never rewritten on
+save and only read when it is viewed.
+
+Layout:
+    <root>/objects/<first 2 hex>/<remaining 62 hex>   compressed content
+    <root>/refs/<investigation id>.json               digests it references
+    <root>/pins/<owner>.json                          digests kept for other stores
+
+Usage:
+    from blob_store import BlobStore
+    from investigator import InvestigatorDesk
+
+    desk = InvestigatorDesk()
+    blobs = BlobStore()
+    desk.register_index(blobs)  # reference counts follow every save
+
+    blobs.attach(inv, "SRC-1", "Report Text", "Raw Lexis report", raw_text)
+    desk.save_investigation(inv)
+
+    text = blobs.get_text(inv.sources["SRC-1"].evidence[-1]['blob'])
+    blobs.gc(desk)  # delete blobs no case file on disk references any more
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from metrics import METRICS
+
+
+DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+BLOB_REFERENCE = re.compile(rb'"blob":\s*"([0-9a-f]{64})"')
+
+# Unreferenced blobs younger than this are kept by gc(): they may belong
+# to evidence that has been attached but not saved yet
+GC_GRACE_SECONDS = 3600
+
+
+def evidence_blobs(investigation) -> Set[str]:
+    """Return the digests referenced by an investigation's evidence."""
+    return {evidence['blob']
+            for source in investigation.sources.values()
+            for evidence in source.evidence
+            if evidence.get('blob')}
+
+
+class BlobStore:
+    """
+    Compressed blobs keyed by the SHA-256 of their content.
+
+    Reference counts (the number of investigations and pins referencing
+    each digest) are rebuilt from the refs and pins files on start and kept
+    current through index_investigation / remove_investigation and pin.
+    Saves made while the store was not registered are only counted after
+    rebuild(), which gc() runs first or insists on.
+    """
+
+    def __init__(self, root: str = os.path.join(".investigator-data", "blobs"),
+                 compression_level: int = 6):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.refs_dir = os.path.join(root, "refs")
+        self.pins_dir = os.path.join(root, "pins")
+        self.compression_level = compression_level
+        self.refs: Dict[str, List[str]] = {}
+        self.pins: Dict[str, List[str]] = {}
+        self.refcounts: Dict[str, int] = {}
+        self.rebuilt = False
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.refs_dir, exist_ok=True)
+        os.makedirs(self.pins_dir, exist_ok=True)
+        self._load_refs(self.refs, self.refs_dir)
+        self._load_refs(self.pins, self.pins_dir)
+
+    def _load_refs(self, table: Dict[str, List[str]], directory: str):
+        """Rebuild reference counts from the refs or pins files in directory."""
+        for filename in os.listdir(directory):
+            if not filename.endswith('.json'):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                with open(path, 'r') as f:
+                    digests = json.load(f)
+            except Exception as e:
+                print(f"Error loading blob refs {path}: {e}", file=sys.stderr)
+                continue
+            table[filename[:-5]] = digests
+            for digest in digests:
+                self.refcounts[digest] = self.refcounts.get(digest, 0) + 1
+
+    def _object_path(self, digest: str) -> str:
+        if not DIGEST_PATTERN.match(digest):
+            raise ValueError(f"Invalid blob digest: {digest!r}")
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def put(self, data: Union[bytes, str]) -> str:
+        """
+        Store content and return its digest.
+
+        Content that is already stored is not written again; its mtime is
+        refreshed instead, so gc() treats it as newly attached until the
+        evidence referencing it is saved.
+
+        Args:
+            data: Raw bytes, or text (stored as UTF-8)
+
+        Returns:
+            Hex SHA-256 of the raw content
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        try:
+            os.utime(path)
+            METRICS.inc("blob_puts_total", result="existing")
+            return digest
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = zlib.compress(data, self.compression_level)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+        METRICS.inc("blob_puts_total", result="stored")
+        METRICS.inc("blob_bytes_written_total", len(compressed))
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Return the content of a blob, raising KeyError if it is missing."""
+        path = self._object_path(digest)
+        try:
+            with open(path, 'rb') as f:
+                compressed = f.read()
+        except FileNotFoundError:
+            raise KeyError(f"Blob {digest} not found") from None
+        METRICS.inc("blob_bytes_read_total", len(compressed))
+        return zlib.decompress(compressed)
+
+    def get_text(self, digest: str) -> str:
+        """Return the content of a blob decoded as UTF-8."""
+        return self.get(digest).decode('utf-8')
+
+    def exists(self, digest: str) -> bool:
+        """Return True if a blob is stored."""
+        return os.path.exists(self._object_path(digest))
+
+    def load_evidence(self, evidence: Dict) -> Optional[str]:
+        """Return the attached text of an evidence entry, or None if it has no blob."""
+        digest = evidence.get('blob')
+        return self.get_text(digest) if digest else None
+
+    def attach(self, investigation, source_id: str, evidence_type: str,
+               description: str, content: Union[bytes, str], source_ref: str = "") -> Dict:
+        """
+        Store content and add evidence referencing it to an authority source.
+
+        Args:
+            investigation: Investigation to add the evidence to
+            source_id: Authority source receiving the evidence
+            evidence_type: Evidence type, as for add_evidence
+            description: Short description kept inline in the investigation
+            content: Payload stored in the blob store
+            source_ref: Optional source reference
+
+        Returns:
+            The added evidence entry
+        """
+        if source_id not in investigation.sources:
+            raise ValueError(f"Authority source {source_id} not found")
+        size = len(content.encode('utf-8') if isinstance(content, str) else content)
+        evidence = {
+            'type': evidence_type,
+            'description': description,
+            'source': source_ref,
+            'timestamp': datetime.now().isoformat(),
+            'blob': self.put(content),
+            'blob_size': size
+        }
+        investigation.add_evidence_batch(source_id, [evidence])
+        return evidence
+
+    def _set_refs(self, investigation_id: str, digests: List[str],
+                  table: Optional[Dict[str, List[str]]] = None, directory: Optional[str] = None):
+        table = self.refs if table is None else table
+        for digest in table.pop(investigation_id, []):
+            count = self.refcounts.get(digest, 0) - 1
+            if count > 0:
+                self.refcounts[digest] = count
+            else:
+                self.refcounts.pop(digest, None)
+        path = os.path.join(directory or self.refs_dir, f"{investigation_id}.json")
+        if not digests:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        table[investigation_id] = digests
+        for digest in digests:
+            self.refcounts[digest] = self.refcounts.get(digest, 0) + 1
+        with open(path + ".tmp", 'w') as f:
+            json.dump(digests, f)
+        os.replace(path + ".tmp", path)
+
+    def index_investigation(self, investigation) -> int:
+        """
+        Record the blobs an investigation references.
+
+        Returns the number of distinct blobs referenced.
+        """
+        digests = sorted(evidence_blobs(investigation))
+        if digests != self.refs.get(investigation.investigation_id, []):
+            self._set_refs(investigation.investigation_id, digests)
+        return len(digests)
+
+    def remove_investigation(self, investigation_id: str):
+        """Drop every reference held by an investigation."""
+        self._set_refs(investigation_id, [])
+
+    def pin(self, owner: str, digests: Iterable[str]):
+        """
+        Keep blobs alive for a store other than the desk, e.g. snapshots.
+
+        Args:
+            owner: Name of the pin set; replaces its previous digests
+            digests: Digests to keep; empty to release the pin set
+        """
+        if not owner or os.sep in owner or owner.startswith('.'):
+            raise ValueError(f"Invalid pin owner: {owner!r}")
+        digests = sorted(set(digests))
+        if digests != self.pins.get(owner, []):
+            self._set_refs(owner, digests, self.pins, self.pins_dir)
+
+    def rebuild(self, desk) -> int:
+        """
+        Recount investigation references from every case file on disk.
+
+        Args:
+            desk: Desk whose data directory holds the case files
+
+        Returns:
+            Number of case files scanned
+        """
+        ids = desk.list_investigation_ids()
+        for inv_id in ids:
+            try:
+                with open(desk._get_investigation_file(inv_id), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+            digests = sorted({m.decode('ascii') for m in BLOB_REFERENCE.findall(data)})
+            if digests != self.refs.get(inv_id, []):
+                self._set_refs(inv_id, digests)
+        for inv_id in set(self.refs) - set(ids):
+            self._set_refs(inv_id, [])
+        self.rebuilt = True
+        return len(ids)
+
+    def gc(self, desk=None, grace_seconds: float = GC_GRACE_SECONDS) -> Dict[str, int]:
+        """
+        Delete blobs that no investigation or pin references.
+
+        Blobs modified within grace_seconds are kept so that evidence
+        attached but not yet saved does not lose its content.
+
+        Args:
+            desk: Desk whose case files are rescanned with rebuild() first;
+                without one, rebuild() must already have run on this store
+            grace_seconds: Minimum age of a blob before it is collected
+
+        Returns:
+            Dictionary with the number of blobs and bytes removed and kept
+        """
+        if desk is not None:
+            self.rebuild(desk)
+        elif not self.rebuilt:
+            raise RuntimeError("gc() needs a desk to rescan, or rebuild() first: reference "
+                               "counts miss investigations saved without this store registered")
+        cutoff = time.time() - grace_seconds
+        stats = {'removed': 0, 'bytes_removed': 0, 'kept': 0}
+        for fanout in os.listdir(self.objects_dir):
+            fanout_dir = os.path.join(self.objects_dir, fanout)
+            if not os.path.isdir(fanout_dir):
+                continue
+            for name in os.listdir(fanout_dir):
+                path = os.path.join(fanout_dir, name)
+                digest = fanout + name
+                if not DIGEST_PATTERN.match(digest):
+                    continue
+                st = os.stat(path)
+                if self.refcounts.get(digest) or st.st_mtime > cutoff:
+                    stats['kept'] += 1
+                    continue
+                os.remove(path)
+                stats['removed'] += 1
+                stats['bytes_removed'] += st.st_size
+            if not os.listdir(fanout_dir):
+                os.rmdir(fanout_dir)
+        METRICS.inc("blob_gc_removed_total", stats['removed'])
+        return stats
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+PORTABLE EXPORT/IMPORT BUNDLES FOR INVESTIGATOR-DESK
+
+Moves investigations between machines as one gzip-compressed tar
+archive:
+
+    manifest.json          format version, and the size and SHA-256 of
+                           every member that follows
+    cases/<id>.json        investigation files, copied verbatim
+    blobs/<digest>         compressed evidence blobs they reference
+                           (see blob_store.py), copied verbatim
+
+Both directions stream: export copies files into the archive without
+parsing them, and import reads the archive front to back one member at
+a time, so neither holds more than one investigation in memory. Import
+checks every member against the manifest and the investigation schema
+before writing it, and renames investigations whose IDs already exist.
+
+Usage:
+    python case_bundle.py export cases.tar.gz [INV-001 INV-002 ...] [--blobs]
+    python case_bundle.py import cases.tar.gz [--on-conflict rename|skip|replace] [--dry-run]
+    python case_bundle.py verify cases.tar.gz
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import tarfile
+import time
+import zlib
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable, Set, Tuple
+
+from investigator import InvestigatorDesk, Investigation
+from metrics import METRICS
+
+
+BUNDLE_FORMAT = "investigator-desk-bundle"
+BUNDLE_VERSION = 1
+MANIFEST_MEMBER = "manifest.json"
+COPY_BUFFER = 1 << 20
+CONFLICT_POLICIES = ("rename", "skip", "replace")
+
+BLOB_REFERENCE = re.compile(rb'"blob":\s*"([0-9a-f]{64})"')
+
+
+def _scan_case(path: str) -> Tuple[str, int, Set[str]]:
+    """SHA-256, size and referenced blob digests of a case file, in one read."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    refs = {m.decode('ascii') for m in BLOB_REFERENCE.findall(data)}
+    return hashlib.sha256(data).hexdigest(), len(data), refs
+
+
+def _check_manifest(manifest, path: str):
+    """Raise ValueError unless the manifest has the shape run() relies on."""
+    if not isinstance(manifest, dict):
+        raise ValueError(f"{path}: manifest is not a JSON object")
+    if manifest.get('format') != BUNDLE_FORMAT or manifest.get('version') != BUNDLE_VERSION:
+        raise ValueError(f"{path}: unsupported bundle format")
+    fields = {'investigations': ('investigation_id', 'sha256'), 'blobs': ('digest',)}
+    members = set()
+    for key, extra in fields.items():
+        entries = manifest.get(key)
+        if not isinstance(entries, list):
+            raise ValueError(f"{path}: manifest '{key}' is not a list")
+        for entry in entries:
+            if (not isinstance(entry, dict)
+                    or not all(isinstance(entry.get(k), str) for k in ('member',) + extra)
+                    or type(entry.get('size')) is not int or entry['size'] < 0):
+                raise ValueError(f"{path}: malformed manifest entry in '{key}': {entry!r}")
+            if entry['member'] in members:
+                raise ValueError(f"{path}: {entry['member']} listed twice in the manifest")
+            members.add(entry['member'])
+
+
+def _valid_id(investigation_id) -> bool:
+    return (isinstance(investigation_id, str) and investigation_id != ""
+            and not investigation_id.startswith('.') and '/' not in investigation_id
+            and os.sep not in investigation_id)
+
+
+def _add_file(tar: tarfile.TarFile, name: str, path: str, size: int):
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = int(os.path.getmtime(path))
+    info.mode = 0o644
+    with open(path, 'rb') as f:
+        tar.addfile(info, f)
+
+
+def _add_bytes(tar: tarfile.TarFile, name: str, data: bytes):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    info.mode = 0o644
+    tar.addfile(info, io.BytesIO(data))
+
+
+def export_bundle(desk: InvestigatorDesk, path: str,
+                  investigation_ids: Optional[Iterable[str]] = None,
+                  blob_store=None, custody=None, compresslevel: int = 6) -> Dict:
+    """
+    Write investigations to a bundle archive.
+
+    Args:
+        desk: Desk whose data directory holds the investigations
+        path: Archive to write (replaced atomically)
+        investigation_ids: IDs to export; all investigations if None
+        blob_store: Optional BlobStore; referenced blobs are included
+        custody: Optional CustodyLedger recording each export
+        compresslevel: gzip compression level
+
+    Returns:
+        The manifest written to the archive
+    """
+    ids = desk.list_investigation_ids() if investigation_ids is None else list(investigation_ids)
+    cases = []
+    blob_digests = set()
+    # First pass: checksums for the manifest, which goes first in the archive
+    for inv_id in ids:
+        if not _valid_id(inv_id):
+            raise ValueError(f"Invalid investigation ID: {inv_id!r}")
+        case_path = desk._get_investigation_file(inv_id)
+        if not os.path.exists(case_path):
+            raise ValueError(f"Investigation {inv_id} not found")
+        digest, size, refs = _scan_case(case_path)
+        cases.append({'investigation_id': inv_id, 'member': f"cases/{inv_id}.json",
+                      'size': size, 'sha256': digest})
+        if blob_store is not None:
+            blob_digests.update(refs)
+
+    blobs = []
+    for digest in sorted(blob_digests):
+        if not blob_store.exists(digest):
+            print(f"Warning: blob {digest} referenced but not stored; not exported", file=sys.stderr)
+            continue
+        blobs.append({'digest': digest, 'member': f"blobs/{digest}",
+                      'size': os.path.getsize(blob_store._object_path(digest))})
+
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'version': BUNDLE_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'investigations': cases,
+        'blobs': blobs
+    }
+    tmp_path = path + ".tmp"
+    with METRICS.timer("bundle_export_seconds"):
+        with tarfile.open(tmp_path, 'w:gz', compresslevel=compresslevel) as tar:
+            _add_bytes(tar, MANIFEST_MEMBER, json.dumps(manifest, indent=2).encode('utf-8'))
+            for case in cases:
+                _add_file(tar, case['member'], desk._get_investigation_file(case['investigation_id']),
+                          case['size'])
+            for blob in blobs:
+                _add_file(tar, blob['member'], blob_store._object_path(blob['digest']), blob['size'])
+        os.replace(tmp_path, path)
+    METRICS.inc("bundle_investigations_exported_total", len(cases))
+
+    if custody is not None:
+        for case in cases:
+            custody.record_export(case['investigation_id'], path, digest=case['sha256'], via="case_bundle")
+    return manifest
+
+
+class BundleImporter:
+    """
+    Streams a bundle archive into a desk.
+
+    Conflicting investigation IDs (already on disk, or repeated in the
+    bundle) are handled by on_conflict: 'rename' imports under the first
+    free "<id>-<n>" ID, 'skip' leaves the existing investigation alone
+    and 'replace' overwrites it.
+    """
+
+    def __init__(self, desk: InvestigatorDesk, on_conflict: str = "rename",
+                 blob_store=None, load: bool = True):
+        """
+        Args:
+            desk: Desk to import into; its registered indexes are updated
+            on_conflict: 'rename', 'skip' or 'replace'
+            blob_store: BlobStore receiving bundled blobs; required unless
+                the bundle has none (run() raises ValueError otherwise)
+            load: Add imported investigations to desk.investigations
+        """
+        if on_conflict not in CONFLICT_POLICIES:
+            raise ValueError(f"on_conflict must be one of {', '.join(CONFLICT_POLICIES)}")
+        self.desk = desk
+        self.on_conflict = on_conflict
+        self.blob_store = blob_store
+        self.load = load
+
+    def _target_id(self, inv_id: str, taken: set) -> Optional[str]:
+        exists = inv_id in taken or os.path.exists(self.desk._get_investigation_file(inv_id))
+        if not exists or self.on_conflict == "replace" and inv_id not in taken:
+            return inv_id
+        if self.on_conflict == "skip":
+            return None
+        n = 2
+        while (f"{inv_id}-{n}" in taken
+               or os.path.exists(self.desk._get_investigation_file(f"{inv_id}-{n}"))):
+            n += 1
+        return f"{inv_id}-{n}"
+
+    def run(self, path: str, dry_run: bool = False) -> Dict:
+        """
+        Import a bundle.
+
+        Args:
+            path: Archive to read
+            dry_run: Only validate; nothing is written
+
+        Returns:
+            Dictionary with 'imported' (count), 'renamed' ({old: new}),
+            'skipped' (IDs), 'blobs' (count stored) and 'errors'
+            (messages for members that failed validation)
+        """
+        result = {'imported': 0, 'renamed': {}, 'skipped': [], 'blobs': 0, 'errors': []}
+        taken = set()
+        with METRICS.timer("bundle_import_seconds"), tarfile.open(path, 'r|gz') as tar:
+            expected = None
+            for member in tar:
+                if expected is None:
+                    if member.name != MANIFEST_MEMBER:
+                        raise ValueError(f"{path}: bundle does not start with {MANIFEST_MEMBER}")
+                    manifest = json.load(tar.extractfile(member))
+                    _check_manifest(manifest, path)
+                    if manifest['blobs'] and self.blob_store is None and not dry_run:
+                        raise ValueError(f"{path}: bundle contains {len(manifest['blobs'])} evidence "
+                                         f"blobs but no blob store was given to import them into")
+                    expected = {entry['member']: entry
+                                for entry in manifest['investigations'] + manifest['blobs']}
+                    continue
+                entry = expected.pop(member.name, None)
+                if entry is None or not member.isfile():
+                    result['errors'].append(f"{member.name}: not listed in the manifest")
+                    continue
+                if member.size != entry['size']:
+                    result['errors'].append(f"{member.name}: size {member.size} != {entry['size']}")
+                    continue
+                reader = tar.extractfile(member)
+                if 'digest' in entry:
+                    self._import_blob(reader, entry, result, dry_run)
+                else:
+                    self._import_case(reader, entry, taken, result, dry_run)
+            if expected is None:
+                raise ValueError(f"{path}: empty bundle")
+            for name in sorted(expected):
+                result['errors'].append(f"{name}: listed in the manifest but missing")
+        METRICS.inc("bundle_investigations_imported_total", result['imported'])
+        return result
+
+    def _import_case(self, reader, entry: Dict, taken: set, result: Dict, dry_run: bool):
+        raw = reader.read()
+        name = entry['member']
+        if hashlib.sha256(raw).hexdigest() != entry['sha256']:
+            result['errors'].append(f"{name}: checksum mismatch")
+            return
+        try:
+            data = json.loads(raw)
+            inv = Investigation.from_dict(data)
+        except Exception as e:
+            result['errors'].append(f"{name}: not a valid investigation ({e})")
+            return
+        inv_id = inv.investigation_id
+        if inv_id != entry['investigation_id'] or not _valid_id(inv_id):
+            result['errors'].append(f"{name}: investigation ID {inv_id!r} does not match the manifest")
+            return
+
+        target = self._target_id(inv_id, taken)
+        if target is None:
+            result['skipped'].append(inv_id)
+            return
+        taken.add(target)
+        if target != inv_id:
+            result['renamed'][inv_id] = target
+            data['investigation_id'] = target
+            inv.investigation_id = target
+            raw = json.dumps(data, indent=2).encode('utf-8')
+        result['imported'] += 1
+        if dry_run:
+            return
+
+        # Bulk load: the validated bytes are written as they are, without
+        # the re-serialization save_investigation would do
+        case_path = self.desk._get_investigation_file(target)
+        os.makedirs(os.path.dirname(case_path), exist_ok=True)
+        with open(case_path + ".tmp", 'wb') as f:
+            f.write(raw)
+        os.replace(case_path + ".tmp", case_path)
+        METRICS.inc("desk_bytes_written_total", len(raw))
+        if self.load:
+            self.desk.investigations[target] = inv
+        for index in self.desk.indexes:
+            index.index_investigation(inv)
+
+    def _import_blob(self, reader, entry: Dict, result: Dict, dry_run: bool):
+        # run() refuses bundles with blobs when there is nowhere to put them,
+        # so blob_store is only None here on a dry run
+        digest = entry['digest']
+        if not re.fullmatch(r'[0-9a-f]{64}', digest):
+            result['errors'].append(f"{entry['member']}: invalid blob digest")
+            return
+        if self.blob_store is not None and self.blob_store.exists(digest):
+            return
+        # Verify the content hash while spooling the compressed bytes to disk
+        out = None
+        if not dry_run:
+            target = self.blob_store._object_path(digest)
+            tmp_path = f"{target}.{os.getpid()}.import"
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            out = open(tmp_path, 'wb')
+        content_hash = hashlib.sha256()
+        decompressor = zlib.decompressobj()
+        try:
+            for chunk in iter(lambda: reader.read(COPY_BUFFER), b''):
+                content_hash.update(decompressor.decompress(chunk))
+                if out is not None:
+                    out.write(chunk)
+            content_hash.update(decompressor.flush())
+        except zlib.error as e:
+            content_hash = None
+            result['errors'].append(f"{entry['member']}: corrupt blob ({e})")
+        finally:
+            if out is not None:
+                out.close()
+        if content_hash is not None and content_hash.hexdigest() != digest:
+            result['errors'].append(f"{entry['member']}: checksum mismatch")
+            content_hash = None
+        if content_hash is None:
+            if out is not None:
+                os.remove(tmp_path)
+            return
+        if out is not None:
+            os.replace(tmp_path, target)
+        result['blobs'] += 1
+
+
+def import_bundle(desk: InvestigatorDesk, path: str, on_conflict: str = "rename",
+                  blob_store=None, dry_run: bool = False) -> Dict:
+    """Import a bundle into a desk; see BundleImporter.run for the result."""
+    return BundleImporter(desk, on_conflict, blob_store).run(path, dry_run=dry_run)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Export, import or verify investigation bundles."""
+    parser = argparse.ArgumentParser(description="INVESTIGATOR-DESK export/import bundles")
+    parser.add_argument("--data-dir", default=".investigator-data")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_parser = sub.add_parser("export")
+    export_parser.add_argument("archive")
+    export_parser.add_argument("investigation_ids", nargs="*", help="default: all investigations")
+    export_parser.add_argument("--blobs", action="store_true", help="include referenced evidence blobs")
+    import_parser = sub.add_parser("import")
+    import_parser.add_argument("archive")
+    import_parser.add_argument("--on-conflict", choices=CONFLICT_POLICIES, default="rename")
+    import_parser.add_argument("--dry-run", action="store_true", help="validate without writing")
+    sub.add_parser("verify").add_argument("archive")
+    args = parser.parse_args(argv)
+
+    desk = InvestigatorDesk(args.data_dir, preload=False)
+    blob_store = None
+    if getattr(args, 'blobs', False) or args.command == "import":
+        from blob_store import BlobStore
+        blob_store = BlobStore(os.path.join(args.data_dir, "blobs"))
+        if args.command == "import":
+            desk.register_index(blob_store, build=False)
+
+    try:
+        if args.command == "export":
+            manifest = export_bundle(desk, args.archive, args.investigation_ids or None, blob_store)
+            print(f"✓ Exported {len(manifest['investigations'])} investigations "
+                  f"and {len(manifest['blobs'])} blobs to {args.archive}")
+            return 0
+        dry_run = args.command == "verify" or args.dry_run
+        result = BundleImporter(desk, getattr(args, 'on_conflict', "rename"), blob_store,
+                                load=False).run(args.archive, dry_run=dry_run)
+    except (ValueError, OSError, tarfile.TarError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    for error in result['errors']:
+        print(f"Error: {error}", file=sys.stderr)
+    for old, new in sorted(result['renamed'].items()):
+        print(f"  {old} -> {new}")
+    verb = "Validated" if dry_run else "Imported"
+    print(f"{'✓' if not result['errors'] else '✗'} {verb} {result['imported']} investigations, "
+          f"{len(result['skipped'])} skipped, {result['blobs']} blobs")
+    return 1 if result['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+HASH-CHAINED CHAIN-OF-CUSTODY LEDGER FOR INVESTIGATOR-DESK
+
+Keeps one append-only ledger per investigation recording every evidence
+addition, modification, removal and export. Each record carries the hash
+of the previous one, so any edit, reordering or truncation of earlier
+records is detected on verification.
+
+Layout:
+    <root>/<investigation id>.log          one JSON record per line
+    <root>/<investigation id>.checkpoint   last verified (seq, hash, offset)
+    <root>/<investigation id>.state        evidence digests seen at last save
+
+Each line is '{"prev":"<hash>","seq":<n>,<fields>,"hash":"<hash>"}' where
+the hash is the SHA-256 of the line without its ',"hash":...' suffix.
+Appends write one line and never touch the case file; verification is a
+single streaming pass over raw lines and resumes from the checkpoint.
+
+Usage:
+    from custody_ledger import CustodyLedger
+    from investigator import InvestigatorDesk
+
+    desk = InvestigatorDesk()
+    custody = CustodyLedger()
+    desk.register_index(custody)  # evidence changes recorded on every save
+
+    custody.record_export(inv.investigation_id, "report.txt")
+    result = custody.verify(inv.investigation_id)
+    if not result['valid']:
+        print(result['error'])
+"""
+
+import getpass
+import hashlib
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Iterator, Tuple
+
+from metrics import METRICS
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are not locked across processes
+    fcntl = None
+
+
+GENESIS_HASH = "0" * 64
+HASH_SUFFIX_LENGTH = len(',"hash":""}') + 64
+READ_BUFFER = 1 << 20
+
+
+def _default_actor() -> str:
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "unknown"
+
+
+def evidence_digest(evidence: Dict) -> str:
+    """SHA-256 of an evidence entry's canonical JSON."""
+    return hashlib.sha256(json.dumps(evidence, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def _prefix(prev: str, seq: int) -> bytes:
+    return b'{"prev":"%s","seq":%d,' % (prev.encode('ascii'), seq)
+
+
+class CustodyLedger:
+    """
+    Per-investigation hash-chained custody records.
+
+    Appends hold an exclusive flock on the ledger, so several processes
+    (the desk service, a site bundle build, an export) can share a root.
+    The head (sequence number and hash of the last record) is cached with
+    the file size it was read at and re-read from the end of the file
+    whenever the size has changed, so appends cost one write regardless
+    of ledger length.
+    """
+
+    def __init__(self, root: str = os.path.join(".investigator-data", "custody"),
+                 actor: Optional[str] = None, sync: bool = False):
+        """
+        Args:
+            root: Directory holding the ledgers
+            actor: Name recorded with each record (defaults to the OS user)
+            sync: fsync after every append
+        """
+        self.root = root
+        self.actor = actor or _default_actor()
+        self.sync = sync
+        # investigation_id -> (file size, seq, hash) of the last record seen
+        self._heads: Dict[str, Tuple[int, int, str]] = {}
+        self._states: Dict[str, Dict[str, List[str]]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, investigation_id: str, ext: str) -> str:
+        if not investigation_id or os.sep in investigation_id or investigation_id.startswith('.'):
+            raise ValueError(f"Invalid investigation ID: {investigation_id!r}")
+        return os.path.join(self.root, f"{investigation_id}.{ext}")
+
+    def head(self, investigation_id: str) -> Tuple[int, str]:
+        """Return (sequence number, hash) of the last record; (0, GENESIS_HASH) if empty."""
+        path = self._path(investigation_id, "log")
+        if not os.path.exists(path):
+            return 0, GENESIS_HASH
+        with open(path, 'rb') as f:
+            return self._head_of(investigation_id, f)
+
+    def _head_of(self, investigation_id: str, f) -> Tuple[int, str]:
+        """Head of the open ledger f, re-read only if its size changed since last seen."""
+        size = os.fstat(f.fileno()).st_size
+        cached = self._heads.get(investigation_id)
+        if cached is not None and cached[0] == size:
+            return cached[1], cached[2]
+        lines = self._tail_lines(f, 1)
+        if lines:
+            last = json.loads(lines[-1])
+            head = (last['seq'], last['hash'])
+        else:
+            head = (0, GENESIS_HASH)
+        self._heads[investigation_id] = (size,) + head
+        return head
+
+    @staticmethod
+    def _tail_lines(f, count: int) -> List[bytes]:
+        """Return up to the last count lines of an open file, reading backwards from its end."""
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        block = 4096
+        while True:
+            start = max(0, end - block)
+            f.seek(start)
+            lines = f.read(end - start).rstrip(b'\n').split(b'\n')
+            if len(lines) > count or start == 0:
+                break
+            block *= 2
+        return [line for line in lines[-count:] if line]
+
+    def append(self, investigation_id: str, action: str, **fields) -> Dict:
+        """
+        Append one custody record.
+
+        Args:
+            investigation_id: Ledger to append to
+            action: What happened (e.g. 'evidence_added', 'export')
+            **fields: Extra JSON-serializable record fields
+
+        Returns:
+            The record as written, including seq, prev and hash
+        """
+        return self.append_many(investigation_id, [dict(fields, action=action)])[-1]
+
+    def append_many(self, investigation_id: str, records: List[Dict]) -> List[Dict]:
+        """Append several records with a single write. Each record needs an 'action'."""
+        if not records:
+            return []
+        path = self._path(investigation_id, "log")
+        timestamp = datetime.now().isoformat()
+        with self._lock, open(path, 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            # Under the lock, so appends by other processes are seen
+            seq, prev = self._head_of(investigation_id, f)
+            lines = []
+            written = []
+            for fields in records:
+                if not fields.get('action'):
+                    raise ValueError("Custody records need an action")
+                fields = dict(fields)
+                fields.setdefault('timestamp', timestamp)
+                fields.setdefault('actor', self.actor)
+                fields.pop('prev', None)
+                fields.pop('seq', None)
+                fields.pop('hash', None)
+                seq += 1
+                body = _prefix(prev, seq) + json.dumps(fields, sort_keys=True, separators=(',', ':'))[1:-1].encode('utf-8')
+                digest = hashlib.sha256(body).hexdigest()
+                lines.append(body + b',"hash":"%s"}\n' % digest.encode('ascii'))
+                written.append(dict(fields, prev=prev, seq=seq, hash=digest))
+                prev = digest
+            f.write(b''.join(lines))
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+            self._heads[investigation_id] = (os.fstat(f.fileno()).st_size, seq, prev)
+        METRICS.inc("custody_records_total", len(written))
+        return written
+
+    def record_export(self, investigation_id: str, destination: str,
+                      digest: Optional[str] = None, **fields) -> Dict:
+        """Record that an investigation was exported to destination."""
+        if digest:
+            fields['digest'] = digest
+        return self.append(investigation_id, 'export', destination=destination, **fields)
+
+    def records(self, investigation_id: str, start_seq: int = 1) -> Iterator[Dict]:
+        """Stream the records of a ledger from start_seq on (not verified)."""
+        path = self._path(investigation_id, "log")
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb', buffering=READ_BUFFER) as f:
+            for line in f:
+                record = json.loads(line)
+                if record['seq'] >= start_seq:
+                    yield record
+
+    def _load_checkpoint(self, investigation_id: str) -> Optional[Dict]:
+        path = self._path(investigation_id, "checkpoint")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading custody checkpoint {path}: {e}", file=sys.stderr)
+            return None
+
+    def _save_checkpoint(self, investigation_id: str, checkpoint: Dict):
+        path = self._path(investigation_id, "checkpoint")
+        with open(path + ".tmp", 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(path + ".tmp", path)
+
+    def verify(self, investigation_id: str, resume: bool = True) -> Dict:
+        """
+        Verify the hash chain of a ledger in one streaming pass.
+
+        With resume=True verification starts after the last checkpoint,
+        after checking that the checkpointed record is still in place;
+        a successful pass moves the checkpoint to the end of the ledger.
+
+        Returns:
+            Dictionary with 'valid', 'seq' and 'head' of the last good
+            record, 'verified' (records checked in this pass),
+            'resumed_from' and 'error'
+        """
+        path = self._path(investigation_id, "log")
+        seq, prev, offset = 0, GENESIS_HASH, 0
+        checkpoint = self._load_checkpoint(investigation_id) if resume else None
+        result = {'valid': True, 'seq': 0, 'head': GENESIS_HASH, 'verified': 0,
+                  'resumed_from': 0, 'error': None}
+
+        if not os.path.exists(path):
+            if checkpoint and checkpoint['seq']:
+                result.update(valid=False, error="Ledger missing but a checkpoint exists")
+            return result
+
+        with METRICS.timer("custody_verify_seconds"), open(path, 'rb', buffering=READ_BUFFER) as f:
+            if checkpoint and checkpoint['seq']:
+                error = self._check_checkpoint(f, checkpoint)
+                if error:
+                    result.update(valid=False, error=error)
+                    return result
+                seq, prev, offset = checkpoint['seq'], checkpoint['hash'], checkpoint['offset']
+                result['resumed_from'] = seq
+                f.seek(offset)
+
+            verified = 0
+            for line in f:
+                expected = _prefix(prev, seq + 1)
+                error = None
+                if not line.endswith(b'\n'):
+                    error = "truncated record"
+                elif not line.startswith(expected):
+                    error = "sequence or previous-hash mismatch"
+                else:
+                    body = line[:-HASH_SUFFIX_LENGTH - 1]
+                    digest = hashlib.sha256(body).hexdigest()
+                    if line[-HASH_SUFFIX_LENGTH - 1:] != b',"hash":"%s"}\n' % digest.encode('ascii'):
+                        error = "record hash mismatch"
+                if error:
+                    result.update(valid=False, error=f"Record {seq + 1} at byte {offset}: {error}")
+                    break
+                seq, prev = seq + 1, digest
+                offset += len(line)
+                verified += 1
+
+        result.update(seq=seq, head=prev, verified=verified)
+        METRICS.inc("custody_records_verified_total", verified)
+        if result['valid'] and verified:
+            self._save_checkpoint(investigation_id, {'seq': seq, 'hash': prev, 'offset': offset})
+        return result
+
+    @staticmethod
+    def _check_checkpoint(f, checkpoint: Dict) -> Optional[str]:
+        """Check that the checkpointed record still ends at its recorded offset."""
+        offset = checkpoint['offset']
+        start = max(0, offset - 4096)
+        f.seek(start)
+        data = f.read(offset - start)
+        if len(data) != offset - start or not data.endswith(b'\n'):
+            return f"Ledger shorter than checkpoint at seq {checkpoint['seq']}"
+        last = data[:-1].rsplit(b'\n', 1)[-1]
+        if not last.endswith(b',"hash":"%s"}' % checkpoint['hash'].encode('ascii')) \
+                or b',"seq":%d,' % checkpoint['seq'] not in last:
+            return f"Checkpointed record {checkpoint['seq']} was modified"
+        return None
+
+    def _load_state(self, investigation_id: str) -> Dict[str, List[str]]:
+        state = self._states.get(investigation_id)
+        if state is None:
+            state = {}
+            path = self._path(investigation_id, "state")
+            if os.path.exists(path):
+                try:
+                    with open(path, 'r') as f:
+                        state = json.load(f)
+                except Exception as e:
+                    print(f"Error loading custody state {path}: {e}", file=sys.stderr)
+            self._states[investigation_id] = state
+        return state
+
+    def index_investigation(self, investigation) -> int:
+        """
+        Record evidence added, modified or removed since the last save.
+
+        Returns the number of custody records appended.
+        """
+        inv_id = investigation.investigation_id
+        old_state = self._load_state(inv_id)
+        new_state = {}
+        records = []
+        for source_id, source in investigation.sources.items():
+            old = old_state.get(source_id, [])
+            digests = [evidence_digest(evidence) for evidence in source.evidence]
+            new_state[source_id] = digests
+            for i, digest in enumerate(digests):
+                if i >= len(old):
+                    action = 'evidence_added'
+                elif old[i] != digest:
+                    action = 'evidence_modified'
+                else:
+                    continue
+                records.append({'action': action, 'source_id': source_id,
+                                'evidence_index': i, 'digest': digest,
+                                'evidence_type': source.evidence[i].get('type', '')})
+            for i in range(len(digests), len(old)):
+                records.append({'action': 'evidence_removed', 'source_id': source_id,
+                                'evidence_index': i, 'digest': old[i]})
+        for source_id in sorted(set(old_state) - set(new_state)):
+            for i, digest in enumerate(old_state[source_id]):
+                records.append({'action': 'evidence_removed', 'source_id': source_id,
+                                'evidence_index': i, 'digest': digest})
+
+        if records:
+            self.append_many(inv_id, records)
+        if records or new_state != old_state:
+            path = self._path(inv_id, "state")
+            with open(path + ".tmp", 'w') as f:
+                json.dump(new_state, f)
+            os.replace(path + ".tmp", path)
+            self._states[inv_id] = new_state
+        return len(records)
+
+    def tail(self, investigation_id: str, count: int = 100) -> List[Dict]:
+        """Return the last count records of a ledger (not verified)."""
+        path = self._path(investigation_id, "log")
+        if not os.path.exists(path):
+            return []
+        with open(path, 'rb') as f:
+            return [json.loads(line) for line in self._tail_lines(f, count)]
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+CROSS-INVESTIGATION QUERY API FOR INVESTIGATOR-DESK
+
+CaseCatalog keeps a compact, persistent catalog of every investigation
+(status, sources with their authority type and connection degree, and
+one row per evidence entry) plus secondary indexes over it. Queries
+filter and project catalog rows lazily, so analytics over the whole
+corpus never need every Investigation in memory.
+
+Usage:
+    from desk_query import CaseCatalog
+    from investigator import InvestigatorDesk
+
+    desk = InvestigatorDesk()
+    catalog = CaseCatalog(loader=desk.get_investigation)
+    desk.register_index(catalog)
+
+    hubs = catalog.sources(authority_type="Executive", min_degree=3)
+    per_type = catalog.count_by(catalog.sources(status="active"), "authority_type")
+    monthly = catalog.evidence_per_month(evidence_type="Court Record", since="2026-01-01")
+    rows = catalog.evidence(evidence_type="Address", fields=["investigation_id", "description"])
+"""
+
+import json
+import os
+import sys
+from typing import List, Dict, Optional, Iterator, Iterable, Callable, Set, Tuple
+
+
+def _until_bound(until: Optional[str]) -> Optional[str]:
+    """Make a date-only upper bound cover the whole day."""
+    if until is not None and len(until) == 10:
+        return until + "T23:59:59.999999"
+    return until
+
+
+class CaseCatalog:
+    """
+    Persistent catalog of investigations with query, projection and
+    aggregation helpers.
+
+    Each investigation is one segment file under catalog_dir; saving an
+    investigation rewrites only its own segment. loader, if given, maps an
+    investigation ID to its Investigation and is used only to project
+    fields that are not in the catalog (e.g. evidence descriptions).
+    """
+
+    def __init__(self, catalog_dir: str = os.path.join(".investigator-data", "catalog"),
+                 loader: Optional[Callable] = None):
+        self.catalog_dir = catalog_dir
+        self.loader = loader
+        os.makedirs(catalog_dir, exist_ok=True)
+        self.cases: Dict[str, Dict] = {}
+        self.by_status: Dict[str, Set[str]] = {}
+        self.by_authority_type: Dict[str, Set[Tuple[str, str]]] = {}
+        self.by_evidence_type: Dict[str, Set[str]] = {}
+        self._load()
+
+    def _segment_path(self, investigation_id: str) -> str:
+        return os.path.join(self.catalog_dir, f"{investigation_id}.json")
+
+    def _load(self):
+        for filename in os.listdir(self.catalog_dir):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.catalog_dir, filename), 'r') as f:
+                    self._add_case(json.load(f))
+            except Exception as e:
+                print(f"Error loading catalog segment {filename}: {e}", file=sys.stderr)
+
+    def _add_case(self, case: Dict):
+        inv_id = case['investigation_id']
+        self.cases[inv_id] = case
+        self.by_status.setdefault(case['status'], set()).add(inv_id)
+        for source_id, source in case['sources'].items():
+            self.by_authority_type.setdefault(source['authority_type'], set()).add((inv_id, source_id))
+        for _, _, evidence_type, _ in case['evidence']:
+            self.by_evidence_type.setdefault(evidence_type, set()).add(inv_id)
+
+    def _drop(self, investigation_id: str):
+        case = self.cases.pop(investigation_id, None)
+        if case is None:
+            return
+        self.by_status.get(case['status'], set()).discard(investigation_id)
+        for source_id, source in case['sources'].items():
+            self.by_authority_type.get(source['authority_type'], set()).discard(
+                (investigation_id, source_id))
+        for evidence_type in {row[2] for row in case['evidence']}:
+            self.by_evidence_type.get(evidence_type, set()).discard(investigation_id)
+
+    def index_investigation(self, investigation) -> int:
+        """Replace the catalog entry for an investigation; returns its source count."""
+        inv_id = investigation.investigation_id
+        case = {
+            'investigation_id': inv_id,
+            'title': investigation.title,
+            'status': investigation.status,
+            'created_at': investigation.created_at,
+            'note_count': len(investigation.notes),
+            'sources': {},
+            'evidence': []
+        }
+        for source_id, source in investigation.sources.items():
+            case['sources'][source_id] = {
+                'name': source.name,
+                'authority_type': source.authority_type,
+                'degree': len(source.connections),
+                'evidence_count': len(source.evidence)
+            }
+            for i, ev in enumerate(source.evidence):
+                case['evidence'].append([source_id, i, ev.get('type', ''), ev.get('timestamp', '')])
+
+        tmp_path = self._segment_path(inv_id) + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(case, f)
+        os.replace(tmp_path, self._segment_path(inv_id))
+
+        self._drop(inv_id)
+        self._add_case(case)
+        return len(case['sources'])
+
+    def remove_investigation(self, investigation_id: str):
+        """Remove an investigation from the catalog."""
+        self._drop(investigation_id)
+        path = self._segment_path(investigation_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _candidate_cases(self, status: Optional[str] = None,
+                         investigation_id: Optional[str] = None) -> Iterable[str]:
+        if investigation_id is not None:
+            ids = {investigation_id} if investigation_id in self.cases else set()
+        else:
+            ids = None
+        if status is not None:
+            by_status = self.by_status.get(status, set())
+            ids = by_status if ids is None else ids & by_status
+        return sorted(ids) if ids is not None else sorted(self.cases)
+
+    def investigations(self, status: Optional[str] = None,
+                       fields: Optional[List[str]] = None) -> Iterator[Dict]:
+        """Yield one row per investigation (without its sources/evidence)."""
+        for inv_id in self._candidate_cases(status):
+            case = self.cases[inv_id]
+            row = {
+                'investigation_id': inv_id,
+                'title': case['title'],
+                'status': case['status'],
+                'created_at': case['created_at'],
+                'source_count': len(case['sources']),
+                'evidence_count': len(case['evidence']),
+                'note_count': case['note_count']
+            }
+            yield self._project(row, fields)
+
+    def sources(self, authority_type: Optional[str] = None, status: Optional[str] = None,
+                min_degree: Optional[int] = None, max_degree: Optional[int] = None,
+                investigation_id: Optional[str] = None,
+                fields: Optional[List[str]] = None) -> Iterator[Dict]:
+        """
+        Yield authority source rows matching every given filter.
+
+        Rows hold investigation_id, source_id, name, authority_type, degree
+        (number of connections), evidence_count and the case status.
+        """
+        if authority_type is not None:
+            wanted = set(self._candidate_cases(status, investigation_id))
+            pairs = sorted(p for p in self.by_authority_type.get(authority_type, ())
+                           if p[0] in wanted)
+        else:
+            pairs = ((inv_id, source_id)
+                     for inv_id in self._candidate_cases(status, investigation_id)
+                     for source_id in self.cases[inv_id]['sources'])
+
+        for inv_id, source_id in pairs:
+            source = self.cases[inv_id]['sources'][source_id]
+            if min_degree is not None and source['degree'] < min_degree:
+                continue
+            if max_degree is not None and source['degree'] > max_degree:
+                continue
+            row = {'investigation_id': inv_id, 'source_id': source_id,
+                   'status': self.cases[inv_id]['status']}
+            row.update(source)
+            yield self._project(row, fields)
+
+    def evidence(self, evidence_type: Optional[str] = None, since: Optional[str] = None,
+                 until: Optional[str] = None, authority_type: Optional[str] = None,
+                 status: Optional[str] = None, investigation_id: Optional[str] = None,
+                 fields: Optional[List[str]] = None) -> Iterator[Dict]:
+        """
+        Yield evidence rows matching every given filter.
+
+        Rows hold investigation_id, source_id, evidence_index, type and
+        timestamp. since/until are inclusive ISO timestamps or dates. Any
+        other field named in fields (e.g. 'description') is read from the
+        investigation through the loader.
+        """
+        until = _until_bound(until)
+        cases = self._candidate_cases(status, investigation_id)
+        if evidence_type is not None:
+            with_type = self.by_evidence_type.get(evidence_type, set())
+            cases = [inv_id for inv_id in cases if inv_id in with_type]
+
+        for inv_id in cases:
+            case = self.cases[inv_id]
+            for source_id, index, ev_type, timestamp in case['evidence']:
+                if evidence_type is not None and ev_type != evidence_type:
+                    continue
+                if since is not None and timestamp < since:
+                    continue
+                if until is not None and timestamp > until:
+                    continue
+                if (authority_type is not None
+                        and case['sources'][source_id]['authority_type'] != authority_type):
+                    continue
+                row = {'investigation_id': inv_id, 'source_id': source_id,
+                       'evidence_index': index, 'type': ev_type, 'timestamp': timestamp}
+                yield self._project(row, fields)
+
+    def _project(self, row: Dict, fields: Optional[List[str]]) -> Dict:
+        """Keep only the requested fields, loading missing evidence fields lazily."""
+        if fields is None:
+            return row
+        projected = {}
+        for field in fields:
+            if field in row:
+                projected[field] = row[field]
+            elif 'evidence_index' in row and self.loader is not None:
+                inv = self.loader(row['investigation_id'])
+                evidence = inv.sources[row['source_id']].evidence[row['evidence_index']] if inv else {}
+                projected[field] = evidence.get(field)
+            else:
+                projected[field] = None
+        return projected
+
+    @staticmethod
+    def count_by(rows: Iterable[Dict], field: str) -> Dict[str, int]:
+        """Count rows per value of field, consuming rows lazily."""
+        counts: Dict[str, int] = {}
+        for row in rows:
+            key = row.get(field)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def evidence_per_month(self, **filters) -> Dict[str, int]:
+        """Count evidence per 'YYYY-MM' month; accepts the evidence() filters."""
+        counts: Dict[str, int] = {}
+        for row in self.evidence(**filters):
+            month = row['timestamp'][:7]
+            counts[month] = counts.get(month, 0) + 1
+        return dict(sorted(counts.items()))
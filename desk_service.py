@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+LONG-RUNNING DESK SERVICE FOR INVESTIGATOR-DESK
+
+Keeps investigations warm in an LRU cache bounded by entry count and
+memory, serves them to the parser, bot and CLI over a Unix socket (or
+localhost TCP), and writes changes back to disk in batches.
+
+Protocol: one JSON object per line in each direction. A request is
+{"op": ..., <arguments>}; the response is {"ok": true, "result": ...} or
+{"ok": false, "error": "..."}. Ops: ping, get, put, create, list, report,
+add_evidence, add_note, add_connection, flush, stats.
+
+Usage:
+    python desk_service.py --socket /tmp/investigator-desk.sock
+    python desk_service.py --port 8765          # 127.0.0.1 only
+
+    from desk_service import DeskClient
+    client = DeskClient("/tmp/investigator-desk.sock")
+    inv = client.get_investigation("INV-001")
+    inv.add_note("Reviewed")
+    client.save_investigation(inv)
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional, Union, Tuple
+
+from investigator import InvestigatorDesk, Investigation
+from metrics import METRICS
+
+
+DEFAULT_SOCKET = os.path.join(".investigator-data", "desk.sock")
+
+Address = Union[str, Tuple[str, int]]
+
+
+class WarmCache:
+    """
+    LRU cache of Investigation objects over an InvestigatorDesk, with
+    write-behind.
+
+    Changed investigations are marked dirty and saved by a background
+    thread every flush_interval seconds (through desk.save_investigation,
+    so registered indexes stay current). A flush copies the dirty
+    investigations under the cache lock and writes the copies after
+    releasing it, so requests are not blocked on disk. A dirty entry is
+    saved before it can be evicted. Each entry's size is estimated from
+    its serialized form whenever it is inserted or changed, so unsaved
+    edits count towards max_bytes.
+    """
+
+    def __init__(self, desk: InvestigatorDesk, max_entries: int = 256,
+                 max_bytes: int = 256 * 1024 * 1024, flush_interval: float = 1.0):
+        self.desk = desk
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.entries: "OrderedDict[str, Investigation]" = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        # Dirty investigation ID -> change number of its latest change
+        self.dirty: Dict[str, int] = {}
+        # Entries a flush is writing; they are not evicted meanwhile
+        self.flushing: set = set()
+        self.lock = threading.RLock()
+        # Lock order: flush_lock, then lock, then write_lock. flush_lock
+        # serializes flushes; write_lock serializes desk.save_investigation,
+        # since registered indexes are not thread-safe.
+        self.flush_lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.counts = {'hits': 0, 'misses': 0, 'evictions': 0, 'flushes': 0, 'writes': 0}
+        self._changes = 0
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the write-behind thread."""
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    def close(self):
+        """Stop the write-behind thread and save everything still dirty."""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing desk cache: {e}", file=sys.stderr)
+
+    @staticmethod
+    def _estimated_size(investigation: Investigation) -> int:
+        # Same formatting as InvestigatorDesk.save_investigation
+        return len(json.dumps(investigation.to_dict(), indent=2))
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.sizes.values())
+
+    def get(self, investigation_id: str) -> Optional[Investigation]:
+        """Return an investigation, loading it on a miss."""
+        with self.lock:
+            inv = self.entries.get(investigation_id)
+            if inv is not None:
+                self.entries.move_to_end(investigation_id)
+                self.counts['hits'] += 1
+                METRICS.inc("desk_cache_requests_total", result="hit")
+                return inv
+            self.counts['misses'] += 1
+            METRICS.inc("desk_cache_requests_total", result="miss")
+            inv = self.desk.load_investigation(investigation_id)
+            if inv is not None:
+                self._insert(inv)
+            return inv
+
+    def put(self, investigation: Investigation):
+        """Cache an investigation and schedule it for saving."""
+        with self.lock:
+            self._insert(investigation)
+            self._mark(investigation.investigation_id)
+
+    def mark_dirty(self, investigation_id: str):
+        """Schedule a cached investigation that was changed in place for saving."""
+        with self.lock:
+            inv = self.entries.get(investigation_id)
+            if inv is not None:
+                self._mark(investigation_id)
+                self.sizes[investigation_id] = self._estimated_size(inv)
+                self._evict(investigation_id)
+
+    def _mark(self, investigation_id: str):
+        self._changes += 1
+        self.dirty[investigation_id] = self._changes
+
+    def _insert(self, investigation: Investigation):
+        inv_id = investigation.investigation_id
+        self.entries[inv_id] = investigation
+        self.entries.move_to_end(inv_id)
+        self.sizes[inv_id] = self._estimated_size(investigation)
+        self._evict(inv_id)
+
+    def _evict(self, keep: str):
+        """Evict least recently used entries other than keep until within the limits."""
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries
+                                         or self.total_bytes > self.max_bytes):
+            victim = next((other for other in self.entries
+                           if other != keep and other not in self.flushing), None)
+            if victim is None:
+                break
+            if victim in self.dirty:
+                self._save(self.entries[victim])
+            del self.entries[victim]
+            del self.sizes[victim]
+            self.counts['evictions'] += 1
+
+    def _save(self, investigation: Investigation):
+        inv_id = investigation.investigation_id
+        with self.write_lock:
+            self.desk.save_investigation(investigation)
+        self.dirty.pop(inv_id, None)
+        self.counts['writes'] += 1
+
+    def flush(self) -> int:
+        """Save every dirty investigation now; returns how many were saved."""
+        with self.flush_lock:
+            with self.lock:
+                pending = [(inv_id, self.dirty[inv_id],
+                            Investigation.from_dict(self.entries[inv_id].to_dict()))
+                           for inv_id in sorted(self.dirty) if inv_id in self.entries]
+                self.flushing = {inv_id for inv_id, _, _ in pending}
+            try:
+                for inv_id, change, copy in pending:
+                    with self.write_lock:
+                        self.desk.save_investigation(copy)
+                    with self.lock:
+                        # Changes made while writing keep the entry dirty
+                        if self.dirty.get(inv_id) == change:
+                            del self.dirty[inv_id]
+                        self.flushing.discard(inv_id)
+                        self.counts['writes'] += 1
+            finally:
+                with self.lock:
+                    self.flushing = set()
+                    if pending:
+                        self.counts['flushes'] += 1
+            return len(pending)
+
+    def stats(self) -> Dict:
+        """Cache counters and current size."""
+        with self.lock:
+            return dict(self.counts, entries=len(self.entries), bytes=self.total_bytes,
+                        dirty=len(self.dirty), max_entries=self.max_entries,
+                        max_bytes=self.max_bytes)
+
+
+class DeskService:
+    """
+    Request dispatcher over a WarmCache, plus the socket server around it.
+
+    handle() can be used directly (e.g. in tests); serve_forever() listens
+    on address, a Unix socket path or a (host, port) pair.
+    """
+
+    def __init__(self, data_dir: str = ".investigator-data", max_entries: int = 256,
+                 max_bytes: int = 256 * 1024 * 1024, flush_interval: float = 1.0):
+        self.desk = InvestigatorDesk(data_dir, preload=False)
+        self.cache = WarmCache(self.desk, max_entries, max_bytes, flush_interval)
+        self.server: Optional[socketserver.BaseServer] = None
+
+    def _require(self, investigation_id: str) -> Investigation:
+        inv = self.cache.get(investigation_id)
+        if inv is None:
+            raise ValueError(f"Investigation {investigation_id} not found")
+        return inv
+
+    def handle(self, request: Dict) -> Dict:
+        """Execute one request and return its response."""
+        op = request.get('op')
+        try:
+            with METRICS.timer("desk_service_request_seconds", op=op):
+                return {'ok': True, 'result': self._dispatch(op, request)}
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+
+    def _dispatch(self, op: str, request: Dict):
+        if op == 'ping':
+            return 'pong'
+        if op == 'get':
+            inv = self.cache.get(request['id'])
+            return inv.to_dict() if inv else None
+        if op == 'put':
+            self.cache.put(Investigation.from_dict(request['investigation']))
+            return True
+        if op == 'create':
+            # Check and insert under one lock so concurrent creates cannot both succeed
+            with self.cache.lock:
+                if self.cache.get(request['id']) is not None:
+                    raise ValueError(f"Investigation {request['id']} already exists")
+                inv = Investigation(request['id'], request['title'], request.get('description', ''))
+                self.cache.put(inv)
+                return inv.to_dict()
+        if op == 'list':
+            with self.cache.lock:
+                return sorted(set(self.desk.list_investigation_ids()) | set(self.cache.entries))
+        if op == 'report':
+            inv = self._require(request['id'])
+            with self.cache.lock:
+                return self.desk.generate_report(inv.investigation_id, investigation=inv)
+        if op == 'add_evidence':
+            inv = self._require(request['id'])
+            with self.cache.lock:
+                inv.add_evidence(request['source_id'], request['evidence_type'],
+                                 request['description'], request.get('source', ''))
+                self.cache.mark_dirty(inv.investigation_id)
+            return True
+        if op == 'add_note':
+            inv = self._require(request['id'])
+            with self.cache.lock:
+                inv.add_note(request['note'])
+                self.cache.mark_dirty(inv.investigation_id)
+            return True
+        if op == 'add_connection':
+            inv = self._require(request['id'])
+            with self.cache.lock:
+                inv.add_connection(request['source_id1'], request['source_id2'])
+                self.cache.mark_dirty(inv.investigation_id)
+            return True
+        if op == 'flush':
+            return self.cache.flush()
+        if op == 'stats':
+            return self.cache.stats()
+        raise ValueError(f"Unknown op: {op}")
+
+    def serve_forever(self, address: Address = DEFAULT_SOCKET):
+        """Serve requests until shutdown() is called; saves dirty data on exit."""
+        service = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    try:
+                        response = service.handle(json.loads(line))
+                    except ValueError as e:
+                        response = {'ok': False, 'error': f"Bad request: {e}"}
+                    self.wfile.write(json.dumps(response).encode('utf-8') + b"\n")
+                    self.wfile.flush()
+
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.remove(address)
+
+            class Server(socketserver.ThreadingUnixStreamServer):
+                daemon_threads = True
+        else:
+            class Server(socketserver.ThreadingTCPServer):
+                daemon_threads = True
+                allow_reuse_address = True
+
+        self.server = Server(address, Handler)
+        self.cache.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            self.cache.close()
+            if isinstance(address, str) and os.path.exists(address):
+                os.remove(address)
+
+    def shutdown(self):
+        """Stop serve_forever (call from another thread)."""
+        if self.server is not None:
+            self.server.shutdown()
+
+
+class DeskClient:
+    """Client for a running DeskService; keeps one connection open."""
+
+    def __init__(self, address: Address = DEFAULT_SOCKET, timeout: float = 30):
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(address)
+        self.rfile = self.sock.makefile('rb')
+
+    def close(self):
+        """Close the connection."""
+        self.rfile.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def call(self, op: str, **arguments):
+        """Send one request and return its result; raises ValueError on errors."""
+        arguments['op'] = op
+        self.sock.sendall(json.dumps(arguments).encode('utf-8') + b"\n")
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError("Desk service closed the connection")
+        response = json.loads(line)
+        if not response['ok']:
+            raise ValueError(response['error'])
+        return response['result']
+
+    def get_investigation(self, investigation_id: str) -> Optional[Investigation]:
+        """Fetch an investigation, or None if it does not exist."""
+        data = self.call('get', id=investigation_id)
+        return Investigation.from_dict(data) if data else None
+
+    def save_investigation(self, investigation: Investigation):
+        """Replace an investigation; the service writes it to disk shortly after."""
+        self.call('put', investigation=investigation.to_dict())
+
+    def create_investigation(self, investigation_id: str, title: str,
+                             description: str) -> Investigation:
+        return Investigation.from_dict(self.call('create', id=investigation_id, title=title,
+                                                 description=description))
+
+    def list_investigation_ids(self) -> List[str]:
+        """IDs of every investigation on disk."""
+        return self.call('list')
+
+    def generate_report(self, investigation_id: str) -> str:
+        return self.call('report', id=investigation_id)
+
+    def add_evidence(self, investigation_id: str, source_id: str, evidence_type: str,
+                     description: str, source: str = ""):
+        self.call('add_evidence', id=investigation_id, source_id=source_id,
+                  evidence_type=evidence_type, description=description, source=source)
+
+    def add_note(self, investigation_id: str, note: str):
+        self.call('add_note', id=investigation_id, note=note)
+
+    def add_connection(self, investigation_id: str, source_id1: str, source_id2: str):
+        self.call('add_connection', id=investigation_id, source_id1=source_id1,
+                  source_id2=source_id2)
+
+    def flush(self) -> int:
+        """Make the service save pending changes now; returns how many were saved."""
+        return self.call('flush')
+
+    def stats(self) -> Dict:
+        return self.call('stats')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the desk service until interrupted."""
+    parser = argparse.ArgumentParser(description="INVESTIGATOR-DESK warm cache service")
+    parser.add_argument("--data-dir", default=".investigator-data")
+    parser.add_argument("--socket", default=None, help=f"Unix socket path (default {DEFAULT_SOCKET})")
+    parser.add_argument("--port", type=int, help="listen on 127.0.0.1:PORT instead of a socket")
+    parser.add_argument("--max-entries", type=int, default=256)
+    parser.add_argument("--max-mb", type=float, default=256, help="cache memory limit in MiB")
+    parser.add_argument("--flush-interval", type=float, default=1.0, help="seconds between writes")
+    args = parser.parse_args(argv)
+
+    service = DeskService(args.data_dir, args.max_entries, int(args.max_mb * 1024 * 1024),
+                          args.flush_interval)
+    address: Address = ("127.0.0.1", args.port) if args.port else (
+        args.socket or os.path.join(args.data_dir, "desk.sock"))
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=service.shutdown).start())
+    print(f"Desk service listening on {address}", file=sys.stderr)
+    try:
+        service.serve_forever(address)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+ENTITY NORMALIZATION AND RESOLUTION INDEX FOR INVESTIGATOR-DESK
+
+Normalizes phones, addresses and names to canonical forms and keeps a
+persistent cross-investigation index from each canonical value to the
+sources and evidence it appears in.
+
+Usage:
+    from entity_index import EntityIndex
+    from investigator import InvestigatorDesk
+
+    desk = InvestigatorDesk()
+    index = EntityIndex()
+    desk.register_index(index)  # kept up to date on every save
+
+    # Where else have we seen this phone?
+    for hit in index.lookup('phone', "(602) 555-1234"):
+        print(hit['investigation_id'], hit['source_id'], hit['evidence_index'])
+"""
+
+import json
+import os
+import re
+import sys
+from typing import List, Dict, Optional, Set
+
+
+# Address words and their USPS-style abbreviations
+ADDRESS_ABBREVIATIONS = {
+    'STREET': 'ST', 'AVENUE': 'AVE', 'AV': 'AVE', 'ROAD': 'RD', 'DRIVE': 'DR',
+    'LANE': 'LN', 'BOULEVARD': 'BLVD', 'COURT': 'CT', 'PLACE': 'PL',
+    'CIRCLE': 'CIR', 'TERRACE': 'TER', 'HIGHWAY': 'HWY', 'PARKWAY': 'PKWY',
+    'TRAIL': 'TRL', 'SQUARE': 'SQ', 'APARTMENT': 'APT', 'SUITE': 'STE',
+    'NORTH': 'N', 'SOUTH': 'S', 'EAST': 'E', 'WEST': 'W',
+    'NORTHEAST': 'NE', 'NORTHWEST': 'NW', 'SOUTHEAST': 'SE', 'SOUTHWEST': 'SW',
+}
+
+NAME_TITLES = {'mr', 'mrs', 'ms', 'miss', 'dr'}
+
+PHONE_PATTERN = re.compile(r'(?<![\w-])(?:\+?1[-\s.]?)?\(?\d{3}\)?[-\s.]?\d{3}[-\s.]?\d{4}(?![\w-])')
+
+
+def normalize_phone(value: str, default_country: str = '1') -> Optional[str]:
+    """
+    Normalize a phone number to E.164 ("(602) 555-1234" -> "+16025551234").
+
+    Ten-digit numbers are assumed to be in default_country. Returns None if
+    the value does not look like a phone number.
+    """
+    value = str(value).strip()
+    digits = re.sub(r'\D', '', value)
+    if value.startswith('+') and 8 <= len(digits) <= 15:
+        return f"+{digits}"
+    if len(digits) == 10:
+        return f"+{default_country}{digits}"
+    if len(digits) == 11 and digits.startswith(default_country):
+        return f"+{digits}"
+    return None
+
+
+def normalize_address(value: str) -> Optional[str]:
+    """
+    Normalize a street address for matching.
+
+    Upper-cases, drops punctuation, abbreviates street types and
+    directions, and truncates ZIP+4 to the five-digit ZIP
+    ("123 Main Street, Phoenix, AZ 85001-1234" -> "123 MAIN ST PHOENIX AZ 85001").
+    """
+    text = re.sub(r'\b(\d{5})-\d{4}\b', r'\1', str(value).upper())
+    text = text.replace('#', ' APT ')
+    tokens = re.sub(r'[^\w\s]', ' ', text).split()
+    if not tokens:
+        return None
+    return ' '.join(ADDRESS_ABBREVIATIONS.get(tok, tok) for tok in tokens)
+
+
+def normalize_name(value: str) -> Optional[str]:
+    """
+    Normalize a person or business name for matching.
+
+    Lower-cases, drops punctuation and titles, and reorders
+    "Last, First" to "first last" ("DOE, John A." -> "john a doe").
+    """
+    text = str(value).strip()
+    if text.count(',') == 1:
+        last, first = text.split(',')
+        if first.strip() and ' ' not in last.strip():
+            text = f"{first} {last}"
+    tokens = [tok for tok in re.sub(r'[^\w\s]', ' ', text.lower()).split()
+              if tok not in NAME_TITLES]
+    if not tokens:
+        return None
+    return ' '.join(tokens)
+
+
+NORMALIZERS = {
+    'phone': normalize_phone,
+    'address': normalize_address,
+    'name': normalize_name,
+}
+
+# Evidence type -> (entity kind, record/field keys holding the value)
+EVIDENCE_ENTITY_KINDS = {
+    'Phone Number': ('phone', ('number', 'phone')),
+    'Address': ('address', ('address',)),
+    'Property': ('address', ('address',)),
+    'Associate': ('name', ('name',)),
+    'Business': ('name', ('name',)),
+}
+
+
+def normalize(kind: str, value: str) -> Optional[str]:
+    """Normalize a value of the given entity kind ('phone', 'address', 'name')."""
+    if kind not in NORMALIZERS:
+        raise ValueError(f"Unknown entity kind: {kind}. Known: {list(NORMALIZERS)}")
+    return NORMALIZERS[kind](value)
+
+
+def evidence_entities(evidence: Dict) -> List[tuple]:
+    """
+    Return the (kind, canonical value) pairs an evidence entry refers to.
+
+    Typed evidence (imported records and structured fields) is used when
+    present; phone numbers are also picked out of the free-text description.
+    """
+    entities = set()
+    kind_info = EVIDENCE_ENTITY_KINDS.get(evidence.get('type'))
+    if kind_info:
+        kind, keys = kind_info
+        if evidence.get('normalized'):
+            entities.add((kind, evidence['normalized']))
+        else:
+            for container in (evidence.get('fields'), evidence.get('record')):
+                if not isinstance(container, dict):
+                    continue
+                for key in keys:
+                    if container.get(key):
+                        canonical = normalize(kind, container[key])
+                        if canonical:
+                            entities.add((kind, canonical))
+    for match in PHONE_PATTERN.findall(evidence.get('description', '')):
+        canonical = normalize_phone(match)
+        if canonical:
+            entities.add(('phone', canonical))
+    return sorted(entities)
+
+
+class EntityIndex:
+    """
+    Persistent index from canonical entity values to where they were seen.
+
+    Keys are "<kind>:<canonical value>"; each maps to a list of
+    (investigation_id, source_id, evidence_index) references, so lookups
+    are a single dictionary access regardless of how much evidence exists.
+
+    Each investigation's references are stored as its own segment file,
+    so saving after one investigation changes rewrites only its segment.
+    All segments are merged in memory at startup. An entities.json
+    written by older versions is split into segments on first load.
+    """
+
+    # Single-file index of older versions
+    INDEX_FILE = "entities.json"
+    SEGMENT_DIR = "segments"
+
+    def __init__(self, index_dir: str = os.path.join(".investigator-data", "entity-index"),
+                 autosave: bool = True):
+        self.index_dir = index_dir
+        self.index_path = os.path.join(index_dir, self.INDEX_FILE)
+        self.segment_dir = os.path.join(index_dir, self.SEGMENT_DIR)
+        self.autosave = autosave
+        self.entries: Dict[str, List[List]] = {}
+        self.investigations: Dict[str, List[str]] = {}
+        # Investigations whose segment is out of date on disk
+        self._dirty: Set[str] = set()
+        os.makedirs(self.segment_dir, exist_ok=True)
+        self._load()
+
+    def _segment_path(self, investigation_id: str) -> str:
+        return os.path.join(self.segment_dir, f"{investigation_id}.json")
+
+    def _load(self):
+        """Merge every segment on disk into memory."""
+        for filename in sorted(os.listdir(self.segment_dir)):
+            if not filename.endswith('.json'):
+                continue
+            path = os.path.join(self.segment_dir, filename)
+            try:
+                with open(path, 'r') as f:
+                    segment = json.load(f)
+                self._add(segment['investigation_id'], segment['refs'])
+            except Exception as e:
+                print(f"Error loading entity segment {path}: {e}", file=sys.stderr)
+        if os.path.exists(self.index_path):
+            self._migrate_legacy()
+
+    def _migrate_legacy(self):
+        """Split a single-file entities.json into segments and remove it."""
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Error loading entity index {self.index_path}: {e}", file=sys.stderr)
+            return
+        refs: Dict[str, List[List]] = {inv_id: [] for inv_id in data.get('investigations', {})}
+        for key, hits in data.get('entries', {}).items():
+            for inv_id, source_id, index in hits:
+                refs.setdefault(inv_id, []).append([key, source_id, index])
+        for inv_id, inv_refs in refs.items():
+            if inv_id not in self.investigations:
+                self._add(inv_id, inv_refs)
+                self._dirty.add(inv_id)
+        self.save()
+        os.remove(self.index_path)
+
+    def _add(self, investigation_id: str, refs: List[List]):
+        keys = set()
+        for key, source_id, index in refs:
+            self.entries.setdefault(key, []).append([investigation_id, source_id, index])
+            keys.add(key)
+        self.investigations[investigation_id] = sorted(keys)
+
+    def save(self):
+        """Write the segments of investigations changed since the last save, atomically."""
+        for inv_id in sorted(self._dirty):
+            path = self._segment_path(inv_id)
+            if inv_id not in self.investigations:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            refs = [[key, ref[1], ref[2]] for key in self.investigations[inv_id]
+                    for ref in self.entries[key] if ref[0] == inv_id]
+            with open(path + ".tmp", 'w') as f:
+                json.dump({'investigation_id': inv_id, 'refs': refs}, f)
+            os.replace(path + ".tmp", path)
+        self._dirty.clear()
+
+    def _drop(self, investigation_id: str):
+        for key in self.investigations.pop(investigation_id, []):
+            refs = [ref for ref in self.entries.get(key, []) if ref[0] != investigation_id]
+            if refs:
+                self.entries[key] = refs
+            else:
+                self.entries.pop(key, None)
+        self._dirty.add(investigation_id)
+
+    def remove_investigation(self, investigation_id: str):
+        """Drop every reference to an investigation from the index."""
+        self._drop(investigation_id)
+        if self.autosave:
+            self.save()
+
+    def index_investigation(self, investigation) -> int:
+        """
+        (Re)index all evidence of an investigation.
+
+        Returns the number of distinct entities referenced by it.
+        """
+        self._drop(investigation.investigation_id)
+
+        inv_id = investigation.investigation_id
+        refs = []
+        for source_id, source in investigation.sources.items():
+            for i, evidence in enumerate(source.evidence):
+                for kind, canonical in evidence_entities(evidence):
+                    refs.append([f"{kind}:{canonical}", source_id, i])
+        self._add(inv_id, refs)
+
+        if self.autosave:
+            self.save()
+        return len(self.investigations[inv_id])
+
+    def lookup(self, kind: str, value: str) -> List[Dict]:
+        """Return every place a phone, address or name has been seen."""
+        canonical = normalize(kind, value)
+        if canonical is None:
+            return []
+        return [
+            {'investigation_id': inv_id, 'source_id': source_id, 'evidence_index': index}
+            for inv_id, source_id, index in self.entries.get(f"{kind}:{canonical}", [])
+        ]
+
+    def investigations_for(self, kind: str, value: str) -> List[str]:
+        """Return the IDs of investigations that mention an entity."""
+        return sorted({hit['investigation_id'] for hit in self.lookup(kind, value)})
@@ -9,8 +9,11 @@ gather evidence, and build comprehensive investigation cases.
 import json
 import os
 import sys
+import zlib
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
+
+from metrics import METRICS
 
 
 class AuthoritySource:
@@ -64,10 +67,14 @@ class Investigation:
         self.status = "active"
         self.sources: Dict[str, AuthoritySource] = {}
         self.notes: List[Dict] = []
+        self._timeline = None
     
     def add_authority_source(self, source: AuthoritySource):
         """Add a source of authority to this investigation."""
         self.sources[source.source_id] = source
+        if self._timeline is not None:
+            for i, evidence in enumerate(source.evidence):
+                self._timeline.add(evidence.get('timestamp', ''), 'evidence', source.source_id, i)
     
     def add_evidence(self, source_id: str, evidence_type: str, 
                      description: str, source_ref: str = ""):
@@ -82,6 +89,29 @@ class Investigation:
             'timestamp': datetime.now().isoformat()
         }
         self.sources[source_id].evidence.append(evidence)
+        if self._timeline is not None:
+            self._timeline.add(evidence['timestamp'], 'evidence', source_id,
+                               len(self.sources[source_id].evidence) - 1)
+    
+    def add_evidence_batch(self, source_id: str, evidence_list: List[Dict]) -> int:
+        """Append many evidence entries to an authority source in one step.
+        
+        Entries use the same keys as add_evidence; entries without a
+        timestamp share a single timestamp for the batch.
+        """
+        if source_id not in self.sources:
+            raise ValueError(f"Authority source {source_id} not found")
+        
+        timestamp = datetime.now().isoformat()
+        for evidence in evidence_list:
+            evidence.setdefault('timestamp', timestamp)
+        source_evidence = self.sources[source_id].evidence
+        first_index = len(source_evidence)
+        source_evidence.extend(evidence_list)
+        if self._timeline is not None:
+            for i, evidence in enumerate(evidence_list, first_index):
+                self._timeline.add(evidence['timestamp'], 'evidence', source_id, i)
+        return len(evidence_list)
     
     def add_connection(self, source_id1: str, source_id2: str):
         """Add a connection between two authority sources."""
@@ -93,12 +123,57 @@ class Investigation:
         if source_id1 not in self.sources[source_id2].connections:
             self.sources[source_id2].connections.append(source_id1)
     
+    def add_connections(self, source_id: str, other_ids: List[str]) -> int:
+        """Connect one authority source to many others in a single pass.
+        
+        Equivalent to calling add_connection for each ID, but checks for
+        existing links against a set so hubs with thousands of connections
+        stay linear. Returns the number of new connections made.
+        """
+        if source_id not in self.sources:
+            raise ValueError(f"Authority source {source_id} not found")
+        missing = [oid for oid in other_ids if oid not in self.sources]
+        if missing:
+            raise ValueError(f"Authority sources not found: {', '.join(missing)}")
+        
+        hub = self.sources[source_id]
+        linked = set(hub.connections)
+        added = 0
+        for other_id in other_ids:
+            if other_id == source_id or other_id in linked:
+                continue
+            hub.connections.append(other_id)
+            linked.add(other_id)
+            other = self.sources[other_id]
+            if source_id not in other.connections:
+                other.connections.append(source_id)
+            added += 1
+        return added
+    
     def add_note(self, note: str):
         """Add an investigation note."""
         self.notes.append({
             'timestamp': datetime.now().isoformat(),
             'note': note
         })
+        if self._timeline is not None:
+            self._timeline.add(self.notes[-1]['timestamp'], 'note', None, len(self.notes) - 1)
+    
+    def timeline(self):
+        """Return the chronologically sorted timeline of evidence and notes.
+        
+        Built on first use and then kept current by add_authority_source,
+        add_evidence, add_evidence_batch and add_note. Changes made by editing the
+        evidence or notes lists directly require rebuild_timeline().
+        """
+        if self._timeline is None:
+            from timeline_index import Timeline
+            self._timeline = Timeline.from_investigation(self)
+        return self._timeline
+    
+    def rebuild_timeline(self):
+        """Discard the cached timeline so the next timeline() call rebuilds it."""
+        self._timeline = None
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for serialization."""
@@ -131,14 +206,34 @@ class Investigation:
         return inv
 
 
+# Investigations are stored as <data_dir>/<shard>/<id>.json, where shard is
+# the low byte of the ID's CRC-32 in hex, so no directory holds more than
+# 1/256th of the cases and a path never needs a directory scan.
+SHARD_COUNT = 256
+
+
+def shard_for(investigation_id: str) -> str:
+    """Shard subdirectory name for an investigation ID."""
+    return f"{zlib.crc32(investigation_id.encode('utf-8')) % SHARD_COUNT:02x}"
+
+
+def _is_shard_name(name: str) -> bool:
+    return len(name) == 2 and all(c in "0123456789abcdef" for c in name)
+
+
 class InvestigatorDesk:
     """Main application for managing investigations."""
     
-    def __init__(self, data_dir: str = ".investigator-data"):
+    def __init__(self, data_dir: str = ".investigator-data", preload: bool = True,
+                 max_workers: int = 8):
         self.data_dir = data_dir
+        self.max_workers = max_workers
         self.investigations: Dict[str, Investigation] = {}
+        self.indexes: List = []
         self._ensure_data_dir()
-        self._load_investigations()
+        self.migrate_flat_layout()
+        if preload:
+            self._load_investigations()
     
     def _ensure_data_dir(self):
         """Ensure the data directory exists."""
@@ -147,29 +242,124 @@ class InvestigatorDesk:
     
     def _get_investigation_file(self, investigation_id: str) -> str:
         """Get the file path for an investigation."""
-        return os.path.join(self.data_dir, f"{investigation_id}.json")
+        return os.path.join(self.data_dir, shard_for(investigation_id), f"{investigation_id}.json")
+    
+    def migrate_flat_layout(self) -> int:
+        """Move investigations saved by older versions (<data_dir>/<id>.json)
+        into their shard directories.
+        
+        Runs on every start; it only lists the top level of data_dir.
+        Returns the number of files moved.
+        """
+        moved = 0
+        for filename in os.listdir(self.data_dir):
+            path = os.path.join(self.data_dir, filename)
+            if not filename.endswith('.json') or not os.path.isfile(path):
+                continue
+            target = self._get_investigation_file(filename[:-5])
+            if os.path.exists(target):
+                print(f"Not migrating {filename}: {target} already exists", file=sys.stderr)
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+            moved += 1
+        if moved:
+            print(f"Migrated {moved} investigations to the sharded layout in {self.data_dir}",
+                  file=sys.stderr)
+        return moved
+    
+    def _shards(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.data_dir)
+                      if _is_shard_name(name) and os.path.isdir(os.path.join(self.data_dir, name)))
+    
+    def _map_shards(self, func) -> List:
+        """Apply func to every shard name, in parallel when max_workers > 1."""
+        shards = self._shards()
+        if self.max_workers <= 1 or len(shards) <= 1:
+            return [func(shard) for shard in shards]
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(func, shards))
+    
+    def _list_shard(self, shard: str) -> List[str]:
+        return [filename[:-5] for filename in os.listdir(os.path.join(self.data_dir, shard))
+                if filename.endswith('.json')]
+    
+    def _load_shard(self, shard: str) -> List[Investigation]:
+        loaded = []
+        for investigation_id in self._list_shard(shard):
+            filepath = os.path.join(self.data_dir, shard, f"{investigation_id}.json")
+            try:
+                with open(filepath, 'r') as f:
+                    loaded.append(Investigation.from_dict(json.load(f)))
+                if METRICS.enabled:
+                    METRICS.inc("desk_bytes_read_total", os.path.getsize(filepath))
+                    METRICS.inc("desk_investigations_loaded_total")
+            except Exception as e:
+                print(f"Error loading {filepath}: {e}", file=sys.stderr)
+        return loaded
     
     def _load_investigations(self):
-        """Load all investigations from disk."""
+        """Load all investigations from disk, one shard per worker."""
         if not os.path.exists(self.data_dir):
             return
         
-        for filename in os.listdir(self.data_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.data_dir, filename)
-                try:
-                    with open(filepath, 'r') as f:
-                        data = json.load(f)
-                        inv = Investigation.from_dict(data)
-                        self.investigations[inv.investigation_id] = inv
-                except Exception as e:
-                    print(f"Error loading {filename}: {e}", file=sys.stderr)
+        with METRICS.timer("desk_load_seconds"):
+            for loaded in self._map_shards(self._load_shard):
+                for inv in loaded:
+                    self.investigations[inv.investigation_id] = inv
+    
+    def list_investigation_ids(self) -> List[str]:
+        """IDs of every investigation on disk, without loading them."""
+        return sorted(inv_id for ids in self._map_shards(self._list_shard) for inv_id in ids)
+    
+    def load_investigation(self, investigation_id: str) -> Optional[Investigation]:
+        """Read one investigation from disk, or None if it does not exist.
+        
+        The result is not added to self.investigations; callers that keep
+        their own cache (see desk_service) decide what stays in memory.
+        """
+        filepath = self._get_investigation_file(investigation_id)
+        if not os.path.exists(filepath):
+            return None
+        with open(filepath, 'r') as f:
+            inv = Investigation.from_dict(json.load(f))
+        METRICS.inc("desk_bytes_read_total", os.path.getsize(filepath))
+        return inv
     
     def save_investigation(self, investigation: Investigation):
         """Save an investigation to disk."""
         filepath = self._get_investigation_file(investigation.investigation_id)
-        with open(filepath, 'w') as f:
-            json.dump(investigation.to_dict(), f, indent=2)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with METRICS.timer("desk_save_seconds"):
+            text = json.dumps(investigation.to_dict(), indent=2)
+            with open(filepath, 'w') as f:
+                f.write(text)
+        METRICS.inc("desk_bytes_written_total", len(text))
+        for index in self.indexes:
+            with METRICS.timer("desk_index_seconds", index=type(index).__name__):
+                index.index_investigation(investigation)
+    
+    def register_index(self, index, build: bool = True):
+        """Keep an index up to date on every save_investigation.
+        
+        The index must provide index_investigation(investigation). With
+        build=True all currently loaded investigations are indexed now; an
+        index with an autosave attribute has it switched off during the
+        build and its save() called once at the end.
+        """
+        self.indexes.append(index)
+        if build:
+            autosave = getattr(index, 'autosave', False)
+            if autosave:
+                index.autosave = False
+            try:
+                for inv in self.investigations.values():
+                    index.index_investigation(inv)
+            finally:
+                if autosave:
+                    index.autosave = True
+                    index.save()
     
     def create_investigation(self, investigation_id: str, title: str, 
                            description: str) -> Investigation:
@@ -190,9 +380,16 @@ class InvestigatorDesk:
         """List all investigations."""
         return list(self.investigations.values())
     
-    def generate_report(self, investigation_id: str) -> str:
-        """Generate a report for an investigation."""
-        inv = self.get_investigation(investigation_id)
+    def generate_report(self, investigation_id: str,
+                        investigation: Optional[Investigation] = None) -> str:
+        """Generate a report for an investigation.
+        
+        Args:
+            investigation_id: ID of the investigation
+            investigation: Investigation to report on instead of looking it
+                up, for callers that keep investigations outside the desk
+        """
+        inv = investigation or self.get_investigation(investigation_id)
         if not inv:
             return f"Investigation {investigation_id} not found"
         
@@ -335,106 +532,20 @@ def main():
 # ============================================================
 # PROVER9 OBSERVER PATCH HOLOGRAPHY MODULE
 # Issue #5 - Added 2026-04-13
+# Implemented in prover9.py, imported on first use so that data-only
+# callers never load subprocess/asyncio.
 # ============================================================
-import subprocess
-import shutil
-
-class Prover9Runner:
-    """Runs Prover9 formal logic proofs for Observer Patch Holography.
-    Handles Termux path resolution and Evidence directory auto-creation.
-    """
-
-    TERMUX_HOME = os.path.expanduser("~")
-    EVIDENCE_BASE = os.path.join(os.path.expanduser("~"), "Evidence")
-
-    def __init__(self, audit_id: str = "Audit_P9-29621"):
-        self.audit_id = audit_id
-        self.evidence_dir = os.path.join(self.EVIDENCE_BASE, audit_id)
-        self._ensure_evidence_dir()
-
-    def _ensure_evidence_dir(self):
-        """Auto-create Evidence/Audit directory (fixes Issue #5 mkdir requirement)."""
-        os.makedirs(self.evidence_dir, exist_ok=True)
-        print(f"[Prover9Runner] Evidence dir ready: {self.evidence_dir}")
-
-    def _resolve_pv9_path(self, filename: str) -> str:
-        """Resolve .pv9 file path safely in Termux environment."""
-        if os.path.isabs(filename):
-            return filename
-        # Check current dir, then TERMUX_HOME
-        for base in [os.getcwd(), self.TERMUX_HOME, self.evidence_dir]:
-            candidate = os.path.join(base, filename)
-            if os.path.exists(candidate):
-                return candidate
-        raise FileNotFoundError(
-            f"[Prover9Runner] Cannot stat '{filename}': No such file.\n"
-            f"Searched: cwd, {self.TERMUX_HOME}, {self.evidence_dir}\n"
-            "Hint: Place your .pv9 file in ~/Evidence/ or pass absolute path."
-        )
+PROVER9_EXPORTS = ("ProofCache", "ProofAuditLog", "ProofSupervisor", "Prover9Runner")
 
-    def run_proof(self, pv9_file: str, timeout: int = 60) -> Dict:
-        """Run a Prover9 proof on a .pv9 input file.
-        Returns a result dict with stdout, stderr, returncode, and output path.
-        """
-        if not shutil.which("prover9"):
-            return {
-                "status": "error",
-                "message": "prover9 not found. Install via: pkg install prover9",
-                "output": None
-            }
-
-        resolved = self._resolve_pv9_path(pv9_file)
-        base_name = os.path.splitext(os.path.basename(resolved))[0]
-        output_file = os.path.join(self.evidence_dir, f"{base_name}_result.txt")
-
-        try:
-            result = subprocess.run(
-                ["prover9", "-f", resolved],
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
-            with open(output_file, "w") as f:
-                f.write(f"# Prover9 Output - {datetime.now().isoformat()}\n")
-                f.write(f"# Input: {resolved}\n\n")
-                f.write(result.stdout)
-                if result.stderr:
-                    f.write("\n# STDERR:\n")
-                    f.write(result.stderr)
-
-            return {
-                "status": "proved" if result.returncode == 0 else "failed",
-                "returncode": result.returncode,
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "output_file": output_file
-            }
-        except subprocess.TimeoutExpired:
-            return {"status": "timeout", "message": f"Proof timed out after {timeout}s"}
-        except Exception as e:
-            return {"status": "error", "message": str(e)}
-
-    def run_observer_patch_holography(self, pv9_file: str) -> Dict:
-        """Run Observer Patch Holography proof and log to Evidence audit dir."""
-        print(f"[ObserverPatch] Running holographic proof: {pv9_file}")
-        result = self.run_proof(pv9_file)
-        log_path = os.path.join(self.evidence_dir, "observer_patch_log.json")
-        entry = {
-            "timestamp": datetime.now().isoformat(),
-            "pv9_file": pv9_file,
-            "result": result
-        }
-        log = []
-        if os.path.exists(log_path):
-            with open(log_path) as f:
-                log = json.load(f)
-        log.append(entry)
-        with open(log_path, "w") as f:
-            json.dump(log, f, indent=2)
-        print(f"[ObserverPatch] Result: {result.get('status')} | Log: {log_path}")
-        return result
 
+def __getattr__(name: str):
+    """Resolve the Prover9 classes lazily (from investigator import Prover9Runner)."""
+    if name in PROVER9_EXPORTS:
+        import prover9
+        return getattr(prover9, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    from profiling import run_entry_point
+    sys.exit(run_entry_point(main))
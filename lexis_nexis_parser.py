@@ -23,30 +23,357 @@ import re
 import csv
 import sys
 import os
+import hashlib
+import importlib
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Callable
 from pathlib import Path
 
-# Import from investigator.py
-try:
-    from investigator import AuthoritySource, Investigation
-except ImportError:
-    print("Warning: investigator.py not found.", file=sys.stderr)
-    AuthoritySource = None
-    Investigation = None
+from entity_index import normalize_address, normalize_phone, normalize_name
+from metrics import METRICS
+
+
+# Bump whenever the extraction rules change so cached parses are invalidated.
+PARSER_VERSION = "1.2"
+
+# Records per category kept by a default (summary) import
+SUMMARY_LIMIT = 10
+
+# (data key, source ID prefix, source name suffix, description label,
+#  authority type, evidence type) for each imported record category
+IMPORT_CATEGORIES = [
+    ('addresses', 'ADDR', 'Address History', 'Known addresses', 'Address Records', 'Address'),
+    ('phones', 'PHONE', 'Phone Numbers', 'Known phone numbers', 'Contact Records', 'Phone Number'),
+    ('associates', 'ASSOC', 'Associates & Relatives', 'Known associates', 'Associate Network', 'Associate'),
+    ('court_records', 'COURT', 'Court Records', 'Court records', 'Legal Records', 'Court Record'),
+    ('liens_judgments', 'LIEN', 'Liens & Judgments', 'Financial records', 'Financial Records', 'Lien/Judgment'),
+]
+
+# Data key -> (source ID prefix, authority type, evidence type, name field)
+# for records imported as individual linked entities in structured mode
+ENTITY_CATEGORIES = {
+    'associates': ('ASSOC', 'Associate', 'Associate', 'name'),
+    'businesses': ('BIZ', 'Business Affiliation', 'Business', 'name'),
+    'properties': ('PROP', 'Property Record', 'Property', 'address'),
+}
+
+# Record fields stored as numbers by structured import
+INTEGER_FIELDS = {'age', 'square_feet', 'year_built'}
+NUMERIC_FIELDS = INTEGER_FIELDS | {'value', 'price', 'amount', 'sale_price',
+                                   'assessed_value', 'market_value'}
+
+# Evidence type -> (record field shown, description label)
+EVIDENCE_DISPLAY = {
+    'Address': ('address', 'Address'),
+    'Phone Number': ('number', 'Phone'),
+    'Associate': ('name', 'Associate'),
+    'Court Record': ('case_number', 'Record'),
+    'Lien/Judgment': ('description', 'Record'),
+}
+
+
+class ImportLedger:
+    """
+    Persistent ledger of Lexis Nexis imports keyed by file content hash.
+    
+    Records which investigations each report has already been imported into
+    and caches the parsed data for each (content hash, parser version) pair,
+    so a re-exported or forwarded copy of the same report is never re-parsed.
+    """
+    
+    INDEX_FILE = "ledger.json"
+    PARSED_DIR = "parsed"
+    
+    def __init__(self, ledger_dir: str = os.path.join(".investigator-data", "lexis-ledger")):
+        self.ledger_dir = ledger_dir
+        self.index_path = os.path.join(ledger_dir, self.INDEX_FILE)
+        self.parsed_dir = os.path.join(ledger_dir, self.PARSED_DIR)
+        os.makedirs(self.parsed_dir, exist_ok=True)
+        self.entries: Dict[str, Dict] = {}
+        self.file_hashes: Dict[str, Dict] = {}
+        self._load()
+    
+    def _load(self):
+        """Load the ledger index from disk."""
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+            self.entries = data.get('entries', {})
+            self.file_hashes = data.get('file_hashes', {})
+        except Exception as e:
+            print(f"Error loading import ledger {self.index_path}: {e}", file=sys.stderr)
+    
+    def _save(self):
+        """Write the ledger index atomically."""
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'entries': self.entries, 'file_hashes': self.file_hashes}, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+    
+    @staticmethod
+    def _key(file_hash: str, parser_version: str) -> str:
+        return f"{file_hash}:{parser_version}"
+    
+    def hash_file(self, file_path: str) -> str:
+        """
+        Return the SHA-256 of a file's contents.
+        
+        Hashes are remembered by (path, size, mtime) so unchanged files on
+        disk are not re-read on every import.
+        """
+        stat = os.stat(file_path)
+        abs_path = os.path.abspath(file_path)
+        cached = self.file_hashes.get(abs_path)
+        if cached and cached['size'] == stat.st_size and cached['mtime'] == stat.st_mtime:
+            return cached['sha256']
+        
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        file_hash = digest.hexdigest()
+        self.file_hashes[abs_path] = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha256': file_hash
+        }
+        return file_hash
+    
+    def find_import(self, file_hash: str, parser_version: str,
+                    investigation_id: str, mode: str = 'summary') -> Optional[Dict]:
+        """Return the import record for this report, investigation and mode, if any."""
+        entry = self.entries.get(self._key(file_hash, parser_version))
+        if not entry:
+            return None
+        for record in entry['imports']:
+            if (record['investigation_id'] == investigation_id
+                    and record.get('mode', 'summary') == mode):
+                return record
+        return None
+    
+    def _parsed_path(self, file_hash: str, parser_version: str) -> str:
+        return os.path.join(self.parsed_dir, f"{file_hash}-{parser_version}.json")
+    
+    def load_parsed(self, file_hash: str, parser_version: str) -> Optional[Dict]:
+        """Return cached parse results, or None when this report must be parsed."""
+        path = self._parsed_path(file_hash, parser_version)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading cached parse {path}: {e}", file=sys.stderr)
+            return None
+    
+    def store_parsed(self, file_hash: str, parser_version: str, data: Dict):
+        """Cache parse results for a report."""
+        path = self._parsed_path(file_hash, parser_version)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    
+    def record_import(self, file_hash: str, parser_version: str, investigation_id: str,
+                      file_path: str, source_ids: List[str], mode: str = 'summary'):
+        """Record that a report was imported into an investigation."""
+        key = self._key(file_hash, parser_version)
+        entry = self.entries.setdefault(key, {
+            'file_hash': file_hash,
+            'parser_version': parser_version,
+            'imports': []
+        })
+        entry['imports'].append({
+            'investigation_id': investigation_id,
+            'file_path': file_path,
+            'source_ids': source_ids,
+            'mode': mode,
+            'timestamp': datetime.now().isoformat()
+        })
+        self._save()
+
+
+# Optional backend modules, resolved on first use: name -> module or None
+_optional_modules: Dict[str, Any] = {}
+
+
+def optional_import(module_name: str, install_hint: str = "") -> Any:
+    """
+    Import an optional dependency once and cache the outcome.
+    
+    Returns the module, or None if it is not installed. The missing-module
+    warning is printed only on the first failed attempt.
+    """
+    if module_name not in _optional_modules:
+        try:
+            _optional_modules[module_name] = importlib.import_module(module_name)
+        except ImportError:
+            _optional_modules[module_name] = None
+            if install_hint:
+                print(f"Warning: {module_name} not available. {install_hint}", file=sys.stderr)
+    return _optional_modules[module_name]
+
+
+def _investigator():
+    """Import investigator.py on first use; returns the module or None."""
+    return optional_import('investigator', "Ensure investigator.py is in the same directory.")
+
+
+def __getattr__(name: str):
+    # AuthoritySource and Investigation stay importable from this module
+    # without loading investigator.py at import time (None if it is missing)
+    if name in ('AuthoritySource', 'Investigation'):
+        investigator = _investigator()
+        return getattr(investigator, name) if investigator is not None else None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class FormatHandler:
+    """
+    A registered report format.
+    
+    parse(parser, file_path) returns the parsed data dict. sniff(head), if
+    given, receives the first SNIFF_BYTES of the file and returns True when
+    the content is in this format regardless of the file extension.
+    """
+    
+    def __init__(self, name: str, extensions: List[str],
+                 parse: Callable[['LexisNexisParser', str], Dict],
+                 sniff: Optional[Callable[[bytes], bool]] = None):
+        self.name = name
+        self.extensions = [ext.lower() for ext in extensions]
+        self.parse = parse
+        self.sniff = sniff
+
+
+# Registered handlers in registration order; later registrations win
+FORMAT_HANDLERS: Dict[str, FormatHandler] = {}
+
+# Bytes read from the start of a file for content sniffing
+SNIFF_BYTES = 4096
+
+# Entry point group third-party packages use to register format handlers
+PLUGIN_GROUP = "investigator_desk.lexis_formats"
+_plugins_loaded = False
+
+
+def register_format(name: str, extensions: List[str],
+                    parse: Callable[['LexisNexisParser', str], Dict],
+                    sniff: Optional[Callable[[bytes], bool]] = None) -> FormatHandler:
+    """
+    Register (or replace) a report format handler.
+    
+    Plugins call this directly, or expose a function taking no arguments
+    under the PLUGIN_GROUP entry point that calls it; those are loaded the
+    first time a format is resolved.
+    """
+    handler = FormatHandler(name, extensions, parse, sniff)
+    FORMAT_HANDLERS.pop(name, None)
+    FORMAT_HANDLERS[name] = handler
+    return handler
+
+
+def _load_plugins():
+    """Run every PLUGIN_GROUP entry point once."""
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+    try:
+        from importlib.metadata import entry_points
+        eps = entry_points()
+        group = eps.select(group=PLUGIN_GROUP) if hasattr(eps, 'select') else eps.get(PLUGIN_GROUP, [])
+    except Exception:
+        return
+    for ep in group:
+        try:
+            ep.load()()
+        except Exception as e:
+            print(f"Error loading format plugin {ep.name}: {e}", file=sys.stderr)
+
+
+def detect_formats(file_path: str) -> List[FormatHandler]:
+    """
+    Candidate handlers for a report file, most likely first.
+    
+    Handlers whose content sniffer matches come first, newest registration
+    first, so a PDF saved as .txt is still parsed as a PDF; the handler for
+    the file extension follows as the fallback when a sniffed handler
+    cannot parse the file.
+    """
+    _load_plugins()
+    with open(file_path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+    
+    handlers = list(FORMAT_HANDLERS.values())[::-1]
+    candidates = [handler for handler in handlers
+                  if handler.sniff is not None and handler.sniff(head)]
+    
+    file_ext = Path(file_path).suffix.lower()
+    for handler in handlers:
+        if file_ext in handler.extensions:
+            if handler not in candidates:
+                candidates.append(handler)
+            break
+    
+    if not candidates:
+        supported = [ext for h in FORMAT_HANDLERS.values() for ext in h.extensions]
+        raise ValueError(f"Unsupported format: {file_ext}. Supported: {supported}")
+    return candidates
+
+
+def detect_format(file_path: str) -> FormatHandler:
+    """Resolve the most likely handler for a report file (see detect_formats)."""
+    return detect_formats(file_path)[0]
+
+
+def _sniff_pdf(head: bytes) -> bool:
+    return head.startswith(b'%PDF-')
+
+
+def _sniff_json(head: bytes) -> bool:
+    text = head[3:] if head.startswith(b'\xef\xbb\xbf') else head
+    if len(head) < SNIFF_BYTES:
+        # The whole file was read: confirm by parsing it
+        try:
+            json.loads(text)
+            return True
+        except ValueError:
+            return False
+    return re.match(rb'\s*(?:\{\s*(?:"|\})|\[\s*[\[\{"\]])', text) is not None
+
+
+def _sniff_html(head: bytes) -> bool:
+    start = head.lstrip(b'\xef\xbb\xbf \t\r\n')[:512].lower()
+    return start.startswith((b'<!doctype html', b'<html'))
 
 
 class LexisNexisParser:
     """
     Multi-format parser for Lexis Nexis reports.
-    Handles PDF, JSON, plain text, and CSV formats.
+    Handles PDF, JSON, plain text, CSV and HTML formats, plus any format
+    registered with register_format().
     """
     
-    def __init__(self):
-        self.supported_formats = ['.pdf', '.json', '.txt', '.csv', '.html']
+    def __init__(self, ledger: Optional[ImportLedger] = None):
+        """
+        Args:
+            ledger: Optional ImportLedger used to skip reports that were already
+                imported and to reuse cached parse results
+        """
+        self.ledger = ledger
+    
+    @property
+    def supported_formats(self) -> List[str]:
+        """File extensions of all registered format handlers."""
+        _load_plugins()
+        return [ext for handler in FORMAT_HANDLERS.values() for ext in handler.extensions]
         
     def parse_and_import(self, investigation: 'Investigation', file_path: str, 
-                        subject_name: Optional[str] = None) -> int:
+                        subject_name: Optional[str] = None, lossless: bool = False,
+                        structured: bool = False) -> int:
         """
         Parse a Lexis Nexis report and import into investigation.
         
@@ -54,44 +381,83 @@ class LexisNexisParser:
             investigation: Investigation object to import into
             file_path: Path to Lexis Nexis report file
             subject_name: Name of subject (extracted from filename if not provided)
+            lossless: Store every extracted record instead of the first SUMMARY_LIMIT
+            structured: Create one linked source per associate, business and property
         
         Returns:
-            Number of authority sources added
+            Number of authority sources added (0 if the ledger shows this report
+            was already imported into the investigation)
         """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Report file not found: {file_path}")
         
-        file_ext = Path(file_path).suffix.lower()
-        
-        if file_ext not in self.supported_formats:
-            raise ValueError(f"Unsupported format: {file_ext}. Supported: {self.supported_formats}")
+        candidates = detect_formats(file_path)
         
         # Extract subject name from filename if not provided
         if not subject_name:
             subject_name = Path(file_path).stem.replace('_', ' ').replace('-', ' ')
         
-        print(f"Parsing Lexis Nexis report: {file_path}")
-        print(f"Subject: {subject_name}")
-        
-        # Route to appropriate parser
-        if file_ext == '.json':
-            data = self._parse_json(file_path)
-        elif file_ext == '.csv':
-            data = self._parse_csv(file_path)
-        elif file_ext == '.txt':
-            data = self._parse_text(file_path)
-        elif file_ext == '.pdf':
-            data = self._parse_pdf(file_path)
-        elif file_ext == '.html':
-            data = self._parse_html(file_path)
+        mode = 'lossless' if lossless else 'summary'
+        if structured:
+            mode += '+structured'
+        file_hash = None
+        data = None
+        if self.ledger is not None:
+            file_hash = self.ledger.hash_file(file_path)
+            previous = self.ledger.find_import(file_hash, PARSER_VERSION,
+                                              investigation.investigation_id, mode)
+            if previous:
+                print(f"Skipping {file_path}: already imported into "
+                      f"{investigation.investigation_id} on {previous['timestamp']}")
+                return 0
+            data = self.ledger.load_parsed(file_hash, PARSER_VERSION)
+            METRICS.inc("lexis_parse_cache_requests_total", result="miss" if data is None else "hit")
+        
+        if data is None:
+            print(f"Parsing Lexis Nexis report: {file_path}")
+            with METRICS.timer("lexis_parse_seconds", format=candidates[0].name):
+                data = self._parse_file(file_path, candidates)
+            if self.ledger is not None:
+                self.ledger.store_parsed(file_hash, PARSER_VERSION, data)
         else:
-            data = {}
+            print(f"Using cached parse of Lexis Nexis report: {file_path}")
+        print(f"Subject: {subject_name}")
         
         # Import parsed data into investigation
-        added_count = self._import_to_investigation(investigation, data, subject_name, file_path)
+        existing_ids = set(investigation.sources)
+        added_count = self._import_to_investigation(investigation, data, subject_name, file_path,
+                                                    lossless=lossless, structured=structured)
+        
+        if self.ledger is not None:
+            new_ids = [sid for sid in investigation.sources if sid not in existing_ids]
+            self.ledger.record_import(file_hash, PARSER_VERSION, investigation.investigation_id,
+                                      file_path, new_ids, mode)
         
         return added_count
     
+    def _parse_file(self, file_path: str,
+                    candidates: Optional[List[FormatHandler]] = None) -> Dict:
+        """
+        Route a report file to the handler for its format.
+        
+        If a handler chosen by content sniffing fails, the next candidate
+        (ultimately the handler for the file extension) is tried.
+        
+        Args:
+            file_path: Report file to parse
+            candidates: Result of detect_formats(file_path), if already known
+        """
+        if candidates is None:
+            candidates = detect_formats(file_path)
+        for i, candidate in enumerate(candidates):
+            try:
+                return candidate.parse(self, file_path)
+            except Exception as e:
+                if i == len(candidates) - 1:
+                    raise
+                print(f"Could not parse {file_path} as {candidate.name} ({e}); "
+                      f"trying {candidates[i + 1].name}", file=sys.stderr)
+    
     def _parse_json(self, file_path: str) -> Dict:
         """
         Parse JSON format Lexis Nexis report.
@@ -166,23 +532,22 @@ class LexisNexisParser:
         Parse PDF Lexis Nexis report.
         Requires PyPDF2 or pdfplumber. Falls back to text extraction.
         """
-        try:
-            import PyPDF2
+        PyPDF2 = optional_import('PyPDF2')
+        if PyPDF2 is not None:
             text = ""
             with open(file_path, 'rb') as f:
                 reader = PyPDF2.PdfReader(f)
                 for page in reader.pages:
                     text += page.extract_text() + "\n"
-        except ImportError:
-            try:
-                import pdfplumber
-                text = ""
-                with pdfplumber.open(file_path) as pdf:
-                    for page in pdf.pages:
-                        text += page.extract_text() + "\n"
-            except ImportError:
-                print("Warning: PDF parsing requires PyPDF2 or pdfplumber. Install with: pip install PyPDF2", file=sys.stderr)
+        else:
+            pdfplumber = optional_import(
+                'pdfplumber', "PDF parsing requires PyPDF2 or pdfplumber. Install with: pip install PyPDF2")
+            if pdfplumber is None:
                 return {'raw_text': '[PDF parsing library not available]'}
+            text = ""
+            with pdfplumber.open(file_path) as pdf:
+                for page in pdf.pages:
+                    text += page.extract_text() + "\n"
         
         # Parse extracted text
         return self._parse_text_content(text)
@@ -191,30 +556,30 @@ class LexisNexisParser:
         """
         Parse HTML format Lexis Nexis report.
         """
-        try:
-            from bs4 import BeautifulSoup
-            with open(file_path, 'r', encoding='utf-8') as f:
-                soup = BeautifulSoup(f.read(), 'html.parser')
-            text = soup.get_text()
-            return self._parse_text_content(text)
-        except ImportError:
-            print("Warning: HTML parsing requires beautifulsoup4. Install with: pip install beautifulsoup4", file=sys.stderr)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
-            return {'raw_text': text}
+        bs4 = optional_import(
+            'bs4', "HTML parsing requires beautifulsoup4. Install with: pip install beautifulsoup4")
+        with open(file_path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        if bs4 is None:
+            return {'raw_text': html}
+        text = bs4.BeautifulSoup(html, 'html.parser').get_text()
+        return self._parse_text_content(text)
     
     def _parse_text_content(self, text: str) -> Dict:
         """
         Parse extracted text content from any source.
         """
-        return {
-            'addresses': self._extract_addresses(text),
-            'phones': self._extract_phones(text),
-            'associates': self._extract_associates(text),
-            'court_records': self._extract_court_records(text),
-            'liens_judgments': self._extract_liens_judgments(text),
-            'raw_text': text
-        }
+        METRICS.inc("lexis_text_bytes_total", len(text))
+        extracted = {}
+        for key, extractor in (('addresses', self._extract_addresses),
+                               ('phones', self._extract_phones),
+                               ('associates', self._extract_associates),
+                               ('court_records', self._extract_court_records),
+                               ('liens_judgments', self._extract_liens_judgments)):
+            with METRICS.timer("lexis_extractor_seconds", extractor=key):
+                extracted[key] = extractor(text)
+        extracted['raw_text'] = text
+        return extracted
     
     def _extract_addresses(self, text: str) -> List[Dict]:
         """
@@ -226,9 +591,15 @@ class LexisNexisParser:
         pattern = r'(\d+\s+[\w\s]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd|Court|Ct|Way|Place|Pl)[\w\s,]*[A-Z]{2}\s+\d{5}(?:-\d{4})?)'
         matches = re.findall(pattern, text, re.IGNORECASE)
         
+        seen = set()
         for match in matches:
+            normalized = normalize_address(match)
+            if normalized in seen:
+                continue
+            seen.add(normalized)
             addresses.append({
                 'address': match.strip(),
+                'normalized': normalized,
                 'source': 'Extracted from report'
             })
         
@@ -246,11 +617,18 @@ class LexisNexisParser:
             r'\d{3}[-\s.]\d{3}[-\s.]\d{4}',  # 123.456.7890
         ]
         
+        # Both patterns match most numbers; keep one entry per E.164 number
+        seen = set()
         for pattern in patterns:
             matches = re.findall(pattern, text)
             for match in matches:
+                normalized = normalize_phone(match) or match.strip()
+                if normalized in seen:
+                    continue
+                seen.add(normalized)
                 phones.append({
                     'number': match.strip(),
+                    'normalized': normalized,
                     'type': 'Unknown'
                 })
         
@@ -266,13 +644,19 @@ class LexisNexisParser:
         sections = re.split(r'(?:Associates?|Relatives?|Known Associates|Possible Relatives):', text, flags=re.IGNORECASE)
         
         if len(sections) > 1:
+            seen = set()
             # Extract names from associate sections
             for section in sections[1:]:
                 # Simple name pattern: Capitalized words
                 names = re.findall(r'\b([A-Z][a-z]+ [A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\b', section[:500])  # First 500 chars
                 for name in names:
+                    normalized = normalize_name(name)
+                    if normalized in seen:
+                        continue
+                    seen.add(normalized)
                     associates.append({
                         'name': name,
+                        'normalized': normalized,
                         'relationship': 'Associate/Relative'
                     })
         
@@ -314,12 +698,24 @@ class LexisNexisParser:
         return liens
     
     def _import_to_investigation(self, investigation: 'Investigation', data: Dict, 
-                                 subject_name: str, source_file: str) -> int:
+                                 subject_name: str, source_file: str,
+                                 lossless: bool = False, structured: bool = False) -> int:
         """
         Import parsed data into Investigation as AuthoritySource objects.
+        
+        By default each category keeps only the first SUMMARY_LIMIT records as
+        summary strings. With lossless=True every extracted record is stored,
+        with the original record kept under the evidence 'record' key; the
+        summary strings can still be produced on demand with summary_view().
+        
+        With structured=True associates, businesses and properties become one
+        AuthoritySource each, connected to the subject profile, instead of
+        being flattened into a category source.
         """
-        if AuthoritySource is None or Investigation is None:
+        investigator = _investigator()
+        if investigator is None:
             raise ImportError("investigator.py classes not available")
+        AuthoritySource = investigator.AuthoritySource
         
         added_count = 0
         timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
@@ -340,108 +736,151 @@ class LexisNexisParser:
         investigation.add_authority_source(subject_source)
         added_count += 1
         
-        # Add addresses
-        if data.get('addresses'):
-            addr_source = AuthoritySource(
-                source_id=f"LEXIS-ADDR-{timestamp}",
-                name=f"{subject_name} - Address History",
-                description=f"Known addresses from Lexis Nexis ({len(data['addresses'])} found)",
-                authority_type="Address Records"
-            )
-            for i, addr in enumerate(data['addresses'][:10], 1):  # Limit to 10
-                addr_str = addr if isinstance(addr, str) else addr.get('address', str(addr))
-                addr_source.evidence.append({
-                    'type': 'Address',
-                    'description': f"Address #{i}: {addr_str}",
-                    'source': 'Lexis Nexis',
-                    'timestamp': datetime.now().isoformat()
-                })
-            investigation.add_authority_source(addr_source)
-            added_count += 1
-        
-        # Add phone numbers
-        if data.get('phones'):
-            phone_source = AuthoritySource(
-                source_id=f"LEXIS-PHONE-{timestamp}",
-                name=f"{subject_name} - Phone Numbers",
-                description=f"Known phone numbers from Lexis Nexis ({len(data['phones'])} found)",
-                authority_type="Contact Records"
-            )
-            for i, phone in enumerate(data['phones'][:10], 1):
-                phone_str = phone if isinstance(phone, str) else phone.get('number', str(phone))
-                phone_source.evidence.append({
-                    'type': 'Phone Number',
-                    'description': f"Phone #{i}: {phone_str}",
-                    'source': 'Lexis Nexis',
-                    'timestamp': datetime.now().isoformat()
-                })
-            investigation.add_authority_source(phone_source)
-            added_count += 1
-        
-        # Add associates/relatives
-        if data.get('associates'):
-            assoc_source = AuthoritySource(
-                source_id=f"LEXIS-ASSOC-{timestamp}",
-                name=f"{subject_name} - Associates & Relatives",
-                description=f"Known associates from Lexis Nexis ({len(data['associates'])} found)",
-                authority_type="Associate Network"
-            )
-            for i, assoc in enumerate(data['associates'][:10], 1):
-                assoc_str = assoc if isinstance(assoc, str) else assoc.get('name', str(assoc))
-                assoc_source.evidence.append({
-                    'type': 'Associate',
-                    'description': f"Associate #{i}: {assoc_str}",
-                    'source': 'Lexis Nexis',
-                    'timestamp': datetime.now().isoformat()
-                })
-            investigation.add_authority_source(assoc_source)
-            added_count += 1
-        
-        # Add court records
-        if data.get('court_records'):
-            court_source = AuthoritySource(
-                source_id=f"LEXIS-COURT-{timestamp}",
-                name=f"{subject_name} - Court Records",
-                description=f"Court records from Lexis Nexis ({len(data['court_records'])} found)",
-                authority_type="Legal Records"
+        # Add one source per record category (addresses, phones, ...)
+        for key, id_prefix, name_suffix, label, authority_type, evidence_type in IMPORT_CATEGORIES:
+            records = data.get(key)
+            if not records or (structured and key in ENTITY_CATEGORIES):
+                continue
+            
+            source = AuthoritySource(
+                source_id=f"LEXIS-{id_prefix}-{timestamp}",
+                name=f"{subject_name} - {name_suffix}",
+                description=f"{label} from Lexis Nexis ({len(records)} found)",
+                authority_type=authority_type
             )
-            for i, record in enumerate(data['court_records'][:10], 1):
-                record_str = record if isinstance(record, str) else record.get('case_number', str(record))
-                court_source.evidence.append({
-                    'type': 'Court Record',
-                    'description': f"Record #{i}: {record_str}",
-                    'source': 'Lexis Nexis',
-                    'timestamp': datetime.now().isoformat()
-                })
-            investigation.add_authority_source(court_source)
+            investigation.add_authority_source(source)
+            
+            if lossless:
+                evidence = [
+                    self._record_evidence(evidence_type, i, record, keep_record=True)
+                    for i, record in enumerate(records, 1)
+                ]
+            else:
+                evidence = [
+                    self._record_evidence(evidence_type, i, record)
+                    for i, record in enumerate(records[:SUMMARY_LIMIT], 1)
+                ]
+            investigation.add_evidence_batch(source.source_id, evidence)
             added_count += 1
         
-        # Add liens/judgments
-        if data.get('liens_judgments'):
-            lien_source = AuthoritySource(
-                source_id=f"LEXIS-LIEN-{timestamp}",
-                name=f"{subject_name} - Liens & Judgments",
-                description=f"Financial records from Lexis Nexis ({len(data['liens_judgments'])} found)",
-                authority_type="Financial Records"
-            )
-            for i, lien in enumerate(data['liens_judgments'][:10], 1):
-                lien_str = lien if isinstance(lien, str) else lien.get('description', str(lien))
-                lien_source.evidence.append({
-                    'type': 'Lien/Judgment',
-                    'description': f"Record #{i}: {lien_str}",
-                    'source': 'Lexis Nexis',
-                    'timestamp': datetime.now().isoformat()
-                })
-            investigation.add_authority_source(lien_source)
-            added_count += 1
+        if structured:
+            added_count += self._import_entities(investigation, data, subject_source,
+                                                 source_file, timestamp)
         
         # Add investigation note
+        mode = " | Mode: lossless" if lossless else ""
+        if structured:
+            mode += " | Entities: linked"
         investigation.add_note(
             f"Imported Lexis Nexis report: {source_file} | Subject: {subject_name} | "
-            f"{added_count} authority sources added | Parser: LexisNexisParser v1.0"
+            f"{added_count} authority sources added | Parser: LexisNexisParser v{PARSER_VERSION}{mode}"
         )
         
         return added_count
+    
+    def _import_entities(self, investigation: 'Investigation', data: Dict,
+                         subject_source: 'AuthoritySource', source_file: str,
+                         timestamp: str) -> int:
+        """
+        Create one AuthoritySource per associate, business and property and
+        connect each of them to the subject profile.
+        """
+        AuthoritySource = _investigator().AuthoritySource
+        
+        batch_time = datetime.now().isoformat()
+        entity_ids = []
+        
+        for key, (id_prefix, authority_type, evidence_type, name_field) in ENTITY_CATEGORIES.items():
+            for i, record in enumerate(data.get(key) or [], 1):
+                if not isinstance(record, dict):
+                    record = {name_field: str(record)}
+                fields = self._typed_fields(record)
+                name = str(fields.get(name_field) or fields.get('name') or f"{evidence_type} #{i}")
+                details = [f"{k}: {v}" for k, v in fields.items()
+                           if k != name_field and isinstance(v, (str, int, float)) and v != '']
+                
+                source = AuthoritySource(
+                    source_id=f"LEXIS-{id_prefix}-{timestamp}-{i:05d}",
+                    name=name,
+                    description=' | '.join(details) or f"{evidence_type} from Lexis Nexis",
+                    authority_type=authority_type
+                )
+                source.created_at = batch_time
+                source.evidence.append({
+                    'type': evidence_type,
+                    'description': f"{evidence_type} of {subject_source.name}: {name}",
+                    'source': f"Lexis Nexis Report: {source_file}",
+                    'timestamp': batch_time,
+                    'fields': fields
+                })
+                investigation.add_authority_source(source)
+                entity_ids.append(source.source_id)
+        
+        investigation.add_connections(subject_source.source_id, entity_ids)
+        return len(entity_ids)
+    
+    @staticmethod
+    def _typed_fields(record: Dict) -> Dict:
+        """
+        Normalize a report record into typed evidence fields.
+        
+        Keys are snake_cased, strings stripped, and numeric fields such as
+        values, prices and ages stored as numbers ("$250,000" -> 250000.0).
+        """
+        fields = {}
+        for key, value in record.items():
+            key = re.sub(r'[^0-9a-z]+', '_', str(key).strip().lower()).strip('_')
+            if isinstance(value, str):
+                value = value.strip()
+                if key in NUMERIC_FIELDS or key.endswith(('_value', '_price', '_amount')):
+                    number = re.sub(r'[$,\s]', '', value)
+                    if re.fullmatch(r'-?\d+(?:\.\d+)?', number):
+                        value = int(float(number)) if key in INTEGER_FIELDS else float(number)
+            fields[key] = value
+        return fields
+    
+    @staticmethod
+    def _record_evidence(evidence_type: str, index: int, record: Any,
+                         keep_record: bool = False) -> Dict:
+        """
+        Build the evidence entry for one extracted record.
+        """
+        field, label = EVIDENCE_DISPLAY[evidence_type]
+        value = record if isinstance(record, str) else record.get(field, str(record))
+        evidence = {
+            'type': evidence_type,
+            'description': f"{label} #{index}: {value}",
+            'source': 'Lexis Nexis'
+        }
+        if isinstance(record, dict) and record.get('normalized'):
+            evidence['normalized'] = record['normalized']
+        if keep_record:
+            evidence['record'] = record
+        return evidence
+    
+    def summary_view(self, source: 'AuthoritySource', limit: int = SUMMARY_LIMIT) -> List[Dict]:
+        """
+        Compute the summary-style evidence for a losslessly imported source.
+        
+        Returns the same "Address #1: ..." entries a default import would have
+        stored, built from the full records on demand rather than persisted.
+        """
+        summary = []
+        for i, ev in enumerate(source.evidence[:limit], 1):
+            if 'record' in ev and ev['type'] in EVIDENCE_DISPLAY:
+                entry = self._record_evidence(ev['type'], i, ev['record'])
+                entry['timestamp'] = ev.get('timestamp')
+                summary.append(entry)
+            else:
+                summary.append(ev)
+        return summary
+
+
+register_format('text', ['.txt'], LexisNexisParser._parse_text)
+register_format('csv', ['.csv'], LexisNexisParser._parse_csv)
+register_format('html', ['.html', '.htm'], LexisNexisParser._parse_html, sniff=_sniff_html)
+register_format('json', ['.json'], LexisNexisParser._parse_json, sniff=_sniff_json)
+register_format('pdf', ['.pdf'], LexisNexisParser._parse_pdf, sniff=_sniff_pdf)
 
 
 def demo():
@@ -491,14 +930,12 @@ Case Number: CR2022-005678
     print()
     
     # Integration test
-    if Investigation and AuthoritySource:
+    if _investigator() is not None:
         print("-"*70)
         print("Testing integration with InvestigatorDesk...")
         
         try:
-            from investigator import InvestigatorDesk
-            
-            desk = InvestigatorDesk()
+            desk = _investigator().InvestigatorDesk()
             inv = desk.create_investigation(
                 "LEXIS-DEMO-001",
                 "Background Check Demo",
@@ -525,4 +962,5 @@ Case Number: CR2022-005678
 
 
 if __name__ == "__main__":
-    demo()
+    from profiling import run_entry_point
+    run_entry_point(demo)
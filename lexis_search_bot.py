@@ -18,7 +18,6 @@ Usage:
     desk.save_investigation(inv)
 """
 
-import requests
 import json
 import time
 from datetime import datetime
@@ -27,13 +26,25 @@ from urllib.parse import quote_plus
 import sys
 import os
 
-# Import from investigator.py if available
-try:
-    from investigator import AuthoritySource, Investigation
-except ImportError:
-    print("Warning: investigator.py not found. AuthoritySource/Investigation classes unavailable.", file=sys.stderr)
-    AuthoritySource = None
-    Investigation = None
+from metrics import METRICS
+
+
+def _investigator():
+    """Import investigator.py on first use; returns the module or None."""
+    try:
+        import investigator
+    except ImportError:
+        return None
+    return investigator
+
+
+def __getattr__(name: str):
+    # AuthoritySource and Investigation stay importable from this module
+    # without loading investigator.py at import time (None if it is missing)
+    if name in ('AuthoritySource', 'Investigation'):
+        investigator = _investigator()
+        return getattr(investigator, name) if investigator is not None else None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class LegalSearchBot:
@@ -56,21 +67,30 @@ class LegalSearchBot:
         self.courtlistener_token = courtlistener_token
         self.rate_limit = rate_limit
         self.last_request_time = 0
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'LawfullyIllegal-INVESTIGATOR-DESK/1.0 (Legal Research Bot)'
-        })
-        
-        if self.courtlistener_token:
-            self.session.headers.update({
-                'Authorization': f'Token {self.courtlistener_token}'
+        self._session = None
+    
+    @property
+    def session(self):
+        """HTTP session, created (and requests imported) on first request."""
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+            self._session.headers.update({
+                'User-Agent': 'LawfullyIllegal-INVESTIGATOR-DESK/1.0 (Legal Research Bot)'
             })
+            
+            if self.courtlistener_token:
+                self._session.headers.update({
+                    'Authorization': f'Token {self.courtlistener_token}'
+                })
+        return self._session
     
     def _rate_limit_wait(self):
         """Enforce rate limiting between requests."""
         elapsed = time.time() - self.last_request_time
         if elapsed < self.rate_limit:
             time.sleep(self.rate_limit - elapsed)
+            METRICS.inc("bot_rate_limit_sleep_seconds_total", self.rate_limit - elapsed)
         self.last_request_time = time.time()
     
     def search_courtlistener_cases(self, query: str, limit: int = 10) -> List[Dict]:
@@ -95,7 +115,9 @@ class LegalSearchBot:
                 'page_size': min(limit, 20)
             }
             
-            response = self.session.get(url, params=params, timeout=30)
+            with METRICS.timer("bot_request_seconds", endpoint="opinions"):
+                response = self.session.get(url, params=params, timeout=30)
+            METRICS.inc("bot_requests_total", endpoint="opinions", status=response.status_code)
             
             if response.status_code == 200:
                 data = response.json()
@@ -168,7 +190,9 @@ class LegalSearchBot:
                 'page_size': min(limit, 20)
             }
             
-            response = self.session.get(url, params=params, timeout=30)
+            with METRICS.timer("bot_request_seconds", endpoint="dockets"):
+                response = self.session.get(url, params=params, timeout=30)
+            METRICS.inc("bot_requests_total", endpoint="dockets", status=response.status_code)
             
             if response.status_code == 200:
                 data = response.json()
@@ -228,8 +252,10 @@ class LegalSearchBot:
         Returns:
             AuthoritySource object
         """
-        if AuthoritySource is None:
+        investigator = _investigator()
+        if investigator is None:
             raise ImportError("AuthoritySource class not available. Ensure investigator.py is in the same directory.")
+        AuthoritySource = investigator.AuthoritySource
         
         # Generate unique source ID
         case_name = case.get('case_name', 'Unknown')
@@ -283,7 +309,7 @@ class LegalSearchBot:
         Returns:
             Number of sources added
         """
-        if Investigation is None:
+        if _investigator() is None:
             raise ImportError("Investigation class not available. Ensure investigator.py is in the same directory.")
         
         added_count = 0
@@ -348,14 +374,12 @@ def demo():
     print()
     
     # Integration test (if investigator.py available)
-    if Investigation and AuthoritySource:
+    if _investigator() is not None:
         print("-"*70)
         print("Testing integration with InvestigatorDesk...")
         
         try:
-            from investigator import InvestigatorDesk
-            
-            desk = InvestigatorDesk()
+            desk = _investigator().InvestigatorDesk()
             inv = desk.create_investigation(
                 "LEGAL-DEMO-001",
                 "Legal Research Demo",
@@ -380,4 +404,5 @@ def demo():
 
 
 if __name__ == "__main__":
-    demo()
+    from profiling import run_entry_point
+    run_entry_point(demo)
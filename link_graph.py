@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+LINK-GRAPH EXPORT ENGINE FOR INVESTIGATOR-DESK
+
+Turns the connections between authority sources into a laid-out graph
+(node positions, clusters and degree) and exports it as JSON adjacency,
+GraphML or a compact binary edge list, so the web front end can draw
+large graphs without running a layout in the browser.
+
+Usage:
+    from link_graph import LinkGraphEngine
+    from investigator import InvestigatorDesk
+
+    desk = InvestigatorDesk()
+    engine = LinkGraphEngine()
+    inv = desk.get_investigation("INV-001")
+    engine.write(inv, "site/data/graphs", formats=("json", "graphml", "bin"))
+
+Layout: clusters are found by label propagation. Within a cluster, nodes
+are placed on a sunflower (phyllotaxis) spiral in order of degree, and
+clusters are shelf-packed by size. Labels cannot cross between connected
+components, so clusters are cached per component under a signature of
+its nodes and edges: after an edit, label propagation only runs again on
+the components the edit touched. Packing is cheap and always redone, so
+cluster offsets may move when any cluster changes size.
+"""
+
+import hashlib
+import json
+import math
+import os
+import struct
+import sys
+from typing import List, Dict, Optional, Tuple, Iterable
+from xml.sax.saxutils import escape, quoteattr
+
+
+# Distance between neighbouring nodes in a cluster layout
+NODE_SPACING = 10.0
+# Gap between packed clusters
+CLUSTER_PADDING = 20.0
+# Label propagation rounds before clusters are taken as final
+MAX_PROPAGATION_ROUNDS = 20
+
+GOLDEN_ANGLE = math.pi * (3 - math.sqrt(5))
+
+# Binary edge list: magic, version, node count, edge count
+EDGE_LIST_MAGIC = b'IDLG'
+EDGE_LIST_VERSION = 1
+
+
+def graph_from_investigation(investigation) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Return (node IDs, undirected edges as index pairs) for an investigation.
+
+    Connections to sources that no longer exist are ignored.
+    """
+    node_ids = sorted(investigation.sources)
+    position = {sid: i for i, sid in enumerate(node_ids)}
+    edges = set()
+    for sid in node_ids:
+        a = position[sid]
+        for other in investigation.sources[sid].connections:
+            b = position.get(other)
+            if b is not None and b != a:
+                edges.add((a, b) if a < b else (b, a))
+    return node_ids, sorted(edges)
+
+
+def label_propagation(n_nodes: int, adjacency: List[List[int]]) -> List[int]:
+    """
+    Deterministic label propagation; returns a cluster number per node.
+
+    Each node repeatedly takes the most common label among its neighbours
+    (ties go to the smallest label). Cluster numbers are renumbered from 0
+    by descending cluster size.
+    """
+    labels = list(range(n_nodes))
+    for _ in range(MAX_PROPAGATION_ROUNDS):
+        changed = False
+        for node in range(n_nodes):
+            neighbours = adjacency[node]
+            if not neighbours:
+                continue
+            counts: Dict[int, int] = {}
+            for other in neighbours:
+                counts[labels[other]] = counts.get(labels[other], 0) + 1
+            best = min(counts, key=lambda label: (-counts[label], label))
+            if counts.get(labels[node], 0) < counts[best]:
+                labels[node] = best
+                changed = True
+        if not changed:
+            break
+
+    sizes: Dict[int, int] = {}
+    for label in labels:
+        sizes[label] = sizes.get(label, 0) + 1
+    order = sorted(sizes, key=lambda label: (-sizes[label], label))
+    renumber = {label: i for i, label in enumerate(order)}
+    return [renumber[label] for label in labels]
+
+
+def connected_components(adjacency: List[List[int]]) -> List[List[int]]:
+    """Return the connected components of a graph, each as sorted node indexes."""
+    seen = [False] * len(adjacency)
+    components = []
+    for start in range(len(adjacency)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        stack = [start]
+        component = []
+        while stack:
+            node = stack.pop()
+            component.append(node)
+            for other in adjacency[node]:
+                if not seen[other]:
+                    seen[other] = True
+                    stack.append(other)
+        components.append(sorted(component))
+    return components
+
+
+def spiral_layout(members: List[str]) -> Dict[str, List[float]]:
+    """Place members on a sunflower spiral around (0, 0), first member central."""
+    positions = {}
+    for k, node_id in enumerate(members):
+        radius = NODE_SPACING * math.sqrt(k)
+        angle = k * GOLDEN_ANGLE
+        positions[node_id] = [round(radius * math.cos(angle), 2),
+                              round(radius * math.sin(angle), 2)]
+    return positions
+
+
+class LinkGraphEngine:
+    """
+    Computes and exports laid-out link graphs for investigations.
+
+    Clusters of each connected component are cached in
+    cache_dir/<investigation_id>.json.
+    If out_dir is given, the engine can be registered with
+    InvestigatorDesk.register_index to re-export graphs on every save.
+    """
+
+    def __init__(self, cache_dir: str = os.path.join(".investigator-data", "graph-cache"),
+                 out_dir: Optional[str] = None, formats: Iterable[str] = ("json",)):
+        self.cache_dir = cache_dir
+        self.out_dir = out_dir
+        self.formats = tuple(formats)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_path(self, investigation_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{investigation_id}.json")
+
+    def _load_cache(self, investigation_id: str) -> Dict[str, List[List[str]]]:
+        path = self._cache_path(investigation_id)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading graph cache {path}: {e}", file=sys.stderr)
+            return {}
+
+    def _save_cache(self, investigation_id: str, cache: Dict[str, List[List[str]]]):
+        path = self._cache_path(investigation_id)
+        with open(path + ".tmp", 'w') as f:
+            json.dump(cache, f, separators=(',', ':'))
+        os.replace(path + ".tmp", path)
+
+    def layout(self, investigation) -> Dict:
+        """
+        Lay out an investigation's authority graph.
+
+        Returns a dict with 'nodes' (id, label, type, x, y, cluster,
+        degree), 'edges' (index pairs into nodes), 'clusters' (count) and
+        'recomputed' (connected components clustered afresh rather than
+        taken from the cache).
+        """
+        node_ids, edges = graph_from_investigation(investigation)
+        adjacency: List[List[int]] = [[] for _ in node_ids]
+        for a, b in edges:
+            adjacency[a].append(b)
+            adjacency[b].append(a)
+
+        cache = self._load_cache(investigation.investigation_id)
+        new_cache: Dict[str, List[List[str]]] = {}
+        groups: List[List[str]] = []
+        recomputed = 0
+        for component in connected_components(adjacency):
+            signature = hashlib.sha1(json.dumps(
+                [[node_ids[n]] + sorted(node_ids[m] for m in adjacency[n])
+                 for n in component]).encode()).hexdigest()
+            component_groups = cache.get(signature)
+            if component_groups is None:
+                component_groups = self._cluster_component(node_ids, adjacency, component)
+                recomputed += 1
+            new_cache[signature] = component_groups
+            groups.extend(component_groups)
+        self._save_cache(investigation.investigation_id, new_cache)
+
+        # Number clusters by descending size across the whole graph
+        groups.sort(key=lambda members: (-len(members), min(members)))
+        clusters: Dict[str, int] = {}
+        local: Dict[str, List[float]] = {}
+        for cluster, members in enumerate(groups):
+            local.update(spiral_layout(members))
+            for node_id in members:
+                clusters[node_id] = cluster
+
+        offsets = self._pack_clusters({c: len(m) for c, m in enumerate(groups)})
+        nodes = []
+        for node, node_id in enumerate(node_ids):
+            source = investigation.sources[node_id]
+            cluster = clusters[node_id]
+            x, y = local[node_id]
+            dx, dy = offsets[cluster]
+            nodes.append({
+                'id': node_id,
+                'label': source.name,
+                'type': source.authority_type,
+                'x': round(x + dx, 2),
+                'y': round(y + dy, 2),
+                'cluster': cluster,
+                'degree': len(adjacency[node])
+            })
+        return {
+            'investigation_id': investigation.investigation_id,
+            'nodes': nodes,
+            'edges': [list(edge) for edge in edges],
+            'clusters': len(groups),
+            'recomputed': recomputed
+        }
+
+    @staticmethod
+    def _cluster_component(node_ids: List[str], adjacency: List[List[int]],
+                           component: List[int]) -> List[List[str]]:
+        """
+        Run label propagation on one connected component.
+
+        Returns the component's clusters as lists of node IDs, each in
+        spiral order (descending degree, then ID).
+        """
+        local = {node: i for i, node in enumerate(component)}
+        labels = label_propagation(len(component),
+                                   [[local[m] for m in adjacency[n]] for n in component])
+        members_by_label: Dict[int, List[int]] = {}
+        for node, label in zip(component, labels):
+            members_by_label.setdefault(label, []).append(node)
+        return [[node_ids[n] for n in sorted(members, key=lambda n: (-len(adjacency[n]), node_ids[n]))]
+                for _, members in sorted(members_by_label.items())]
+
+    @staticmethod
+    def _pack_clusters(sizes: Dict[int, int]) -> Dict[int, Tuple[float, float]]:
+        """Shelf-pack cluster discs, largest first; returns each cluster's centre."""
+        radii = {c: NODE_SPACING * math.sqrt(max(n - 1, 0)) + NODE_SPACING for c, n in sizes.items()}
+        area = sum((2 * r + CLUSTER_PADDING) ** 2 for r in radii.values())
+        row_width = max(math.sqrt(area) * 1.2, max(radii.values(), default=0) * 2)
+        offsets = {}
+        x = y = row_height = 0.0
+        for cluster in sorted(sizes, key=lambda c: (-sizes[c], c)):
+            diameter = 2 * radii[cluster] + CLUSTER_PADDING
+            if x > 0 and x + diameter > row_width:
+                x = 0.0
+                y += row_height
+                row_height = 0.0
+            offsets[cluster] = (x + diameter / 2, y + diameter / 2)
+            x += diameter
+            row_height = max(row_height, diameter)
+        return offsets
+
+    @staticmethod
+    def to_json(layout: Dict) -> str:
+        """Compact JSON with nodes and an adjacency map of node IDs."""
+        ids = [node['id'] for node in layout['nodes']]
+        adjacency: Dict[str, List[str]] = {node_id: [] for node_id in ids}
+        for a, b in layout['edges']:
+            adjacency[ids[a]].append(ids[b])
+            adjacency[ids[b]].append(ids[a])
+        return json.dumps({
+            'investigation_id': layout['investigation_id'],
+            'clusters': layout['clusters'],
+            'nodes': layout['nodes'],
+            'adjacency': adjacency
+        }, separators=(',', ':'))
+
+    @staticmethod
+    def to_graphml(layout: Dict) -> str:
+        """GraphML document with label, type, position, cluster and degree."""
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">',
+            '  <key id="label" for="node" attr.name="label" attr.type="string"/>',
+            '  <key id="type" for="node" attr.name="type" attr.type="string"/>',
+            '  <key id="x" for="node" attr.name="x" attr.type="double"/>',
+            '  <key id="y" for="node" attr.name="y" attr.type="double"/>',
+            '  <key id="cluster" for="node" attr.name="cluster" attr.type="int"/>',
+            '  <key id="degree" for="node" attr.name="degree" attr.type="int"/>',
+            f'  <graph id={quoteattr(layout["investigation_id"])} edgedefault="undirected">',
+        ]
+        for node in layout['nodes']:
+            lines.append(f'    <node id={quoteattr(node["id"])}>')
+            for key in ('label', 'type', 'x', 'y', 'cluster', 'degree'):
+                lines.append(f'      <data key="{key}">{escape(str(node[key]))}</data>')
+            lines.append('    </node>')
+        ids = [node['id'] for node in layout['nodes']]
+        for a, b in layout['edges']:
+            lines.append(f'    <edge source={quoteattr(ids[a])} target={quoteattr(ids[b])}/>')
+        lines.append('  </graph>')
+        lines.append('</graphml>')
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def to_edge_list(layout: Dict) -> bytes:
+        """
+        Little-endian binary edge list.
+
+        Header: b'IDLG', uint16 version, uint16 reserved, uint32 node count,
+        uint32 edge count. Then per node: uint16 ID length, UTF-8 ID,
+        float32 x, float32 y, uint32 cluster, uint32 degree. Then per edge:
+        uint32 source index, uint32 target index.
+        """
+        nodes, edges = layout['nodes'], layout['edges']
+        parts = [EDGE_LIST_MAGIC, struct.pack('<HHII', EDGE_LIST_VERSION, 0, len(nodes), len(edges))]
+        for node in nodes:
+            raw_id = node['id'].encode('utf-8')
+            parts.append(struct.pack('<H', len(raw_id)))
+            parts.append(raw_id)
+            parts.append(struct.pack('<ffII', node['x'], node['y'], node['cluster'], node['degree']))
+        parts.append(struct.pack(f'<{2 * len(edges)}I', *(i for edge in edges for i in edge)))
+        return b''.join(parts)
+
+    @staticmethod
+    def read_edge_list(data: bytes) -> Dict:
+        """Decode a binary edge list back into nodes and edges."""
+        if data[:4] != EDGE_LIST_MAGIC:
+            raise ValueError("Not an INVESTIGATOR-DESK edge list")
+        version, _, n_nodes, n_edges = struct.unpack_from('<HHII', data, 4)
+        if version != EDGE_LIST_VERSION:
+            raise ValueError(f"Unsupported edge list version: {version}")
+        offset = 16
+        nodes = []
+        for _ in range(n_nodes):
+            (id_len,) = struct.unpack_from('<H', data, offset)
+            offset += 2
+            node_id = data[offset:offset + id_len].decode('utf-8')
+            offset += id_len
+            x, y, cluster, degree = struct.unpack_from('<ffII', data, offset)
+            offset += 16
+            nodes.append({'id': node_id, 'x': x, 'y': y, 'cluster': cluster, 'degree': degree})
+        flat = struct.unpack_from(f'<{2 * n_edges}I', data, offset)
+        edges = [[flat[i], flat[i + 1]] for i in range(0, len(flat), 2)]
+        return {'nodes': nodes, 'edges': edges}
+
+    def write(self, investigation, out_dir: str,
+              formats: Iterable[str] = ("json",)) -> List[str]:
+        """
+        Lay out an investigation and write it in each requested format
+        ('json', 'graphml', 'bin') as out_dir/<investigation_id>.<ext>.
+
+        Returns the written paths.
+        """
+        layout = self.layout(investigation)
+        os.makedirs(out_dir, exist_ok=True)
+        writers = {
+            'json': (self.to_json, 'json', 'w'),
+            'graphml': (self.to_graphml, 'graphml', 'w'),
+            'bin': (self.to_edge_list, 'bin', 'wb'),
+        }
+        paths = []
+        for fmt in formats:
+            if fmt not in writers:
+                raise ValueError(f"Unknown graph format: {fmt}. Known: {list(writers)}")
+            render, ext, mode = writers[fmt]
+            path = os.path.join(out_dir, f"{investigation.investigation_id}.{ext}")
+            with open(path, mode) as f:
+                f.write(render(layout))
+            paths.append(path)
+        return paths
+
+    def index_investigation(self, investigation) -> int:
+        """Re-export an investigation's graph to out_dir; returns its node count."""
+        if self.out_dir is None:
+            return 0
+        self.write(investigation, self.out_dir, self.formats)
+        return len(investigation.sources)
+
+    def remove_investigation(self, investigation_id: str):
+        """Delete an investigation's layout cache and exported graphs."""
+        paths = [self._cache_path(investigation_id)]
+        if self.out_dir is not None:
+            paths += [os.path.join(self.out_dir, f"{investigation_id}.{ext}")
+                      for ext in ('json', 'graphml', 'bin')]
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+INSTRUMENTATION FOR INVESTIGATOR-DESK
+
+Counters, histograms and timers shared by the desk, the Lexis Nexis
+parser, the legal search bot and the Prover9 runner. Disabled by default;
+when disabled every call returns after a single attribute check.
+
+Usage:
+    from metrics import METRICS
+
+    METRICS.enable()
+    ...
+    METRICS.write("metrics.prom")   # Prometheus text format
+    METRICS.write("metrics.json")   # JSON snapshot
+
+Environment:
+    INVESTIGATOR_METRICS=1            enable at import
+    INVESTIGATOR_METRICS_FILE=<path>  enable and write the metrics on exit
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Tuple, Optional
+
+
+# Histogram bucket upper bounds, in seconds for timers
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _NullTimer:
+    """Timer returned while metrics are disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    """Context manager observing its elapsed wall time into a histogram."""
+
+    __slots__ = ('metrics', 'key', 'start')
+
+    def __init__(self, metrics: 'Metrics', key: LabelKey):
+        self.metrics = metrics
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics._observe(self.key, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """
+    Thread-safe registry of counters and histograms.
+
+    Metrics are identified by name plus keyword labels, e.g.
+    inc("prover9_cache_requests_total", result="hit").
+    """
+
+    def __init__(self, enabled: bool = False, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.counters: Dict[LabelKey, float] = {}
+        # key -> [per-bucket counts (+Inf last), sum, count]
+        self.histograms: Dict[LabelKey, list] = {}
+
+    def enable(self):
+        """Start recording."""
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording; recorded values are kept."""
+        self.enabled = False
+
+    def reset(self):
+        """Drop every recorded value."""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Add value to a counter."""
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record one value in a histogram."""
+        if not self.enabled:
+            return
+        self._observe(_key(name, labels), value)
+
+    def _observe(self, key: LabelKey, value: float):
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            hist[0][bisect_left(self.buckets, value)] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def timer(self, name: str, **labels):
+        """Context manager recording elapsed seconds in a histogram."""
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self, _key(name, labels))
+
+    def counter_value(self, name: str, **labels) -> float:
+        """Current value of a counter (0 if never incremented)."""
+        return self.counters.get(_key(name, labels), 0)
+
+    def snapshot(self) -> Dict:
+        """JSON-serializable copy of every counter and histogram."""
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            histograms = []
+            for (name, labels), (counts, total, count) in sorted(self.histograms.items()):
+                histograms.append({
+                    'name': name, 'labels': dict(labels), 'count': count,
+                    'sum': round(total, 6),
+                    'buckets': {str(b): c for b, c in zip(self.buckets + ('+Inf',), counts)}
+                })
+        return {'timestamp': time.time(), 'counters': counters, 'histograms': histograms}
+
+    def to_prometheus(self) -> str:
+        """Render in the Prometheus text exposition format (cumulative buckets)."""
+        lines = []
+        typed = set()
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+            for (name, labels), (counts, total, count) in sorted(self.histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} histogram")
+                    typed.add(name)
+                cumulative = 0
+                for bound, n in zip(self.buckets + ('+Inf',), counts):
+                    cumulative += n
+                    le = 'le="%s"' % bound
+                    lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Write metrics to path: JSON for .json, Prometheus text otherwise."""
+        if path.endswith('.json'):
+            text = json.dumps(self.snapshot(), indent=2)
+        else:
+            text = self.to_prometheus()
+        with open(path + ".tmp", 'w') as f:
+            f.write(text)
+        os.replace(path + ".tmp", path)
+
+
+METRICS = Metrics(enabled=os.environ.get("INVESTIGATOR_METRICS", "") not in ("", "0"))
+
+_metrics_file: Optional[str] = os.environ.get("INVESTIGATOR_METRICS_FILE")
+if _metrics_file:
+    METRICS.enable()
+    atexit.register(METRICS.write, _metrics_file)
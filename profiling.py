@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+PROFILING MODE FOR INVESTIGATOR-DESK ENTRY POINTS
+
+Runs a function or a whole script under cProfile, tracemalloc and a
+stack sampler, then writes:
+
+    <prefix>.txt        top functions by cumulative time, top allocation
+                        sites and peak traced memory
+    <prefix>.pstats     raw cProfile data (for snakeviz, pstats, ...)
+    <prefix>.collapsed  sampled stacks in collapsed format, one
+                        "frame;frame;frame count" line per stack, for
+                        flamegraph.pl / speedscope
+
+Usage:
+    python investigator.py --profile              # writes investigator-profile.*
+    python lexis_nexis_parser.py --profile=/tmp/parse
+    python profiling.py lexis_search_bot.py ...   # also profiles module imports
+
+The --profile flag profiles the entry point's main function; running the
+script through profiling.py additionally covers its top-level imports.
+cProfile, pstats, tracemalloc and runpy are imported only when profiling
+actually starts, so entry points pay nothing for the flag otherwise.
+"""
+
+import io
+import os
+import sys
+import threading
+import time
+from typing import List, Dict, Optional, Callable, Tuple
+
+
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 20
+SAMPLE_INTERVAL = 0.001
+
+
+def parse_profile_flag(argv: List[str], default_prefix: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Strip --profile / --profile=PREFIX from argv.
+
+    Returns (output prefix or None when not profiling, remaining argv).
+    """
+    prefix = None
+    remaining = []
+    for arg in argv:
+        if arg == "--profile":
+            prefix = default_prefix
+        elif arg.startswith("--profile="):
+            prefix = arg.split("=", 1)[1] or default_prefix
+        else:
+            remaining.append(arg)
+    return prefix, remaining
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples one thread's Python stack at a fixed interval.
+
+    stacks maps "outermost;...;innermost" frame strings to sample counts.
+    With root_code, only stacks whose outermost frame runs that code are
+    kept, so samples of profile_call's own setup and shutdown are dropped.
+    """
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL, root_code=None):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root_code = root_code
+        self.stacks: Dict[str, int] = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            code = None
+            # Frames of profile_call and its callers are the same in every sample
+            while frame is not None and frame.f_code is not profile_call.__code__:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names and (self.root_code is None or code is self.root_code):
+                stack = ";".join(reversed(names))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def profile_call(func: Callable, *args, prefix: str, **kwargs):
+    """
+    Call func(*args, **kwargs) under the profilers and write the reports.
+
+    Args:
+        func: Function to profile
+        prefix: Output path prefix for the .txt, .pstats and .collapsed files
+
+    Returns:
+        (func's return value, list of written paths)
+    """
+    import cProfile
+    import tracemalloc
+
+    directory = os.path.dirname(prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    profiler = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident(), root_code=getattr(func, '__code__', None))
+    tracemalloc.start()
+    sampler.start()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        paths = write_reports(prefix, profiler, snapshot, peak, sampler.stacks, elapsed)
+    return result, paths
+
+
+def write_reports(prefix: str, profiler: 'cProfile.Profile', snapshot, peak: int,
+                  stacks: Dict[str, int], elapsed: float) -> List[str]:
+    """Write the summary, raw pstats and collapsed-stack files."""
+    import pstats
+    import tracemalloc
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+
+    lines = [
+        f"Wall time: {elapsed:.3f}s",
+        f"Peak traced memory: {peak / 1024:.1f} KiB",
+        "",
+        f"TOP {TOP_FUNCTIONS} FUNCTIONS BY CUMULATIVE TIME",
+        "-" * 70,
+        stream.getvalue().strip(),
+        "",
+        f"TOP {TOP_ALLOCATIONS} ALLOCATION SITES",
+        "-" * 70,
+    ]
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}")
+
+    summary_path = f"{prefix}.txt"
+    with open(summary_path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+    pstats_path = f"{prefix}.pstats"
+    profiler.dump_stats(pstats_path)
+    collapsed_path = f"{prefix}.collapsed"
+    with open(collapsed_path, 'w') as f:
+        for stack, count in sorted(stacks.items()):
+            f.write(f"{stack} {count}\n")
+    return [summary_path, pstats_path, collapsed_path]
+
+
+def run_entry_point(main: Callable, default_prefix: Optional[str] = None):
+    """
+    Run an entry point, profiling it when --profile is on the command line.
+
+    The flag is removed from sys.argv before main runs. Returns main's
+    return value.
+    """
+    if default_prefix is None:
+        default_prefix = os.path.splitext(os.path.basename(sys.argv[0]))[0] + "-profile"
+    prefix, sys.argv[1:] = parse_profile_flag(sys.argv[1:], default_prefix)
+    if prefix is None:
+        return main()
+    result, paths = profile_call(main, prefix=prefix)
+    print(f"Profile written to: {', '.join(paths)}", file=sys.stderr)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Profile a script, including its imports: profiling.py [--profile=PREFIX] script [args]."""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    flags = []
+    while argv and argv[0].startswith("--profile"):
+        flags.append(argv.pop(0))
+    if not argv:
+        print("Usage: python profiling.py [--profile=PREFIX] script.py [args...]", file=sys.stderr)
+        return 2
+    script_args = argv
+    script = script_args[0]
+    default_prefix = os.path.splitext(os.path.basename(script))[0] + "-profile"
+    prefix, _ = parse_profile_flag(flags, default_prefix)
+    sys.argv = script_args
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+
+    def run_script():
+        import runpy
+        try:
+            runpy.run_path(script, run_name="__main__")
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        return 0
+
+    code, paths = profile_call(run_script, prefix=prefix or default_prefix)
+    print(f"Profile written to: {', '.join(paths)}", file=sys.stderr)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,934 @@
+#!/usr/bin/env python3
+"""
+PROVER9 OBSERVER PATCH HOLOGRAPHY MODULE FOR INVESTIGATOR-DESK
+
+Runs Prover9 proofs (cached, batched or supervised with resource limits),
+keeps the proof audit log and ingests results as investigation evidence.
+Issue #5 - Added 2026-04-13.
+
+Kept out of investigator.py so that subprocess, asyncio and friends are
+only imported when a proof is actually run; the classes are still
+importable as `from investigator import Prover9Runner`.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import List, Dict, Optional, Iterator, Tuple
+
+from metrics import METRICS
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are not locked across processes
+    fcntl = None
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits or per-process rusage
+    resource = None
+
+
+class ProofCache:
+    """Cache of Prover9 results keyed by input content, prover build and arguments.
+    
+    Each entry is stored as <key>.json next to an index.json holding
+    timestamps and sizes. When max_entries or max_bytes is exceeded the
+    least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 1000,
+                 max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.index: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path) as f:
+                    self.index = json.load(f)
+            except Exception as e:
+                print(f"[ProofCache] Error loading {self.index_path}: {e}", file=sys.stderr)
+
+    @staticmethod
+    def make_key(input_hash: str, prover_version: str, args: List[str]) -> str:
+        """Combine input hash, prover build and arguments into a cache key."""
+        material = "\0".join([input_hash, prover_version, json.dumps(args)])
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached result for key, or None."""
+        with self._lock:
+            meta = self.index.get(key)
+            if meta is None:
+                return None
+            try:
+                with open(self._entry_path(key)) as f:
+                    result = json.load(f)
+            except (OSError, ValueError):
+                self.index.pop(key, None)
+                return None
+            meta["last_used"] = time.time()
+            return result
+
+    def put(self, key: str, input_hash: str, result: Dict):
+        """Store a result and evict old entries beyond the size limits."""
+        payload = json.dumps(result)
+        with self._lock:
+            with open(self._entry_path(key), "w") as f:
+                f.write(payload)
+            self.index[key] = {
+                "input_hash": input_hash,
+                "timestamp": result.get("timestamp"),
+                "last_used": time.time(),
+                "size": len(payload)
+            }
+            self._evict()
+            self._save_index()
+
+    def _evict(self):
+        total = sum(meta["size"] for meta in self.index.values())
+        by_age = sorted(self.index, key=lambda k: self.index[k]["last_used"])
+        while by_age and (len(self.index) > self.max_entries or total > self.max_bytes):
+            key = by_age.pop(0)
+            total -= self.index.pop(key)["size"]
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
+
+    def invalidate(self, input_hash: Optional[str] = None) -> int:
+        """Drop cached results for one input hash, or everything if None.
+        
+        Returns the number of entries removed.
+        """
+        with self._lock:
+            keys = [k for k, meta in self.index.items()
+                    if input_hash is None or meta["input_hash"] == input_hash]
+            for key in keys:
+                del self.index[key]
+                try:
+                    os.remove(self._entry_path(key))
+                except OSError:
+                    pass
+            self._save_index()
+            return len(keys)
+
+
+class ProofAuditLog:
+    """Append-only JSON Lines log of Observer Patch proof runs.
+    
+    Each entry is one line of observer_patch_log.jsonl, appended under an
+    exclusive lock on observer_patch_log.lock so concurrent runners never
+    interleave or lose entries. A compact sidecar index
+    (observer_patch_log.idx.jsonl) records each entry's byte range, pv9
+    file, status and timestamp. The index is written after the log, so a
+    crash can leave it behind; whenever its end disagrees with the log's
+    size it is rebuilt from the log.
+    
+    Queries use an in-memory copy of the index, grouped by pv9 file and
+    status and sorted by timestamp, that reads only the index lines added
+    since the previous query; then only the matching log entries are read.
+    Entries in a legacy observer_patch_log.json array are still read until
+    migrate_legacy() moves them over.
+    """
+
+    LOG_FILE = "observer_patch_log.jsonl"
+    INDEX_FILE = "observer_patch_log.idx.jsonl"
+    LOCK_FILE = "observer_patch_log.lock"
+    LEGACY_FILE = "observer_patch_log.json"
+    # First line of a log that legacy entries were migrated into
+    MIGRATED_KEY = "_legacy_migrated"
+
+    def __init__(self, log_dir: str):
+        self.log_dir = log_dir
+        self.log_path = os.path.join(log_dir, self.LOG_FILE)
+        self.index_path = os.path.join(log_dir, self.INDEX_FILE)
+        self.lock_path = os.path.join(log_dir, self.LOCK_FILE)
+        self.legacy_path = os.path.join(log_dir, self.LEGACY_FILE)
+        self._reset_index()
+
+    @staticmethod
+    def _lock(f):
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    @staticmethod
+    def _unlock(f):
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _index_record(offset: int, end: int, entry: Dict) -> Dict:
+        return {
+            "offset": offset,
+            "end": end,
+            "pv9_file": entry.get("pv9_file"),
+            "status": (entry.get("result") or {}).get("status"),
+            "timestamp": entry.get("timestamp")
+        }
+
+    def append(self, entry: Dict):
+        """Append one entry; O(1) regardless of log size."""
+        self.append_many([entry])
+
+    def append_many(self, entries: List[Dict]):
+        """Append several entries under a single lock acquisition."""
+        with open(self.lock_path, "a") as lock:
+            self._lock(lock)
+            try:
+                offset = self._log_size()
+                if self._index_end() != offset:
+                    offset = self._rebuild_index()
+                lines = []
+                index_lines = []
+                for entry in entries:
+                    line = (json.dumps(entry) + "\n").encode("utf-8")
+                    lines.append(line)
+                    index_lines.append(json.dumps(
+                        self._index_record(offset, offset + len(line), entry)) + "\n")
+                    offset += len(line)
+                with open(self.log_path, "ab") as log:
+                    log.write(b"".join(lines))
+                with open(self.index_path, "a") as index:
+                    index.write("".join(index_lines))
+            finally:
+                self._unlock(lock)
+
+    def _log_size(self) -> int:
+        try:
+            return os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            return 0
+
+    def _index_end(self) -> Optional[int]:
+        """Log offset the index covers up to; None if it is missing or torn."""
+        try:
+            with open(self.index_path, "rb") as f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(0, size - 4096))
+                tail = f.read()
+        except FileNotFoundError:
+            return 0 if self._log_size() == 0 else None
+        if not tail:
+            return 0
+        if not tail.endswith(b"\n"):
+            return None
+        try:
+            record = json.loads(tail.splitlines()[-1])
+        except ValueError:
+            return None
+        if "end" in record:
+            return record["end"]
+        # Index lines written before byte ranges were recorded
+        with open(self.log_path, "rb") as log:
+            log.seek(record["offset"])
+            return record["offset"] + len(log.readline())
+
+    def _rebuild_index(self) -> int:
+        """Rewrite the index from the log (lock held); returns the log size.
+        
+        A torn last line, left by a crash during an append, is cut off.
+        """
+        index_lines = []
+        offset = 0
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "rb") as log:
+                for line in log:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        entry = None
+                    if isinstance(entry, dict) and self.MIGRATED_KEY not in entry:
+                        index_lines.append(json.dumps(
+                            self._index_record(offset, offset + len(line), entry)) + "\n")
+                    offset += len(line)
+            if offset < self._log_size():
+                print(f"Warning: dropping torn last line of {self.log_path}", file=sys.stderr)
+                os.truncate(self.log_path, offset)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write("".join(index_lines))
+        os.replace(tmp_path, self.index_path)
+        METRICS.inc("proof_audit_index_rebuilds_total")
+        return offset
+
+    def _legacy_migrated(self) -> bool:
+        try:
+            with open(self.log_path, "rb") as f:
+                first = f.readline()
+        except FileNotFoundError:
+            return False
+        return first.startswith(f'{{"{self.MIGRATED_KEY}"'.encode("utf-8"))
+
+    def _read_legacy(self) -> List[Dict]:
+        # Once the log holds the migrated entries the legacy file is ignored,
+        # even if a crash kept migrate_legacy() from renaming it
+        if not os.path.exists(self.legacy_path) or self._legacy_migrated():
+            return []
+        with open(self.legacy_path) as f:
+            return json.load(f)
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """Yield every entry, legacy array first, reading the log line by line."""
+        for entry in self._read_legacy():
+            yield entry
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    if self.MIGRATED_KEY not in entry:
+                        yield entry
+
+    def _reset_index(self):
+        self._records: List[Dict] = []
+        self._by_file: Dict[Optional[str], List[int]] = {}
+        self._by_status: Dict[Optional[str], List[int]] = {}
+        self._by_time: List[Tuple[str, int]] = []
+        # (inode, bytes read) of the index file behind the in-memory copy
+        self._index_read: Tuple[int, int] = (0, 0)
+
+    def _refresh_index(self):
+        """Repair the index if needed, then read the lines added since the last call."""
+        if self._index_end() != self._log_size():
+            with open(self.lock_path, "a") as lock:
+                self._lock(lock)
+                try:
+                    if self._index_end() != self._log_size():
+                        self._rebuild_index()
+                finally:
+                    self._unlock(lock)
+        try:
+            with open(self.index_path, "rb") as f:
+                st = os.fstat(f.fileno())
+                inode, done = self._index_read
+                if st.st_ino != inode or st.st_size < done:
+                    self._reset_index()
+                    done = 0
+                f.seek(done)
+                data = f.read()
+        except FileNotFoundError:
+            self._reset_index()
+            return
+        complete = data.rfind(b"\n") + 1
+        for line in data[:complete].splitlines():
+            if line.strip():
+                self._add_record(json.loads(line))
+        self._index_read = (st.st_ino, done + complete)
+
+    def _add_record(self, record: Dict):
+        position = len(self._records)
+        self._records.append(record)
+        self._by_file.setdefault(record["pv9_file"], []).append(position)
+        self._by_status.setdefault(record["status"], []).append(position)
+        key = (record["timestamp"] or "", position)
+        if self._by_time and key < self._by_time[-1]:
+            bisect.insort(self._by_time, key)
+        else:
+            self._by_time.append(key)
+
+    def query(self, pv9_file: Optional[str] = None, status: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict]:
+        """Yield entries matching every given filter, oldest first.
+        
+        since/until are ISO timestamps, dates or datetimes, inclusive (a
+        date-only until covers that whole day). Only the new part of the
+        index and the matching log entries are read.
+        """
+        if isinstance(since, datetime):
+            since = since.isoformat()
+        if isinstance(until, datetime):
+            until = until.isoformat()
+        elif until is not None and len(until) == 10:
+            until += "T23:59:59.999999"
+
+        def matches(pv9, stat, ts) -> bool:
+            return ((pv9_file is None or pv9 == pv9_file)
+                    and (status is None or stat == status)
+                    and (since is None or (ts or "") >= since)
+                    and (until is None or (ts or "") <= until))
+
+        for entry in self._read_legacy():
+            if matches(entry.get("pv9_file"), (entry.get("result") or {}).get("status"),
+                       entry.get("timestamp")):
+                yield entry
+
+        self._refresh_index()
+        # Start from the narrowest of the candidate lists the filters select
+        candidates = []
+        if pv9_file is not None:
+            candidates.append(self._by_file.get(pv9_file, []))
+        if status is not None:
+            candidates.append(self._by_status.get(status, []))
+        if since is not None or until is not None:
+            low = bisect.bisect_left(self._by_time, (since, -1)) if since is not None else 0
+            high = (bisect.bisect_right(self._by_time, (until, len(self._records)))
+                    if until is not None else len(self._by_time))
+            candidates.append(sorted(position for _, position in self._by_time[low:high]))
+        positions = min(candidates, key=len) if candidates else range(len(self._records))
+        records = [self._records[position] for position in positions]
+        if not records:
+            return
+        with open(self.log_path, "rb") as log:
+            for record in records:
+                if matches(record["pv9_file"], record["status"], record["timestamp"]):
+                    log.seek(record["offset"])
+                    yield json.loads(log.readline())
+
+    def migrate_legacy(self) -> int:
+        """Move entries from the legacy JSON array into the JSONL log.
+        
+        The legacy entries and the current log are written to a temporary
+        file that replaces the log in one os.replace, so the log never
+        holds part of them. Its first line marks the log as migrated, and
+        from then on the legacy file is no longer read. The legacy file is
+        then renamed to observer_patch_log.json.migrated.
+        Returns the number of entries moved.
+        """
+        with open(self.lock_path, "a") as lock:
+            self._lock(lock)
+            try:
+                entries = self._read_legacy()
+                if entries:
+                    tmp_path = self.log_path + ".tmp"
+                    with open(tmp_path, "wb") as out:
+                        out.write((json.dumps({self.MIGRATED_KEY: len(entries)}) + "\n").encode("utf-8"))
+                        for entry in entries:
+                            out.write((json.dumps(entry) + "\n").encode("utf-8"))
+                        if os.path.exists(self.log_path):
+                            with open(self.log_path, "rb") as log:
+                                shutil.copyfileobj(log, out)
+                        out.flush()
+                        os.fsync(out.fileno())
+                    os.replace(tmp_path, self.log_path)
+                    self._rebuild_index()
+                if os.path.exists(self.legacy_path):
+                    os.replace(self.legacy_path, self.legacy_path + ".migrated")
+            finally:
+                self._unlock(lock)
+        return len(entries)
+
+
+class ProofSupervisor:
+    """Runs prover processes under asyncio with streaming output and limits.
+    
+    stdout goes straight from the child to the result file, so output is
+    never buffered in memory. Each proof runs in its own session (process
+    group) with optional RLIMIT_CPU and RLIMIT_AS limits, the whole group
+    is killed on timeout, and wall time, CPU time and peak RSS are taken
+    from the child's own rusage via wait4().
+    
+    Limits are set by a /bin/sh wrapper that runs ulimit and then execs the
+    prover, rather than by preexec_fn, which is unsafe while other threads
+    (the executor running wait4) are active.
+    """
+
+    def __init__(self, cpu_time_limit: Optional[int] = None,
+                 memory_limit: Optional[int] = None):
+        """
+        Args:
+            cpu_time_limit: CPU seconds per proof (RLIMIT_CPU)
+            memory_limit: Address-space bytes per proof (RLIMIT_AS)
+        """
+        self.cpu_time_limit = cpu_time_limit
+        self.memory_limit = memory_limit
+
+    def _limited_argv(self, argv: List[str]) -> List[str]:
+        """argv wrapped in a shell that applies the limits and execs it; argv if no limits."""
+        limits = []
+        if self.cpu_time_limit is not None:
+            # SIGXCPU at the soft limit, SIGKILL a second later
+            limits.append(f"ulimit -H -t {int(self.cpu_time_limit) + 1}")
+            limits.append(f"ulimit -S -t {int(self.cpu_time_limit)}")
+        if self.memory_limit is not None:
+            limits.append(f"ulimit -v {max(1, int(self.memory_limit) // 1024)}")
+        if not limits:
+            return argv
+        return ["/bin/sh", "-c", "; ".join(limits) + ' && exec "$@"', argv[0]] + list(argv)
+
+    async def run(self, argv: List[str], output_file: str, header: str = "",
+                  timeout: float = 60) -> Dict:
+        """Run argv, streaming header and then its output into output_file.
+        
+        Returns status ("proved", "failed", "timeout", "cpu_limit" or
+        "killed" for any other death by SIGKILL, such as the OOM killer),
+        returncode, output_file, wall_time and cpu_time in seconds, and
+        max_rss_kb.
+        """
+        if resource is None:
+            raise RuntimeError("ProofSupervisor requires a POSIX system")
+
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        with open(output_file, "wb") as out, tempfile.TemporaryFile() as err:
+            out.write(header.encode("utf-8"))
+            out.flush()
+            proc = subprocess.Popen(self._limited_argv(argv), stdout=out, stderr=err,
+                                    stdin=subprocess.DEVNULL, start_new_session=True)
+            waiter = loop.run_in_executor(None, os.wait4, proc.pid, 0)
+            try:
+                done, _ = await asyncio.wait({waiter}, timeout=timeout)
+            except BaseException:
+                self._kill_group(proc.pid)
+                raise
+            timed_out = not done
+            if timed_out:
+                self._kill_group(proc.pid)
+            _, wait_status, usage = await waiter
+            wall_time = time.monotonic() - start
+            proc.returncode = os.waitstatus_to_exitcode(wait_status)
+
+            err.seek(0)
+            stderr = err.read()
+            if stderr:
+                out.write(b"\n# STDERR:\n")
+                out.write(stderr)
+
+        cpu_time = usage.ru_utime + usage.ru_stime
+        if timed_out:
+            status = "timeout"
+        elif self.cpu_time_limit is not None and (
+                proc.returncode == -signal.SIGXCPU
+                or proc.returncode == -signal.SIGKILL and cpu_time >= self.cpu_time_limit):
+            status = "cpu_limit"
+        elif proc.returncode == -signal.SIGKILL:
+            status = "killed"
+        else:
+            status = "proved" if proc.returncode == 0 else "failed"
+        return {
+            "status": status,
+            "returncode": proc.returncode,
+            "output_file": output_file,
+            "wall_time": round(wall_time, 3),
+            "cpu_time": round(cpu_time, 3),
+            "max_rss_kb": usage.ru_maxrss
+        }
+
+    @staticmethod
+    def _kill_group(pgid: int):
+        try:
+            os.killpg(pgid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+class _RunningProofs:
+    """prover9 processes started by one batch, killed if the batch is abandoned."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.procs = set()
+        self.closed = False
+
+    def add(self, proc) -> bool:
+        """Track a process; returns False if the batch is already closed."""
+        with self.lock:
+            if self.closed:
+                return False
+            self.procs.add(proc)
+            return True
+
+    def discard(self, proc):
+        with self.lock:
+            self.procs.discard(proc)
+
+    def close(self):
+        """Kill every tracked process; processes added later are refused."""
+        with self.lock:
+            self.closed = True
+            procs = list(self.procs)
+        for proc in procs:
+            self.kill(proc)
+
+    @staticmethod
+    def kill(proc):
+        """Kill a process and its process group."""
+        if hasattr(os, "killpg"):
+            ProofSupervisor._kill_group(proc.pid)
+        else:
+            proc.kill()
+
+
+class Prover9Runner:
+    """Runs Prover9 formal logic proofs for Observer Patch Holography.
+    Handles Termux path resolution and Evidence directory auto-creation.
+    """
+
+    TERMUX_HOME = os.path.expanduser("~")
+    EVIDENCE_BASE = os.path.join(os.path.expanduser("~"), "Evidence")
+
+    PROVER9_ARGS = ["-f"]
+
+    def __init__(self, audit_id: str = "Audit_P9-29621", evidence_base: Optional[str] = None,
+                 use_cache: bool = True, cache_max_entries: int = 1000):
+        self.audit_id = audit_id
+        self.evidence_dir = os.path.join(evidence_base or self.EVIDENCE_BASE, audit_id)
+        self._ensure_evidence_dir()
+        self.cache = None
+        if use_cache:
+            self.cache = ProofCache(os.path.join(self.evidence_dir, ".proof-cache"),
+                                    max_entries=cache_max_entries)
+        self.audit_log = ProofAuditLog(self.evidence_dir)
+
+    def _ensure_evidence_dir(self):
+        """Auto-create Evidence/Audit directory (fixes Issue #5 mkdir requirement)."""
+        os.makedirs(self.evidence_dir, exist_ok=True)
+        print(f"[Prover9Runner] Evidence dir ready: {self.evidence_dir}")
+
+    def _resolve_pv9_path(self, filename: str) -> str:
+        """Resolve .pv9 file path safely in Termux environment."""
+        if os.path.isabs(filename):
+            return filename
+        # Check current dir, then TERMUX_HOME
+        for base in [os.getcwd(), self.TERMUX_HOME, self.evidence_dir]:
+            candidate = os.path.join(base, filename)
+            if os.path.exists(candidate):
+                return candidate
+        raise FileNotFoundError(
+            f"[Prover9Runner] Cannot stat '{filename}': No such file.\n"
+            f"Searched: cwd, {self.TERMUX_HOME}, {self.evidence_dir}\n"
+            "Hint: Place your .pv9 file in ~/Evidence/ or pass absolute path."
+        )
+
+    def _get_prover_version(self, prover_path: str) -> str:
+        """Identify the installed prover9 build by its path, size and mtime."""
+        stat = os.stat(prover_path)
+        return f"{os.path.realpath(prover_path)}:{stat.st_size}:{stat.st_mtime}"
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _output_file(self, resolved: str) -> str:
+        """Result file for an input, <name>_<path hash>_result.txt.
+        
+        The hash of the input's real path keeps inputs with the same file
+        name in different directories from overwriting each other's results.
+        """
+        base_name = os.path.splitext(os.path.basename(resolved))[0]
+        path_hash = hashlib.sha1(os.path.realpath(resolved).encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.evidence_dir, f"{base_name}_{path_hash}_result.txt")
+
+    @staticmethod
+    def _result_text(resolved: str, timestamp: str, stdout: str, stderr: str) -> str:
+        text = f"# Prover9 Output - {timestamp}\n# Input: {resolved}\n\n{stdout}"
+        if stderr:
+            text += f"\n# STDERR:\n{stderr}"
+        return text
+
+    def _write_result_file(self, output_file: str, resolved: str, timestamp: str,
+                           stdout: str, stderr: str, only_if_changed: bool = False):
+        """Write a result file; with only_if_changed, skip it if its hash already matches."""
+        data = self._result_text(resolved, timestamp, stdout, stderr).encode("utf-8")
+        if only_if_changed and os.path.exists(output_file):
+            if self._hash_file(output_file) == hashlib.sha256(data).hexdigest():
+                return
+        with open(output_file, "wb") as f:
+            f.write(data)
+
+    def run_proof(self, pv9_file: str, timeout: float = 60, use_cache: bool = True) -> Dict:
+        """Run a Prover9 proof on a .pv9 input file.
+        Returns a result dict with stdout, stderr, returncode, and output path.
+        
+        If the same input was already proved with the same prover9 build and
+        arguments, the cached result is returned with its original timestamp
+        and "cached": True.
+        """
+        return self._run_proof(pv9_file, timeout, use_cache)
+
+    def _run_proof(self, pv9_file: str, timeout: float = 60, use_cache: bool = True,
+                   running: Optional['_RunningProofs'] = None) -> Dict:
+        """run_proof, registering the prover process in running while it runs."""
+        prover_path = shutil.which("prover9")
+        if not prover_path:
+            return {
+                "status": "error",
+                "message": "prover9 not found. Install via: pkg install prover9",
+                "output": None
+            }
+
+        resolved = self._resolve_pv9_path(pv9_file)
+        output_file = self._output_file(resolved)
+
+        input_hash = self._hash_file(resolved)
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = ProofCache.make_key(input_hash, self._get_prover_version(prover_path),
+                                            self.PROVER9_ARGS)
+            cached = self.cache.get(cache_key)
+            METRICS.inc("prover9_cache_requests_total", result="miss" if cached is None else "hit")
+            if cached is not None:
+                # The file may be missing, or hold a later run of edited input
+                self._write_result_file(output_file, resolved, cached["timestamp"],
+                                        cached["stdout"], cached["stderr"], only_if_changed=True)
+                cached["output_file"] = output_file
+                cached["input_file"] = resolved
+                cached["input_hash"] = input_hash
+                cached["cached"] = True
+                return cached
+
+        try:
+            timestamp = datetime.now().isoformat()
+            with METRICS.timer("prover9_proof_seconds"):
+                proc = subprocess.Popen(["prover9"] + self.PROVER9_ARGS + [resolved],
+                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                        stdin=subprocess.DEVNULL, text=True,
+                                        start_new_session=True)
+                if running is not None and not running.add(proc):
+                    _RunningProofs.kill(proc)
+                try:
+                    stdout, stderr = proc.communicate(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    _RunningProofs.kill(proc)
+                    proc.communicate()
+                    raise
+                finally:
+                    if running is not None:
+                        running.discard(proc)
+            if running is not None and running.closed:
+                return {"status": "cancelled", "message": "Batch closed while the proof ran"}
+            self._write_result_file(output_file, resolved, timestamp, stdout, stderr)
+
+            proof = {
+                "status": "proved" if proc.returncode == 0 else "failed",
+                "returncode": proc.returncode,
+                "stdout": stdout,
+                "stderr": stderr,
+                "output_file": output_file,
+                "input_file": resolved,
+                "input_hash": input_hash,
+                "timestamp": timestamp
+            }
+            if cache_key is not None:
+                self.cache.put(cache_key, input_hash, proof)
+            METRICS.inc("prover9_proofs_total", status=proof["status"])
+            return proof
+        except subprocess.TimeoutExpired:
+            METRICS.inc("prover9_proofs_total", status="timeout")
+            return {"status": "timeout", "message": f"Proof timed out after {timeout}s"}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    async def run_proof_async(self, pv9_file: str, timeout: float = 60,
+                              cpu_time_limit: Optional[int] = None,
+                              memory_limit: Optional[int] = None) -> Dict:
+        """Run a proof under ProofSupervisor.
+        
+        Output is streamed to the result file rather than returned, and the
+        result adds wall_time, cpu_time and max_rss_kb. See ProofSupervisor
+        for the limits.
+        """
+        if not shutil.which("prover9"):
+            return {
+                "status": "error",
+                "message": "prover9 not found. Install via: pkg install prover9",
+                "output": None
+            }
+
+        resolved = self._resolve_pv9_path(pv9_file)
+        output_file = self._output_file(resolved)
+        # Hash what is proved, not what the file holds once the proof ends
+        try:
+            input_hash = self._hash_file(resolved)
+        except OSError as e:
+            return {"status": "error", "message": str(e)}
+        timestamp = datetime.now().isoformat()
+        header = f"# Prover9 Output - {timestamp}\n# Input: {resolved}\n\n"
+        supervisor = ProofSupervisor(cpu_time_limit, memory_limit)
+        try:
+            result = await supervisor.run(["prover9"] + self.PROVER9_ARGS + [resolved],
+                                          output_file, header, timeout)
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+        result["timestamp"] = timestamp
+        result["input_file"] = resolved
+        result["input_hash"] = input_hash
+        if result["status"] == "timeout":
+            result["message"] = f"Proof timed out after {timeout}s"
+        if METRICS.enabled:
+            METRICS.inc("prover9_proofs_total", status=result["status"])
+            METRICS.observe("prover9_proof_seconds", result["wall_time"])
+            METRICS.inc("prover9_cpu_seconds_total", result["cpu_time"])
+        return result
+
+    def run_proof_supervised(self, pv9_file: str, timeout: float = 60,
+                             cpu_time_limit: Optional[int] = None,
+                             memory_limit: Optional[int] = None) -> Dict:
+        """Synchronous wrapper around run_proof_async."""
+        return asyncio.run(self.run_proof_async(pv9_file, timeout, cpu_time_limit, memory_limit))
+
+    async def run_batch_async(self, pv9_files: List[str], max_concurrency: int = 4,
+                              timeout: float = 60, cpu_time_limit: Optional[int] = None,
+                              memory_limit: Optional[int] = None):
+        """Supervised counterpart of run_batch: an async generator of results
+        in completion order, with at most max_concurrency proofs running.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(pv9_file: str) -> Dict:
+            async with semaphore:
+                try:
+                    result = await self.run_proof_async(pv9_file, timeout,
+                                                        cpu_time_limit, memory_limit)
+                except Exception as e:
+                    result = {"status": "error", "message": str(e)}
+            result["pv9_file"] = pv9_file
+            return result
+
+        tasks = [asyncio.ensure_future(run_one(pv9_file)) for pv9_file in pv9_files]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def run_batch(self, pv9_files: List[str], max_workers: int = 4, timeout: float = 60,
+                  deadline: Optional[float] = None) -> Iterator[Dict]:
+        """Run many proofs concurrently, yielding each result as it completes.
+        
+        Each proof runs in its own prover9 process with its own timeout, so
+        a long-running proof only occupies one of the max_workers slots.
+        deadline is a global budget in seconds for the whole batch: running
+        proofs are cut short when it expires and proofs not yet started are
+        reported with status "deadline". Every result carries its pv9_file.
+        
+        If the consumer stops early (closing the generator), queued proofs
+        are cancelled and running prover9 processes are killed, instead of
+        waiting for them to finish or time out.
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        
+        end_time = time.monotonic() + deadline if deadline is not None else None
+        
+        def run_one(pv9_file: str) -> Dict:
+            proof_timeout = timeout
+            if end_time is not None:
+                remaining = end_time - time.monotonic()
+                if remaining <= 0:
+                    return {"status": "deadline", "pv9_file": pv9_file,
+                            "message": f"Batch deadline of {deadline}s reached before proof started"}
+                proof_timeout = min(timeout, remaining)
+            try:
+                result = self._run_proof(pv9_file, timeout=proof_timeout, running=running)
+            except Exception as e:
+                result = {"status": "error", "message": str(e)}
+            result["pv9_file"] = pv9_file
+            return result
+        
+        running = _RunningProofs()
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [pool.submit(run_one, pv9_file) for pv9_file in pv9_files]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # No-op after a full run; after an early close, stop everything
+            pool.shutdown(wait=False, cancel_futures=True)
+            running.close()
+    
+    def ingest_results(self, investigation: 'Investigation', source_id: str,
+                       results: List[Dict], blob_store=None) -> int:
+        """Attach proof results to an authority source as evidence in one batch.
+        
+        Only completed proofs ("proved" or "failed") are attached. Proofs
+        whose input hash is already on the source, or repeated within the
+        batch, are skipped. The evidence references the result file instead
+        of copying prover output into the investigation; with a blob_store
+        (see blob_store.py) the output is also stored there and referenced
+        by digest, so it survives the result file. Returns the number of
+        evidence entries added.
+        """
+        if source_id not in investigation.sources:
+            raise ValueError(f"Authority source {source_id} not found")
+
+        seen = {ev.get('input_hash') for ev in investigation.sources[source_id].evidence
+                if ev.get('type') == 'Formal Proof'}
+        evidence = []
+        for result in results:
+            input_hash = result.get("input_hash")
+            if result.get("status") not in ("proved", "failed") or not input_hash:
+                continue
+            if input_hash in seen:
+                continue
+            seen.add(input_hash)
+            input_name = os.path.basename(result.get("input_file") or result.get("pv9_file", ""))
+            entry = {
+                'type': 'Formal Proof',
+                'description': f"Prover9 {result['status']}: {input_name}",
+                'source': result.get("output_file", ""),
+                'timestamp': result.get("timestamp") or datetime.now().isoformat(),
+                'input_hash': input_hash,
+                'metadata': {
+                    'audit_id': self.audit_id,
+                    'status': result['status'],
+                    'returncode': result.get("returncode"),
+                    'input_file': result.get("input_file")
+                }
+            }
+            for key in ("wall_time", "cpu_time", "max_rss_kb"):
+                if key in result:
+                    entry['metadata'][key] = result[key]
+            output_file = result.get("output_file")
+            if blob_store is not None and output_file and os.path.exists(output_file):
+                with open(output_file, 'rb') as f:
+                    output = f.read()
+                entry['blob'] = blob_store.put(output)
+                entry['blob_size'] = len(output)
+            evidence.append(entry)
+
+        return investigation.add_evidence_batch(source_id, evidence)
+
+    def invalidate_cache(self, pv9_file: Optional[str] = None) -> int:
+        """Forget cached proof results for one input file, or all of them.
+        
+        Returns the number of cache entries removed.
+        """
+        if self.cache is None:
+            return 0
+        if pv9_file is None:
+            return self.cache.invalidate()
+        return self.cache.invalidate(self._hash_file(self._resolve_pv9_path(pv9_file)))
+
+    def run_observer_patch_holography(self, pv9_file: str) -> Dict:
+        """Run Observer Patch Holography proof and log to Evidence audit dir."""
+        print(f"[ObserverPatch] Running holographic proof: {pv9_file}")
+        result = self.run_proof(pv9_file)
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "pv9_file": pv9_file,
+            "result": result
+        }
+        self.audit_log.append(entry)
+        print(f"[ObserverPatch] Result: {result.get('status')} | Log: {self.audit_log.log_path}")
+        return result
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+FULL-TEXT SEARCH INDEX FOR INVESTIGATOR-DESK
+
+Persistent inverted index over authority sources, evidence and notes of
+every investigation, with phrase and prefix queries and BM25 ranking.
+
+Usage:
+    from search_index import SearchIndex
+    from investigator import InvestigatorDesk
+
+    desk = InvestigatorDesk()
+    index = SearchIndex()
+    desk.register_index(index)  # re-indexes each investigation on save
+
+    for hit in index.search('"miranda v arizona" habeas*'):
+        print(hit['score'], hit['investigation_id'], hit['kind'], hit['text'])
+
+Query syntax: plain words, "quoted phrases" and prefix* terms. Every
+clause must match; results are ranked by BM25.
+"""
+
+import bisect
+import json
+import math
+import os
+import re
+import sys
+from typing import List, Dict, Optional, Tuple
+
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Characters of a document's text kept for display in results
+SNIPPET_LENGTH = 200
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lower-case word tokens."""
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def investigation_documents(investigation) -> List[Tuple[Dict, str]]:
+    """
+    Return (info, text) for every searchable part of an investigation.
+
+    Each authority source, evidence entry and note is one document.
+    """
+    inv_id = investigation.investigation_id
+    docs = []
+    for source_id, source in investigation.sources.items():
+        docs.append((
+            {'investigation_id': inv_id, 'kind': 'source', 'source_id': source_id},
+            f"{source.name} {source.description} {source.authority_type}"
+        ))
+        for i, ev in enumerate(source.evidence):
+            docs.append((
+                {'investigation_id': inv_id, 'kind': 'evidence', 'source_id': source_id,
+                 'evidence_index': i},
+                f"{ev.get('type', '')} {ev.get('description', '')} {ev.get('source', '')}"
+            ))
+    for i, note in enumerate(investigation.notes):
+        docs.append((
+            {'investigation_id': inv_id, 'kind': 'note', 'note_index': i},
+            note.get('note', '')
+        ))
+    return docs
+
+
+class SearchIndex:
+    """
+    Inverted index with positional postings across all investigations.
+
+    Each investigation is stored as its own segment file, so re-indexing
+    one investigation on save rewrites only that segment. All segments are
+    merged in memory at startup and queries never touch the disk.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, index_dir: str = os.path.join(".investigator-data", "search-index")):
+        self.index_dir = index_dir
+        os.makedirs(index_dir, exist_ok=True)
+        # term -> {doc_id: [positions]}
+        self.postings: Dict[str, Dict[str, List[int]]] = {}
+        # doc_id -> {'info': {...}, 'length': n}
+        self.docs: Dict[str, Dict] = {}
+        # investigation_id -> terms and doc_ids in its segment
+        self.segment_terms: Dict[str, List[str]] = {}
+        self.segment_docs: Dict[str, List[str]] = {}
+        self._total_length = 0
+        self._sorted_terms: Optional[List[str]] = None
+        self._load()
+
+    def _segment_path(self, investigation_id: str) -> str:
+        return os.path.join(self.index_dir, f"{investigation_id}.json")
+
+    def _load(self):
+        """Merge every segment on disk into memory."""
+        for filename in os.listdir(self.index_dir):
+            if not filename.endswith('.json'):
+                continue
+            path = os.path.join(self.index_dir, filename)
+            try:
+                with open(path, 'r') as f:
+                    segment = json.load(f)
+                self._add_segment(segment)
+            except Exception as e:
+                print(f"Error loading search segment {filename}: {e}", file=sys.stderr)
+
+    def _add_segment(self, segment: Dict):
+        inv_id = segment['investigation_id']
+        for doc_id, doc in segment['docs'].items():
+            self.docs[doc_id] = doc
+            self._total_length += doc['length']
+        for term, postings in segment['postings'].items():
+            self.postings.setdefault(term, {}).update(postings)
+        self.segment_terms[inv_id] = list(segment['postings'])
+        self.segment_docs[inv_id] = list(segment['docs'])
+        self._sorted_terms = None
+
+    def _drop(self, investigation_id: str):
+        doc_ids = self.segment_docs.pop(investigation_id, [])
+        for term in self.segment_terms.pop(investigation_id, []):
+            postings = self.postings.get(term, {})
+            for doc_id in doc_ids:
+                postings.pop(doc_id, None)
+            if not postings:
+                self.postings.pop(term, None)
+        for doc_id in doc_ids:
+            self._total_length -= self.docs.pop(doc_id)['length']
+        self._sorted_terms = None
+
+    def index_investigation(self, investigation) -> int:
+        """
+        Replace the segment for an investigation.
+
+        Returns the number of documents indexed.
+        """
+        inv_id = investigation.investigation_id
+        self._drop(inv_id)
+
+        docs = {}
+        postings: Dict[str, Dict[str, List[int]]] = {}
+        for n, (info, text) in enumerate(investigation_documents(investigation)):
+            doc_id = f"{inv_id}#{n}"
+            tokens = tokenize(text)
+            info['text'] = text.strip()[:SNIPPET_LENGTH]
+            docs[doc_id] = {'info': info, 'length': len(tokens)}
+            for pos, token in enumerate(tokens):
+                postings.setdefault(token, {}).setdefault(doc_id, []).append(pos)
+
+        segment = {'investigation_id': inv_id, 'docs': docs, 'postings': postings}
+        tmp_path = self._segment_path(inv_id) + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(segment, f)
+        os.replace(tmp_path, self._segment_path(inv_id))
+
+        self._add_segment(segment)
+        return len(docs)
+
+    def remove_investigation(self, investigation_id: str):
+        """Remove an investigation's segment from the index."""
+        self._drop(investigation_id)
+        path = self._segment_path(investigation_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+        start = bisect.bisect_left(self._sorted_terms, prefix)
+        end = start
+        while end < len(self._sorted_terms) and self._sorted_terms[end].startswith(prefix):
+            end += 1
+        return self._sorted_terms[start:end]
+
+    def _phrase_docs(self, terms: List[str]) -> Dict[str, List[int]]:
+        """Return doc_id -> start positions where terms occur consecutively."""
+        if not terms or any(t not in self.postings for t in terms):
+            return {}
+        first = self.postings[terms[0]]
+        matches = {}
+        for doc_id, positions in first.items():
+            later = []
+            for term in terms[1:]:
+                doc_positions = self.postings[term].get(doc_id)
+                if doc_positions is None:
+                    break
+                later.append(set(doc_positions))
+            else:
+                starts = [p for p in positions
+                          if all(p + k + 1 in s for k, s in enumerate(later))]
+                if starts:
+                    matches[doc_id] = starts
+        return matches
+
+    @staticmethod
+    def parse_query(query: str) -> List[Tuple[str, List[str]]]:
+        """
+        Split a query into ('phrase', terms), ('prefix', [prefix]) and
+        ('term', [term]) clauses.
+        """
+        clauses = []
+        for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+            if phrase:
+                terms = tokenize(phrase)
+                if len(terms) == 1:
+                    clauses.append(('term', terms))
+                elif terms:
+                    clauses.append(('phrase', terms))
+            elif word.endswith('*') and tokenize(word):
+                clauses.append(('prefix', tokenize(word)[-1:]))
+            else:
+                clauses.extend(('term', [t]) for t in tokenize(word))
+        return clauses
+
+    def _bm25(self, postings: Dict[str, List[int]],
+              scores: Dict[str, float], doc_ids):
+        n_docs = len(self.docs)
+        avg_length = self._total_length / n_docs if n_docs else 0
+        idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+        for doc_id in doc_ids:
+            tf = len(postings[doc_id])
+            norm = 1 - self.B + self.B * self.docs[doc_id]['length'] / (avg_length or 1)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.K1 + 1) / (tf + self.K1 * norm)
+
+    def search(self, query: str, limit: int = 20,
+               investigation_id: Optional[str] = None) -> List[Dict]:
+        """
+        Return the best matching documents, highest BM25 score first.
+
+        Each result holds investigation_id, kind ('source', 'evidence' or
+        'note'), the source_id / evidence_index / note_index locating it,
+        a text snippet and its score.
+        """
+        clauses = self.parse_query(query)
+        if not clauses:
+            return []
+
+        # Each clause yields the docs it matches and the terms to score
+        clause_matches = []
+        for kind, terms in clauses:
+            if kind == 'term':
+                docs = set(self.postings.get(terms[0], {}))
+                scored = terms
+            elif kind == 'prefix':
+                scored = self._expand_prefix(terms[0])
+                docs = set()
+                for term in scored:
+                    docs.update(self.postings[term])
+            else:
+                docs = set(self._phrase_docs(terms))
+                scored = terms
+            clause_matches.append((docs, scored))
+
+        matched = set.intersection(*(docs for docs, _ in clause_matches))
+        if investigation_id is not None:
+            matched &= set(self.segment_docs.get(investigation_id, []))
+        if not matched:
+            return []
+
+        scores: Dict[str, float] = {}
+        for _, scored in clause_matches:
+            for term in scored:
+                postings = self.postings.get(term, {})
+                self._bm25(postings, scores, matched.intersection(postings))
+
+        ranked = sorted(matched, key=lambda d: scores.get(d, 0.0), reverse=True)[:limit]
+        results = []
+        for doc_id in ranked:
+            hit = dict(self.docs[doc_id]['info'])
+            hit['score'] = round(scores.get(doc_id, 0.0), 4)
+            results.append(hit)
+        return results
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+STATIC-SITE DATA BUNDLE FOR INVESTIGATOR-DESK
+
+Builds the data the web front end (index.html / app.js) loads lazily:
+
+    data/index.json             one summary row per investigation
+    data/cases/<id>.json        full detail of one investigation
+    data/search/<xx>.json       term -> {investigation_id: term count},
+                                sharded by the term's first two characters
+    data/graphs/<id>.json       laid-out link graph (see link_graph.py)
+    data/custody/<id>.json      custody ledger head and latest records
+                                (with --custody, see custody_ledger.py)
+
+Output is compact JSON with sorted keys so it compresses well and is
+byte-identical between builds. Builds are incremental: only the case,
+graph and search shards of investigations whose file changed since the
+last build are re-emitted.
+
+Usage:
+    python site_bundle.py [--data-dir .investigator-data] [--out-dir data] [--force] [--custody]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from typing import List, Dict, Optional, Set
+
+from investigator import InvestigatorDesk, Investigation
+from search_index import tokenize, investigation_documents
+
+
+MANIFEST_FILE = "manifest.json"
+# Characters of a term that select its search shard
+SHARD_PREFIX_LENGTH = 2
+# Custody records emitted per case for the front end
+CUSTODY_TAIL = 100
+
+
+def shard_key(term: str) -> str:
+    """Search shard a term belongs to."""
+    return term[:SHARD_PREFIX_LENGTH]
+
+
+def _dump(data) -> str:
+    return json.dumps(data, separators=(',', ':'), sort_keys=True)
+
+
+class SiteBundleBuilder:
+    """
+    Incrementally emits the front end's sharded JSON bundle.
+
+    The manifest (out_dir/manifest.json) records, per investigation, the
+    stat and content hash of its data file and the search shards it
+    contributed to, so unchanged investigations are skipped without being
+    parsed.
+
+    With a CustodyLedger every emitted case is recorded as an export in
+    the investigation's custody ledger.
+    """
+
+    def __init__(self, data_dir: str = ".investigator-data", out_dir: str = "data",
+                 graphs: bool = True, custody=None):
+        self.data_dir = data_dir
+        self.out_dir = out_dir
+        self.graphs = graphs
+        self.custody = custody
+        self.manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+        for sub in ("cases", "search") + (("custody",) if custody is not None else ()):
+            os.makedirs(os.path.join(out_dir, sub), exist_ok=True)
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading bundle manifest {self.manifest_path}: {e}", file=sys.stderr)
+            return {}
+
+    def _write(self, path: str, text: str):
+        with open(path + ".tmp", 'w') as f:
+            f.write(text)
+        os.replace(path + ".tmp", path)
+
+    def _scan(self) -> Dict[str, str]:
+        """Map investigation IDs to their files in data_dir."""
+        desk = InvestigatorDesk(self.data_dir, preload=False)
+        return {inv_id: desk._get_investigation_file(inv_id)
+                for inv_id in desk.list_investigation_ids()}
+
+    @staticmethod
+    def case_summary(investigation: Investigation) -> Dict:
+        """Row of the case index for one investigation."""
+        return {
+            'investigation_id': investigation.investigation_id,
+            'title': investigation.title,
+            'status': investigation.status,
+            'created_at': investigation.created_at,
+            'source_count': len(investigation.sources),
+            'evidence_count': sum(len(s.evidence) for s in investigation.sources.values()),
+            'note_count': len(investigation.notes)
+        }
+
+    @staticmethod
+    def term_counts(investigation: Investigation) -> Dict[str, int]:
+        """Count every search term in an investigation's title, description and documents."""
+        counts: Dict[str, int] = {}
+        texts = [investigation.title, investigation.description]
+        texts += [text for _, text in investigation_documents(investigation)]
+        for text in texts:
+            for term in tokenize(text):
+                counts[term] = counts.get(term, 0) + 1
+        return counts
+
+    def build(self, force: bool = False) -> Dict[str, int]:
+        """
+        Bring the bundle up to date with data_dir.
+
+        Args:
+            force: Re-emit every investigation, ignoring the manifest
+
+        Returns:
+            Counts of 'written', 'skipped' and 'removed' investigations
+        """
+        manifest = self._load_manifest()
+        if force:
+            search_dir = os.path.join(self.out_dir, "search")
+            for filename in os.listdir(search_dir):
+                os.remove(os.path.join(search_dir, filename))
+            manifest = {stem: dict(entry, shards=[], stat=None, sha256=None)
+                        for stem, entry in manifest.items()}
+        files = self._scan()
+        stats = {'written': 0, 'skipped': 0, 'removed': 0}
+        # shard -> investigation_id -> {term: count} (None = remove)
+        shard_updates: Dict[str, Dict[str, Optional[Dict[str, int]]]] = {}
+
+        for stem in sorted(set(manifest) - set(files)):
+            for key in manifest.pop(stem)['shards']:
+                shard_updates.setdefault(key, {})[stem] = None
+            for path in (os.path.join(self.out_dir, "cases", f"{stem}.json"),
+                         os.path.join(self.out_dir, "graphs", f"{stem}.json"),
+                         os.path.join(self.out_dir, "custody", f"{stem}.json")):
+                if os.path.exists(path):
+                    os.remove(path)
+            stats['removed'] += 1
+
+        engine = None
+        for stem, path in sorted(files.items()):
+            st = os.stat(path)
+            entry = manifest.get(stem)
+            if entry and entry['stat'] == [st.st_size, st.st_mtime_ns]:
+                stats['skipped'] += 1
+                continue
+            with open(path, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            if entry and entry['sha256'] == digest:
+                entry['stat'] = [st.st_size, st.st_mtime_ns]
+                stats['skipped'] += 1
+                continue
+            try:
+                inv = Investigation.from_dict(json.loads(raw))
+            except Exception as e:
+                print(f"Error loading {path}: {e}", file=sys.stderr)
+                continue
+
+            case_path = os.path.join(self.out_dir, "cases", f"{stem}.json")
+            case_text = _dump(inv.to_dict())
+            self._write(case_path, case_text)
+            if self.custody is not None:
+                self._write_custody(inv.investigation_id, stem, case_path, case_text)
+            if self.graphs:
+                if engine is None:
+                    from link_graph import LinkGraphEngine
+                    engine = LinkGraphEngine(cache_dir=os.path.join(self.data_dir, "graph-cache"))
+                engine.write(inv, os.path.join(self.out_dir, "graphs"))
+
+            counts = self.term_counts(inv)
+            by_shard: Dict[str, Dict[str, int]] = {}
+            for term, n in counts.items():
+                by_shard.setdefault(shard_key(term), {})[term] = n
+            old_shards = set(entry['shards']) if entry else set()
+            for key in old_shards - set(by_shard):
+                shard_updates.setdefault(key, {})[stem] = None
+            for key, terms in by_shard.items():
+                shard_updates.setdefault(key, {})[stem] = terms
+
+            manifest[stem] = {
+                'stat': [st.st_size, st.st_mtime_ns],
+                'sha256': digest,
+                'shards': sorted(by_shard),
+                'summary': self.case_summary(inv)
+            }
+            stats['written'] += 1
+
+        for key, updates in shard_updates.items():
+            self._update_shard(key, updates)
+        if stats['written'] or stats['removed'] or not os.path.exists(
+                os.path.join(self.out_dir, "index.json")):
+            index = [manifest[stem]['summary'] for stem in sorted(manifest)]
+            self._write(os.path.join(self.out_dir, "index.json"), _dump(index))
+        self._write(self.manifest_path, _dump(manifest))
+        return stats
+
+    def _write_custody(self, investigation_id: str, stem: str, case_path: str, case_text: str):
+        """Record the export of a case and emit its latest custody records."""
+        self.custody.record_export(investigation_id, case_path,
+                                   digest=hashlib.sha256(case_text.encode('utf-8')).hexdigest(),
+                                   via="site_bundle")
+        seq, head = self.custody.head(investigation_id)
+        self._write(os.path.join(self.out_dir, "custody", f"{stem}.json"), _dump({
+            'seq': seq,
+            'head': head,
+            'records': self.custody.tail(investigation_id, CUSTODY_TAIL)
+        }))
+
+    def _update_shard(self, key: str, updates: Dict[str, Optional[Dict[str, int]]]):
+        """Replace the postings of the given investigations in one search shard."""
+        path = os.path.join(self.out_dir, "search", f"{key}.json")
+        shard: Dict[str, Dict[str, int]] = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                shard = json.load(f)
+        changed: Set[str] = set(updates)
+        for term in list(shard):
+            postings = {inv_id: n for inv_id, n in shard[term].items() if inv_id not in changed}
+            if postings:
+                shard[term] = postings
+            else:
+                del shard[term]
+        for inv_id, terms in updates.items():
+            for term, n in (terms or {}).items():
+                shard.setdefault(term, {})[inv_id] = n
+        if shard:
+            self._write(path, _dump(shard))
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Build the static-site data bundle."""
+    parser = argparse.ArgumentParser(description="Build the INVESTIGATOR-DESK site data bundle")
+    parser.add_argument("--data-dir", default=".investigator-data")
+    parser.add_argument("--out-dir", default="data")
+    parser.add_argument("--force", action="store_true", help="rebuild every shard")
+    parser.add_argument("--no-graphs", action="store_true", help="skip link-graph export")
+    parser.add_argument("--custody", action="store_true",
+                        help="record exports in the custody ledgers and emit their latest records")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.data_dir):
+        print(f"Data directory not found: {args.data_dir}", file=sys.stderr)
+        return 1
+    custody = None
+    if args.custody:
+        from custody_ledger import CustodyLedger
+        custody = CustodyLedger(os.path.join(args.data_dir, "custody"))
+    builder = SiteBundleBuilder(args.data_dir, args.out_dir, graphs=not args.no_graphs, custody=custody)
+    stats = builder.build(force=args.force)
+    print(f"✓ Bundle in {args.out_dir}: {stats['written']} written, "
+          f"{stats['skipped']} unchanged, {stats['removed']} removed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+SNAPSHOTS, STRUCTURAL DIFF AND POINT-IN-TIME RESTORE FOR INVESTIGATOR-DESK
+
+Records versions of an investigation without copying it. Evidence
+entries, notes and source headers are stored once each, keyed by the
+SHA-256 of their content; a snapshot is a delta against the previous
+one listing only what changed (edited, appended, inserted or removed
+entries of evidence, connection and note lists, changed fields, added
+or removed sources).
+Every KEYFRAME_INTERVAL-th snapshot is stored in full to bound restore
+time. Given a BlobStore, the store pins every blob its snapshots
+reference, so BlobStore.gc() keeps evidence content that only old
+versions still use.
+
+Layout:
+    <root>/<investigation id>/objects.jsonl     [digest, content] per line
+    <root>/<investigation id>/snapshots.jsonl   one snapshot record per line
+
+Usage:
+    from snapshots import SnapshotStore
+    from blob_store import BlobStore
+    from investigator import InvestigatorDesk
+
+    desk = InvestigatorDesk()
+    blobs = BlobStore()
+    desk.register_index(blobs)
+    snapshots = SnapshotStore(blob_store=blobs)
+    desk.register_index(snapshots)      # snapshot on every save
+    snapshots.snapshot(inv, label="before interview")
+
+    changes = snapshots.diff("INV-001", at_a="2026-01-01", at_b="2026-02-01")
+    old = snapshots.restore("INV-001", at="2026-01-15T12:00:00")
+
+    python snapshots.py list INV-001
+    python snapshots.py diff INV-001 --from 2026-01-01 --to 2026-02-01
+    python snapshots.py restore INV-001 --at 2026-01-15
+    python snapshots.py restore INV-001 --at '#12'    # snapshot ID 12
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+
+from metrics import METRICS
+
+
+KEYFRAME_INTERVAL = 64
+META_FIELDS = ('title', 'description', 'status', 'created_at')
+HEADER_FIELDS = ('name', 'description', 'authority_type', 'created_at')
+
+
+def _digest(obj) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def _list_delta(old: List, new: List) -> Optional[Dict]:
+    """
+    Encode list new against old; None if they are equal.
+
+    Two encodings are tried and the smaller one kept: a positional patch
+    ({'set': [[index, value], ...], 'add': tail, 'len': n}) for in-place
+    edits and appends, and a splice ({'keep': prefix length, 'add':
+    middle, 'tail': suffix length}) for insertions and removals.
+    """
+    if old == new:
+        return None
+    common = min(len(old), len(new))
+    changed = [[i, new[i]] for i in range(common) if old[i] != new[i]]
+    patch = {'set': changed, 'add': new[common:], 'len': len(new)}
+
+    keep = 0
+    while keep < common and old[keep] == new[keep]:
+        keep += 1
+    tail = 0
+    while tail < common - keep and old[-1 - tail] == new[-1 - tail]:
+        tail += 1
+    splice = {'keep': keep, 'add': new[keep:len(new) - tail], 'tail': tail}
+    return patch if len(changed) + len(patch['add']) < len(splice['add']) else splice
+
+
+def _apply_list_delta(old: List, delta: Optional[Dict]) -> List:
+    if delta is None:
+        return old
+    if 'set' in delta:
+        result = old[:min(len(old), delta['len'])]
+        for i, value in delta['set']:
+            result[i] = value
+        return result + delta['add']
+    return old[:delta['keep']] + delta['add'] + old[len(old) - delta.get('tail', 0):]
+
+
+def _manifest_delta(old: Dict, new: Dict) -> Dict:
+    """Changes turning manifest old into new; empty if they are equal."""
+    delta = {}
+    meta = {k: v for k, v in new['meta'].items() if old['meta'].get(k) != v}
+    if meta:
+        delta['meta'] = meta
+    sources = {}
+    for sid in old['sources']:
+        if sid not in new['sources']:
+            sources[sid] = None
+    empty = {'header': None, 'evidence': [], 'connections': []}
+    for sid, entry in new['sources'].items():
+        before = old['sources'].get(sid, empty)
+        change = {}
+        if entry['header'] != before['header']:
+            change['header'] = entry['header']
+        for key in ('evidence', 'connections'):
+            list_delta = _list_delta(before[key], entry[key])
+            if list_delta is not None:
+                change[key] = list_delta
+        if change or sid not in old['sources']:
+            sources[sid] = change
+    if sources:
+        delta['sources'] = sources
+    notes = _list_delta(old['notes'], new['notes'])
+    if notes is not None:
+        delta['notes'] = notes
+    return delta
+
+
+def _apply_manifest_delta(manifest: Dict, delta: Dict) -> Dict:
+    result = {
+        'meta': dict(manifest['meta'], **delta.get('meta', {})),
+        'sources': dict(manifest['sources']),
+        'notes': _apply_list_delta(manifest['notes'], delta.get('notes'))
+    }
+    for sid, change in delta.get('sources', {}).items():
+        if change is None:
+            result['sources'].pop(sid, None)
+            continue
+        before = manifest['sources'].get(sid, {'header': None, 'evidence': [], 'connections': []})
+        result['sources'][sid] = {
+            'header': change.get('header', before['header']),
+            'evidence': _apply_list_delta(before['evidence'], change.get('evidence')),
+            'connections': _apply_list_delta(before['connections'], change.get('connections'))
+        }
+    return result
+
+
+EMPTY_MANIFEST = {'meta': {}, 'sources': {}, 'notes': []}
+
+
+class SnapshotStore:
+    """
+    Delta-encoded version history of investigations.
+
+    The latest manifest (digests only) and the set of stored objects of
+    each investigation are kept in memory after first use, so taking a
+    snapshot costs one hash per evidence entry plus writes proportional
+    to what changed.
+
+    If blob_store is given, the blobs referenced by any snapshot of an
+    investigation are pinned in it under "snapshots-<investigation id>",
+    and restore() checks that they still exist.
+    """
+
+    def __init__(self, root: str = os.path.join(".investigator-data", "snapshots"),
+                 keyframe_interval: int = KEYFRAME_INTERVAL, blob_store=None):
+        self.root = root
+        self.keyframe_interval = keyframe_interval
+        self.blob_store = blob_store
+        # investigation_id -> (snapshot records, latest manifest)
+        self._history: Dict[str, Tuple[List[Dict], Dict]] = {}
+        # investigation_id -> digest -> stored object, loaded on first use
+        self._objects: Dict[str, Dict[str, object]] = {}
+        # Investigations whose blobs have been pinned since start
+        self._pinned: set = set()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, investigation_id: str) -> str:
+        if not investigation_id or os.sep in investigation_id or investigation_id.startswith('.'):
+            raise ValueError(f"Invalid investigation ID: {investigation_id!r}")
+        return os.path.join(self.root, investigation_id)
+
+    def _load_history(self, investigation_id: str) -> Tuple[List[Dict], Dict]:
+        history = self._history.get(investigation_id)
+        if history is not None:
+            return history
+        records = []
+        path = os.path.join(self._dir(investigation_id), "snapshots.jsonl")
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                records = [json.loads(line) for line in f if line.strip()]
+        manifest = self._replay(records, len(records)) if records else EMPTY_MANIFEST
+        self._history[investigation_id] = (records, manifest)
+        return records, manifest
+
+    @staticmethod
+    def _replay(records: List[Dict], count: int) -> Dict:
+        """Manifest after the first count snapshot records."""
+        start = count - 1
+        while start > 0 and 'full' not in records[start]:
+            start -= 1
+        manifest = EMPTY_MANIFEST
+        for record in records[start:count]:
+            if 'full' in record:
+                manifest = record['full']
+            else:
+                manifest = _apply_manifest_delta(manifest, record['delta'])
+        return manifest
+
+    def _load_objects(self, investigation_id: str) -> Dict[str, object]:
+        objects = self._objects.get(investigation_id)
+        if objects is None:
+            objects = {}
+            path = os.path.join(self._dir(investigation_id), "objects.jsonl")
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    for line in f:
+                        if line.strip():
+                            digest, obj = json.loads(line)
+                            objects[digest] = obj
+            self._objects[investigation_id] = objects
+        return objects
+
+    def manifest_of(self, investigation) -> Tuple[Dict, Dict[str, object]]:
+        """Return the digest manifest of an investigation and the objects it references."""
+        objects = {}
+
+        def ref(obj):
+            digest = _digest(obj)
+            objects[digest] = obj
+            return digest
+
+        sources = {}
+        for sid, source in investigation.sources.items():
+            data = source.to_dict()
+            sources[sid] = {
+                'header': ref({k: data[k] for k in HEADER_FIELDS}),
+                'evidence': [ref(evidence) for evidence in source.evidence],
+                'connections': list(source.connections)
+            }
+        manifest = {
+            'meta': {k: getattr(investigation, k) for k in META_FIELDS},
+            'sources': sources,
+            'notes': [ref(note) for note in investigation.notes]
+        }
+        return manifest, objects
+
+    def snapshot(self, investigation, label: str = "", force: bool = False) -> Optional[Dict]:
+        """
+        Record a snapshot of an investigation.
+
+        Args:
+            investigation: Investigation to snapshot
+            label: Optional description of the snapshot
+            force: Record a snapshot even if nothing changed
+
+        Returns:
+            The snapshot's summary (id, timestamp, label, changes), or
+            None if nothing changed since the last snapshot
+        """
+        inv_id = investigation.investigation_id
+        with self._lock, METRICS.timer("snapshot_seconds"):
+            manifest, objects = self.manifest_of(investigation)
+            records, latest = self._load_history(inv_id)
+            delta = _manifest_delta(latest, manifest)
+            if not delta and records and not force:
+                return None
+
+            directory = self._dir(inv_id)
+            os.makedirs(directory, exist_ok=True)
+            known = self._load_objects(inv_id)
+            new_objects = [(d, obj) for d, obj in objects.items() if d not in known]
+            if new_objects:
+                lines = [json.dumps([d, obj], separators=(',', ':')) for d, obj in new_objects]
+                with open(os.path.join(directory, "objects.jsonl"), 'a') as f:
+                    f.write("\n".join(lines) + "\n")
+                # Decoded copies, so later in-place edits of the evidence do not leak in
+                known.update(json.loads(line) for line in lines)
+            if self.blob_store is not None and (inv_id not in self._pinned or any(
+                    _blob_of(obj) for _, obj in new_objects)):
+                # Objects are never dropped, so the pin set only grows
+                self.blob_store.pin(f"snapshots-{inv_id}",
+                                    filter(None, map(_blob_of, known.values())))
+                self._pinned.add(inv_id)
+
+            snapshot_id = len(records) + 1
+            record = {'id': snapshot_id, 'timestamp': datetime.now().isoformat(), 'label': label,
+                      'changes': _count_changes(delta)}
+            if snapshot_id % self.keyframe_interval == 1 or self.keyframe_interval == 1:
+                record['full'] = manifest
+            else:
+                record['delta'] = delta
+            with open(os.path.join(directory, "snapshots.jsonl"), 'a') as f:
+                f.write(json.dumps(record, separators=(',', ':')) + "\n")
+            records.append(record)
+            self._history[inv_id] = (records, manifest)
+            METRICS.inc("snapshot_objects_written_total", len(new_objects))
+        return _summary(record)
+
+    def index_investigation(self, investigation) -> int:
+        """Snapshot an investigation when the desk saves it. Returns 1 if a snapshot was taken."""
+        return 0 if self.snapshot(investigation) is None else 1
+
+    def list_snapshots(self, investigation_id: str) -> List[Dict]:
+        """Return id, timestamp, label and change count of every snapshot, oldest first."""
+        return [_summary(record) for record in self._load_history(investigation_id)[0]]
+
+    def resolve(self, investigation_id: str, snapshot_id: Optional[int] = None,
+                at: Optional[str] = None) -> int:
+        """
+        Return a snapshot ID, given either the ID or a point in time.
+
+        With at, the latest snapshot taken at or before that ISO timestamp
+        is used; with neither, the latest snapshot.
+        """
+        records = self._load_history(investigation_id)[0]
+        if not records:
+            raise ValueError(f"No snapshots of investigation {investigation_id}")
+        if snapshot_id is not None:
+            if not 1 <= snapshot_id <= len(records):
+                raise ValueError(f"Snapshot {snapshot_id} of {investigation_id} not found")
+            return snapshot_id
+        if at is None:
+            return len(records)
+        chosen = 0
+        for record in records:
+            if record['timestamp'] <= at or record['timestamp'][:len(at)] == at:
+                chosen = record['id']
+            else:
+                break
+        if not chosen:
+            raise ValueError(f"No snapshot of {investigation_id} at or before {at}")
+        return chosen
+
+    def manifest(self, investigation_id: str, snapshot_id: int) -> Dict:
+        """Digest manifest of one snapshot."""
+        records = self._load_history(investigation_id)[0]
+        return self._replay(records, self.resolve(investigation_id, snapshot_id))
+
+    def restore(self, investigation_id: str, snapshot_id: Optional[int] = None,
+                at: Optional[str] = None):
+        """
+        Rebuild an investigation as it was at a snapshot or point in time.
+
+        Returns:
+            A new Investigation object; save it with the desk to roll back
+        """
+        from investigator import Investigation
+        manifest = self.manifest(investigation_id, self.resolve(investigation_id, snapshot_id, at))
+        objects = self._load_objects(investigation_id)
+        if self.blob_store is not None:
+            blobs = {_blob_of(objects[d]) for entry in manifest['sources'].values()
+                     for d in entry['evidence']} - {None}
+            missing = sorted(d for d in blobs if not self.blob_store.exists(d))
+            if missing:
+                raise ValueError(f"Snapshot of {investigation_id} references "
+                                 f"{len(missing)} missing blob(s), e.g. {missing[0]}")
+        sources = {}
+        for sid, entry in manifest['sources'].items():
+            sources[sid] = dict(objects[entry['header']], source_id=sid,
+                                evidence=[copy.deepcopy(objects[d]) for d in entry['evidence']],
+                                connections=list(entry['connections']))
+        data = dict(manifest['meta'], investigation_id=investigation_id, sources=sources,
+                    notes=[copy.deepcopy(objects[d]) for d in manifest['notes']])
+        return Investigation.from_dict(data)
+
+    def diff(self, investigation_id: str, a: Optional[int] = None, b: Optional[int] = None,
+             at_a: Optional[str] = None, at_b: Optional[str] = None) -> Dict:
+        """
+        Structural diff between two snapshots (by ID or point in time).
+
+        Returns:
+            Dictionary with 'from' and 'to' snapshot IDs, changed 'meta'
+            fields ({field: [old, new]}), 'sources_added',
+            'sources_removed', 'evidence_added' / 'evidence_removed'
+            ({'source_id', 'evidence'} entries), 'connections_added' /
+            'connections_removed' (source ID pairs) and 'notes_added' /
+            'notes_removed'
+        """
+        id_a = self.resolve(investigation_id, a, at_a) if (a or at_a) else 1
+        id_b = self.resolve(investigation_id, b, at_b)
+        old = self.manifest(investigation_id, id_a)
+        new = self.manifest(investigation_id, id_b)
+        return dict(diff_manifests(old, new, self._load_objects(investigation_id)),
+                    **{'from': id_a, 'to': id_b})
+
+
+def diff_manifests(old: Dict, new: Dict, objects: Dict[str, object]) -> Dict:
+    """Structural diff of two digest manifests; only changed entries are looked up in objects."""
+    result = {
+        'meta': {k: [old['meta'].get(k), v] for k, v in new['meta'].items() if old['meta'].get(k) != v},
+        'sources_added': sorted(set(new['sources']) - set(old['sources'])),
+        'sources_removed': sorted(set(old['sources']) - set(new['sources'])),
+        'evidence_added': [], 'evidence_removed': [],
+        'connections_added': [], 'connections_removed': [],
+    }
+    empty = {'evidence': [], 'connections': []}
+    old_edges, new_edges = set(), set()
+    for sid in sorted(set(old['sources']) | set(new['sources'])):
+        before = old['sources'].get(sid, empty)
+        after = new['sources'].get(sid, empty)
+        if before is after or before == after:
+            continue
+        old_ev, new_ev = Counter(before['evidence']), Counter(after['evidence'])
+        for digest, n in (new_ev - old_ev).items():
+            result['evidence_added'] += [{'source_id': sid, 'evidence': objects[digest]}] * n
+        for digest, n in (old_ev - new_ev).items():
+            result['evidence_removed'] += [{'source_id': sid, 'evidence': objects[digest]}] * n
+        # Connections are symmetric; both endpoints' lists change together
+        old_edges.update(tuple(sorted((sid, t))) for t in before['connections'])
+        new_edges.update(tuple(sorted((sid, t))) for t in after['connections'])
+    result['connections_added'] = [list(edge) for edge in sorted(new_edges - old_edges)]
+    result['connections_removed'] = [list(edge) for edge in sorted(old_edges - new_edges)]
+    old_notes, new_notes = Counter(old['notes']), Counter(new['notes'])
+    result['notes_added'] = [objects[d] for d, n in (new_notes - old_notes).items() for _ in range(n)]
+    result['notes_removed'] = [objects[d] for d, n in (old_notes - new_notes).items() for _ in range(n)]
+    return result
+
+
+def _blob_of(obj) -> Optional[str]:
+    """Blob digest referenced by a stored evidence object, if any."""
+    return obj.get('blob') if isinstance(obj, dict) else None
+
+
+def _count_changes(delta: Dict) -> int:
+    count = len(delta.get('meta', {}))
+    for change in delta.get('sources', {}).values():
+        if change is None:
+            count += 1
+            continue
+        count += 'header' in change
+        for key in ('evidence', 'connections'):
+            if key in change:
+                count += _list_changes(change[key])
+    if 'notes' in delta:
+        count += _list_changes(delta['notes'])
+    return count
+
+
+def _list_changes(delta: Dict) -> int:
+    return (len(delta.get('set', [])) + len(delta['add'])) or 1
+
+
+def _summary(record: Dict) -> Dict:
+    return {k: record[k] for k in ('id', 'timestamp', 'label', 'changes')}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """List, diff or restore investigation snapshots."""
+    parser = argparse.ArgumentParser(description="INVESTIGATOR-DESK snapshots")
+    parser.add_argument("--data-dir", default=".investigator-data")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list").add_argument("investigation_id")
+    diff_parser = sub.add_parser("diff")
+    diff_parser.add_argument("investigation_id")
+    diff_parser.add_argument("--from", dest="start", help="#snapshot ID or ISO timestamp")
+    diff_parser.add_argument("--to", dest="end", help="#snapshot ID or ISO timestamp")
+    restore_parser = sub.add_parser("restore")
+    restore_parser.add_argument("investigation_id")
+    restore_parser.add_argument("--at", help="#snapshot ID or ISO timestamp")
+    args = parser.parse_args(argv)
+
+    def point(value):
+        # Snapshot IDs need the '#' prefix, so a bare year is a timestamp
+        if value is None:
+            return None, None
+        if not value.startswith('#'):
+            return None, value
+        if not value[1:].isdigit():
+            raise ValueError(f"Invalid snapshot ID: {value!r}")
+        return int(value[1:]), None
+
+    from blob_store import BlobStore
+    blob_store = BlobStore(os.path.join(args.data_dir, "blobs"))
+    store = SnapshotStore(os.path.join(args.data_dir, "snapshots"), blob_store=blob_store)
+    try:
+        if args.command == "list":
+            for snap in store.list_snapshots(args.investigation_id):
+                print(f"{snap['id']:5d}  {snap['timestamp']}  {snap['changes']:6d} changes  {snap['label']}")
+        elif args.command == "diff":
+            (a, at_a), (b, at_b) = point(args.start), point(args.end)
+            print(json.dumps(store.diff(args.investigation_id, a, b, at_a, at_b), indent=2))
+        else:
+            from investigator import InvestigatorDesk
+            snapshot_id, at = point(args.at)
+            inv = store.restore(args.investigation_id, snapshot_id, at)
+            desk = InvestigatorDesk(args.data_dir, preload=False)
+            desk.register_index(blob_store, build=False)
+            desk.register_index(store, build=False)
+            desk.save_investigation(inv)
+            print(f"✓ Restored {args.investigation_id}")
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
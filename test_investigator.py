@@ -9,7 +9,29 @@ import sys
 import json
 import shutil
 import tempfile
-from investigator import InvestigatorDesk, Investigation, AuthoritySource
+from investigator import InvestigatorDesk, Investigation, AuthoritySource, Prover9Runner, shard_for
+
+
+STUB_PROVER9 = """#!/bin/sh
+# Test stand-in for prover9: "-f <file>"; files containing "slow" hang,
+# "spawn" hangs in a child process, "spin" burns CPU
+if grep -q spawn "$2"; then sleep 30 & echo $! > "$2.child"; wait; fi
+if grep -q spin "$2"; then while :; do :; done; fi
+if grep -q slow "$2"; then exec sleep 30; fi
+echo "THEOREM PROVED"
+cat "$2"
+"""
+
+
+def make_stub_prover9(directory):
+    """Put a stub prover9 executable first on PATH; returns the old PATH."""
+    stub = os.path.join(directory, "prover9")
+    with open(stub, 'w') as f:
+        f.write(STUB_PROVER9)
+    os.chmod(stub, 0o755)
+    old_path = os.environ.get("PATH", "")
+    os.environ["PATH"] = directory + os.pathsep + old_path
+    return old_path
 
 
 def test_authority_source_creation():
@@ -81,6 +103,23 @@ def test_add_evidence():
     print("✓ Add evidence test passed")
 
 
+def test_add_evidence_batch():
+    """Test appending a batch of evidence in one call."""
+    inv = Investigation("INV-TEST", "Test", "Test investigation")
+    inv.add_authority_source(AuthoritySource("AUTH-001", "Authority 1", "Test", "Type 1"))
+    
+    added = inv.add_evidence_batch("AUTH-001", [
+        {'type': "Document", 'description': f"Item {i}", 'source': "Ref"}
+        for i in range(3)
+    ])
+    
+    assert added == 3
+    evidence = inv.sources["AUTH-001"].evidence
+    assert [ev['description'] for ev in evidence] == ["Item 0", "Item 1", "Item 2"]
+    assert all('timestamp' in ev for ev in evidence)
+    print("✓ Add evidence batch test passed")
+
+
 def test_add_connections():
     """Test adding connections between authority sources."""
     inv = Investigation("INV-TEST", "Test", "Test investigation")
@@ -96,6 +135,26 @@ def test_add_connections():
     print("✓ Add connections test passed")
 
 
+def test_add_connections_bulk():
+    """Test connecting one source to many in a single call."""
+    inv = Investigation("INV-TEST", "Test", "Test investigation")
+    for i in range(4):
+        inv.add_authority_source(AuthoritySource(f"AUTH-{i}", f"Authority {i}", "Test", "Type"))
+    inv.add_connection("AUTH-0", "AUTH-1")
+    
+    added = inv.add_connections("AUTH-0", ["AUTH-1", "AUTH-2", "AUTH-3", "AUTH-3"])
+    
+    assert added == 2
+    assert inv.sources["AUTH-0"].connections == ["AUTH-1", "AUTH-2", "AUTH-3"]
+    assert inv.sources["AUTH-3"].connections == ["AUTH-0"]
+    try:
+        inv.add_connections("AUTH-0", ["AUTH-MISSING"])
+        assert False, "Expected ValueError for unknown source"
+    except ValueError:
+        pass
+    print("✓ Add connections bulk test passed")
+
+
 def test_add_notes():
     """Test adding investigation notes."""
     inv = Investigation("INV-TEST", "Test", "Test investigation")
@@ -128,7 +187,7 @@ def test_desk_operations():
         assert "INV-DESK-TEST" in desk.investigations
         
         # Verify file was created
-        expected_file = os.path.join(test_dir, "INV-DESK-TEST.json")
+        expected_file = os.path.join(test_dir, shard_for("INV-DESK-TEST"), "INV-DESK-TEST.json")
         assert os.path.exists(expected_file)
         
         # Test retrieval
@@ -200,6 +259,1310 @@ def test_report_generation():
         shutil.rmtree(test_dir)
 
 
+def test_lexis_import_ledger():
+    """Test that the import ledger skips reports already imported."""
+    from lexis_nexis_parser import LexisNexisParser, ImportLedger
+    
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        report = os.path.join(test_dir, "John_Doe.txt")
+        with open(report, 'w') as f:
+            f.write("Addresses:\n123 Main Street, Phoenix, AZ 85001\n"
+                    "Case Number: CV2023-001234\n")
+        copy = os.path.join(test_dir, "forwarded_copy.txt")
+        shutil.copy(report, copy)
+        
+        ledger_dir = os.path.join(test_dir, "ledger")
+        parser = LexisNexisParser(ledger=ImportLedger(ledger_dir))
+        inv = Investigation("INV-LEDGER", "Ledger Test", "Testing import ledger")
+        
+        added = parser.parse_and_import(inv, report, "John Doe")
+        assert added > 0
+        source_count = len(inv.sources)
+        
+        # Same content under another name is skipped for the same investigation
+        assert parser.parse_and_import(inv, copy, "John Doe") == 0
+        assert len(inv.sources) == source_count
+        
+        # A fresh ledger instance reads the persisted index and parse cache
+        parser2 = LexisNexisParser(ledger=ImportLedger(ledger_dir))
+        parser2._parse_file = None  # must not be called for a cached report
+        assert parser2.parse_and_import(inv, report, "John Doe") == 0
+        other = Investigation("INV-LEDGER-2", "Other", "Other target")
+        assert parser2.parse_and_import(other, copy, "John Doe") == added
+        
+        print("✓ Lexis import ledger test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_lexis_lossless_import():
+    """Test that lossless import keeps every record and summarizes on demand."""
+    from lexis_nexis_parser import LexisNexisParser, SUMMARY_LIMIT
+    
+    parser = LexisNexisParser()
+    data = {'phones': [{'number': f"602-555-{i:04d}", 'type': 'Mobile'} for i in range(25)]}
+    
+    summary_inv = Investigation("INV-SUM", "Summary", "Default import")
+    parser._import_to_investigation(summary_inv, data, "Jane Roe", "report.json")
+    phone_src = [s for s in summary_inv.sources.values() if s.authority_type == "Contact Records"][0]
+    assert len(phone_src.evidence) == SUMMARY_LIMIT
+    
+    full_inv = Investigation("INV-FULL", "Lossless", "Lossless import")
+    parser._import_to_investigation(full_inv, data, "Jane Roe", "report.json", lossless=True)
+    phone_src = [s for s in full_inv.sources.values() if s.authority_type == "Contact Records"][0]
+    assert len(phone_src.evidence) == 25
+    assert phone_src.evidence[24]['record']['number'] == "602-555-0024"
+    
+    view = parser.summary_view(phone_src)
+    assert len(view) == SUMMARY_LIMIT
+    assert view[0]['description'] == "Phone #1: 602-555-0000"
+    assert 'record' not in view[0]
+    print("✓ Lexis lossless import test passed")
+
+
+def test_lexis_structured_import():
+    """Test structured import of Lexis JSON into linked entity sources."""
+    from lexis_nexis_parser import LexisNexisParser
+    
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        report = os.path.join(test_dir, "report.json")
+        with open(report, 'w') as f:
+            json.dump({
+                'addresses': [{'address': "123 Main Street, Phoenix, AZ 85001"}],
+                'relatives': [{'name': "Jane Doe", 'relationship': "Sister", 'Age': "41"}],
+                'businesses': [{'name': "Doe Holdings LLC", 'title': "Manager"}],
+                'real_estate': [{'address': "9 Elm Ct, Mesa, AZ 85201",
+                                 'Assessed Value': "$250,000"}]
+            }, f)
+        
+        inv = Investigation("INV-STRUCT", "Structured", "Structured import")
+        added = LexisNexisParser().parse_and_import(inv, report, "John Doe", structured=True)
+        
+        # Subject profile, address history and three linked entities
+        assert added == 5
+        subject = [s for s in inv.sources.values() if s.authority_type == "Background Check"][0]
+        assert len(subject.connections) == 3
+        assert not any(s.authority_type == "Associate Network" for s in inv.sources.values())
+        
+        prop = [s for s in inv.sources.values() if s.authority_type == "Property Record"][0]
+        assert prop.name == "9 Elm Ct, Mesa, AZ 85201"
+        assert prop.evidence[0]['fields']['assessed_value'] == 250000.0
+        assert subject.source_id in prop.connections
+        
+        assoc = [s for s in inv.sources.values() if s.authority_type == "Associate"][0]
+        assert assoc.evidence[0]['fields'] == {'name': "Jane Doe", 'relationship': "Sister", 'age': 41}
+        print("✓ Lexis structured import test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_lexis_format_registry():
+    """Test content sniffing and third-party format registration."""
+    import lexis_nexis_parser
+    from lexis_nexis_parser import LexisNexisParser, detect_format, register_format
+    
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        # JSON content saved with a .txt extension is sniffed as JSON
+        misnamed = os.path.join(test_dir, "export.txt")
+        with open(misnamed, 'w') as f:
+            json.dump({'phones': ["602-555-1234"]}, f)
+        assert detect_format(misnamed).name == 'json'
+        
+        plain = os.path.join(test_dir, "notes.txt")
+        with open(plain, 'w') as f:
+            f.write("[Report] Case Number: CV2023-001234\n")
+        assert detect_format(plain).name == 'text'
+        
+        # Bracketed dates and a stray "<html" do not make a report JSON or HTML
+        dated = os.path.join(test_dir, "dated.txt")
+        with open(dated, 'w') as f:
+            f.write("[2023-01-05] Phone: 602-555-1234\nSee <html> export\n")
+        assert detect_format(dated).name == 'text'
+        inv = Investigation("INV-FMT", "Formats", "Format sniffing")
+        assert LexisNexisParser().parse_and_import(inv, dated, "Dated Report") > 0
+        
+        # A sniffed handler that fails falls back to the extension's handler
+        big = os.path.join(test_dir, "big.txt")
+        with open(big, 'w') as f:
+            f.write('{"not really json": ' + "x" * 5000 + "\nPhone: 602-555-1234\n")
+        assert detect_format(big).name == 'json'
+        assert LexisNexisParser()._parse_file(big)['phones'][0]['number'] == "602-555-1234"
+        
+        eml = os.path.join(test_dir, "forwarded.eml")
+        with open(eml, 'w') as f:
+            f.write("Subject: Report\n\nCall 602-555-1234")
+        
+        def parse_eml(parser, file_path):
+            with open(file_path) as f:
+                return parser._parse_text_content(f.read().split("\n\n", 1)[1])
+        
+        sniffed = []
+        register_format('eml', ['.eml'], parse_eml, sniff=lambda head: sniffed.append(head) and False)
+        try:
+            parser = LexisNexisParser()
+            assert '.eml' in parser.supported_formats
+            data = parser._parse_file(eml)
+            assert data['phones'][0]['number'] == "602-555-1234"
+            
+            # An import sniffs the file once, not again when parsing
+            sniffed.clear()
+            assert parser.parse_and_import(Investigation("INV-EML", "Eml", "Sniff once"), eml, "Eml") > 0
+            assert len(sniffed) == 1
+        finally:
+            lexis_nexis_parser.FORMAT_HANDLERS.pop('eml')
+        
+        print("✓ Lexis format registry test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_entity_normalization():
+    """Test canonical forms for phones, addresses and names."""
+    from entity_index import normalize_phone, normalize_address, normalize_name
+    
+    assert normalize_phone("(602) 555-1234") == "+16025551234"
+    assert normalize_phone("602.555.1234") == normalize_phone("1-602-555-1234")
+    assert normalize_phone("555-1234") is None
+    assert normalize_address("123 Main Street, Phoenix, AZ 85001-4321") == \
+        normalize_address("123 MAIN ST PHOENIX AZ 85001")
+    assert normalize_name("DOE, John A.") == normalize_name("Mr. John A Doe") == "john a doe"
+    print("✓ Entity normalization test passed")
+
+
+def test_entity_index():
+    """Test cross-investigation entity lookups maintained by the desk."""
+    from entity_index import EntityIndex
+    from lexis_nexis_parser import LexisNexisParser
+    
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        desk = InvestigatorDesk(data_dir=test_dir)
+        index_dir = os.path.join(test_dir, "entity-index")
+        desk.register_index(EntityIndex(index_dir))
+        
+        # Both spellings of the number are extracted as one phone
+        data = LexisNexisParser()._parse_text_content(
+            "Phone Numbers:\n(602) 555-1234\n602-555-1234\n")
+        assert len(data['phones']) == 1
+        
+        inv1 = desk.create_investigation("INV-E1", "First", "First case")
+        LexisNexisParser()._import_to_investigation(inv1, data, "John Doe", "a.txt")
+        desk.save_investigation(inv1)
+        
+        inv2 = desk.create_investigation("INV-E2", "Second", "Second case")
+        inv2.add_authority_source(AuthoritySource("AUTH-TIP", "Tip Line", "Tip", "Informant"))
+        inv2.add_evidence("AUTH-TIP", "Tip", "Caller left number 602.555.1234")
+        desk.save_investigation(inv2)
+        
+        # A fresh index instance reads the persisted entries
+        index = EntityIndex(index_dir)
+        assert index.investigations_for('phone', "+1 602 555 1234") == ["INV-E1", "INV-E2"]
+        hits = index.lookup('phone', "6025551234")
+        assert {'investigation_id': "INV-E2", 'source_id': "AUTH-TIP", 'evidence_index': 0} in hits
+        assert index.lookup('phone', "520-555-0000") == []
+        assert sorted(os.listdir(os.path.join(index_dir, "segments"))) == ["INV-E1.json", "INV-E2.json"]
+        
+        # Backfilling on registration saves once; a later save writes one segment
+        backfill = EntityIndex(os.path.join(test_dir, "backfill"))
+        saves = []
+        save = backfill.save
+        backfill.save = lambda: saves.append(set(backfill._dirty)) or save()
+        desk.register_index(backfill)
+        assert saves == [{"INV-E1", "INV-E2"}] and backfill.autosave
+        desk.save_investigation(inv2)
+        assert saves[-1] == {"INV-E2"}
+        
+        # A single-file index from older versions is split into segments
+        legacy_dir = os.path.join(test_dir, "legacy")
+        os.makedirs(legacy_dir)
+        with open(os.path.join(legacy_dir, "entities.json"), 'w') as f:
+            json.dump({'entries': index.entries, 'investigations': index.investigations}, f)
+        migrated = EntityIndex(legacy_dir)
+        assert not os.path.exists(os.path.join(legacy_dir, "entities.json"))
+        assert EntityIndex(legacy_dir).investigations_for('phone', "6025551234") == ["INV-E1", "INV-E2"]
+        assert migrated.investigations == index.investigations
+        print("✓ Entity index test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_prover9_batch():
+    """Test that a hanging proof does not hold up the rest of a batch."""
+    import time
+    
+    test_dir = tempfile.mkdtemp()
+    old_path = make_stub_prover9(test_dir)
+    
+    try:
+        runner = Prover9Runner("Audit_TEST", evidence_base=test_dir)
+        files = []
+        for name in ["slow", "a", "b", "c"]:
+            path = os.path.join(test_dir, f"{name}.pv9")
+            with open(path, 'w') as f:
+                f.write(f"formulas(goals). {name}. end_of_list.\n")
+            files.append(path)
+        
+        start = time.monotonic()
+        results = list(runner.run_batch(files, max_workers=2, timeout=1))
+        elapsed = time.monotonic() - start
+        
+        assert elapsed < 10
+        assert [r['status'] for r in results[:3]] == ["proved"] * 3
+        assert results[3]['status'] == "timeout"
+        assert results[3]['pv9_file'] == files[0]
+        
+        # A zero global deadline skips everything not yet started
+        results = list(runner.run_batch(files[1:], max_workers=1, deadline=0))
+        assert all(r['status'] == "deadline" for r in results)
+        
+        # Inputs with the same name in different directories keep separate results
+        other = os.path.join(test_dir, "other", "a.pv9")
+        os.makedirs(os.path.dirname(other))
+        with open(other, 'w') as f:
+            f.write("formulas(goals). other. end_of_list.\n")
+        results = {r['pv9_file']: r for r in runner.run_batch([files[1], other])}
+        assert results[files[1]]['output_file'] != results[other]['output_file']
+        with open(results[files[1]]['output_file']) as f:
+            assert "goals). a." in f.read()
+        
+        # Closing the batch early kills running proofs instead of waiting
+        hung = os.path.join(test_dir, "spawn.pv9")
+        with open(hung, 'w') as f:
+            f.write("formulas(goals). spawn. end_of_list.\n")
+        batch = runner.run_batch([files[1], hung], max_workers=2, timeout=30)
+        assert next(batch)['pv9_file'] == files[1]
+        while not os.path.exists(hung + ".child"):
+            time.sleep(0.05)
+        start = time.monotonic()
+        batch.close()
+        assert time.monotonic() - start < 2
+        with open(hung + ".child") as f:
+            child = int(f.read())
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                with open(f"/proc/{child}/stat") as f:
+                    if f.read().split(") ", 1)[1].startswith("Z"):
+                        break
+            except FileNotFoundError:
+                break
+            time.sleep(0.05)
+        else:
+            assert False, "prover survived closing the batch"
+        print("✓ Prover9 batch test passed")
+        
+    finally:
+        os.environ["PATH"] = old_path
+        shutil.rmtree(test_dir)
+
+
+def test_prover9_cache():
+    """Test that unchanged proof inputs are served from the cache."""
+    test_dir = tempfile.mkdtemp()
+    old_path = make_stub_prover9(test_dir)
+    
+    try:
+        runner = Prover9Runner("Audit_TEST", evidence_base=test_dir, cache_max_entries=2)
+        pv9 = os.path.join(test_dir, "goal.pv9")
+        with open(pv9, 'w') as f:
+            f.write("formulas(goals). p. end_of_list.\n")
+        
+        first = runner.run_proof(pv9)
+        assert first['status'] == "proved" and not first.get('cached')
+        second = runner.run_proof(pv9)
+        assert second['cached'] and second['timestamp'] == first['timestamp']
+        assert second['stdout'] == first['stdout']
+        
+        # Changed input content misses the cache
+        with open(pv9, 'w') as f:
+            f.write("formulas(goals). q. end_of_list.\n")
+        assert not runner.run_proof(pv9).get('cached')
+        
+        # Reverting the input is a cache hit that rewrites the stale result file
+        with open(pv9, 'w') as f:
+            f.write("formulas(goals). p. end_of_list.\n")
+        hit = runner.run_proof(pv9)
+        assert hit['cached']
+        with open(hit['output_file']) as f:
+            assert "goals). p." in f.read()
+        with open(pv9, 'w') as f:
+            f.write("formulas(goals). q. end_of_list.\n")
+        assert runner.run_proof(pv9).get('cached')
+        
+        assert runner.invalidate_cache(pv9) == 1
+        assert not runner.run_proof(pv9).get('cached')
+        
+        # Size limit evicts the least recently used entries
+        for name in ["x", "y", "z"]:
+            path = os.path.join(test_dir, f"{name}.pv9")
+            with open(path, 'w') as f:
+                f.write(f"formulas(goals). {name}. end_of_list.\n")
+            runner.run_proof(path)
+        assert len(runner.cache.index) == 2
+        print("✓ Prover9 cache test passed")
+        
+    finally:
+        os.environ["PATH"] = old_path
+        shutil.rmtree(test_dir)
+
+
+def test_proof_audit_log():
+    """Test JSONL audit log appends, legacy reading and indexed queries."""
+    from investigator import ProofAuditLog
+    
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        with open(os.path.join(test_dir, "observer_patch_log.json"), 'w') as f:
+            json.dump([{"timestamp": "2026-01-05T10:00:00", "pv9_file": "old.pv9",
+                        "result": {"status": "proved"}}], f)
+        
+        log = ProofAuditLog(test_dir)
+        log.append({"timestamp": "2026-03-01T09:00:00", "pv9_file": "a.pv9",
+                    "result": {"status": "failed"}})
+        log.append_many([
+            {"timestamp": "2026-03-02T09:00:00", "pv9_file": "b.pv9", "result": {"status": "proved"}},
+            {"timestamp": "2026-03-03T09:00:00", "pv9_file": "a.pv9", "result": {"status": "proved"}},
+        ])
+        
+        assert [e['pv9_file'] for e in log.iter_entries()] == ["old.pv9", "a.pv9", "b.pv9", "a.pv9"]
+        assert len(list(log.query(status="proved"))) == 3
+        assert [e['timestamp'] for e in log.query(pv9_file="a.pv9", status="proved")] == \
+            ["2026-03-03T09:00:00"]
+        in_march = list(log.query(since="2026-03-02", until="2026-03-31"))
+        assert [e['pv9_file'] for e in in_march] == ["b.pv9", "a.pv9"]
+        
+        # A crash between the log and index writes, or mid-line, is repaired
+        with open(log.log_path, 'a') as f:
+            f.write(json.dumps({"timestamp": "2026-03-04T09:00:00", "pv9_file": "c.pv9",
+                                "result": {"status": "proved"}}) + "\n")
+            f.write('{"timestamp": "2026-03-0')
+        assert [e['pv9_file'] for e in log.query(status="proved")] == ["old.pv9", "b.pv9", "a.pv9", "c.pv9"]
+        log.append({"timestamp": "2026-03-05T09:00:00", "pv9_file": "d.pv9", "result": {"status": "failed"}})
+        assert [e['pv9_file'] for e in log.iter_entries()] == ["old.pv9", "a.pv9", "b.pv9", "a.pv9", "c.pv9", "d.pv9"]
+        assert [e['pv9_file'] for e in ProofAuditLog(test_dir).query(since="2026-03-04")] == ["c.pv9", "d.pv9"]
+        
+        # Migration replaces the log at once; a leftover legacy file is not read twice
+        legacy = os.path.join(test_dir, "observer_patch_log.json")
+        with open(legacy) as f:
+            legacy_data = f.read()
+        assert log.migrate_legacy() == 1
+        assert not os.path.exists(legacy)
+        assert [e['pv9_file'] for e in log.query(pv9_file="old.pv9")] == ["old.pv9"]
+        with open(legacy, 'w') as f:
+            f.write(legacy_data)
+        assert [e['pv9_file'] for e in log.iter_entries()] == ["old.pv9", "a.pv9", "b.pv9", "a.pv9", "c.pv9", "d.pv9"]
+        assert log.migrate_legacy() == 0
+        assert len(list(log.query(status="proved"))) == 4
+        print("✓ Proof audit log test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_prover9_supervised():
+    """Test supervised proofs: streamed output, usage stats and group kill."""
+    import asyncio
+    import time
+    
+    test_dir = tempfile.mkdtemp()
+    old_path = make_stub_prover9(test_dir)
+    
+    try:
+        runner = Prover9Runner("Audit_TEST", evidence_base=test_dir)
+        fast = os.path.join(test_dir, "fast.pv9")
+        slow = os.path.join(test_dir, "slow.pv9")
+        with open(fast, 'w') as f:
+            f.write("formulas(goals). p. end_of_list.\n")
+        with open(slow, 'w') as f:
+            f.write("slow\n")
+        
+        result = runner.run_proof_supervised(fast, cpu_time_limit=10, memory_limit=1 << 30)
+        assert result['status'] == "proved"
+        assert 'stdout' not in result
+        with open(result['output_file']) as f:
+            output = f.read()
+        assert output.startswith("# Prover9 Output - ") and "THEOREM PROVED" in output
+        assert result['wall_time'] >= 0 and result['cpu_time'] >= 0 and result['max_rss_kb'] > 0
+        
+        # The recorded hash is of the input as proved, even if it is edited mid-proof
+        async def edit_during_proof():
+            task = asyncio.ensure_future(runner.run_proof_async(slow, timeout=1))
+            await asyncio.sleep(0.3)
+            with open(slow, 'w') as f:
+                f.write("slow, edited\n")
+            return await task
+        proved_hash = runner._hash_file(slow)
+        assert asyncio.run(edit_during_proof())['input_hash'] == proved_hash
+        with open(slow, 'w') as f:
+            f.write("slow\n")
+        
+        async def collect():
+            return [r async for r in runner.run_batch_async([slow, fast], timeout=0.5)]
+        
+        start = time.monotonic()
+        results = asyncio.run(collect())
+        assert time.monotonic() - start < 5
+        assert [r['status'] for r in results] == ["proved", "timeout"]
+        
+        # Timeouts kill the whole process group, not just the prover
+        spawn = os.path.join(test_dir, "spawn.pv9")
+        with open(spawn, 'w') as f:
+            f.write("spawn\n")
+        assert runner.run_proof_supervised(spawn, timeout=0.5)['status'] == "timeout"
+        with open(spawn + ".child") as f:
+            child = int(f.read())
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                with open(f"/proc/{child}/stat") as f:
+                    if f.read().split(") ", 1)[1].startswith("Z"):
+                        break
+            except FileNotFoundError:
+                break
+            time.sleep(0.05)
+        else:
+            assert False, "grandchild survived the timeout"
+        
+        spin = os.path.join(test_dir, "spin.pv9")
+        with open(spin, 'w') as f:
+            f.write("spin\n")
+        result = runner.run_proof_supervised(spin, timeout=10, cpu_time_limit=1)
+        assert result['status'] == "cpu_limit" and result['cpu_time'] >= 0.9
+        print("✓ Prover9 supervised test passed")
+        
+    finally:
+        os.environ["PATH"] = old_path
+        shutil.rmtree(test_dir)
+
+
+def test_prover9_ingest_results():
+    """Test attaching proof results to an investigation with dedup."""
+    test_dir = tempfile.mkdtemp()
+    old_path = make_stub_prover9(test_dir)
+    
+    try:
+        runner = Prover9Runner("Audit_TEST", evidence_base=test_dir)
+        files = []
+        for name in ["a", "b"]:
+            path = os.path.join(test_dir, f"{name}.pv9")
+            with open(path, 'w') as f:
+                f.write(f"formulas(goals). {name}. end_of_list.\n")
+            files.append(path)
+        # Same content as a.pv9 under another name
+        dup = os.path.join(test_dir, "a_copy.pv9")
+        shutil.copy(files[0], dup)
+        
+        inv = Investigation("INV-PROOF", "Proofs", "Proof audit")
+        inv.add_authority_source(AuthoritySource("AUTH-AUDIT", "Audit", "Proof audit", "Formal Logic"))
+        
+        results = list(runner.run_batch(files + [dup]))
+        assert runner.ingest_results(inv, "AUTH-AUDIT", results) == 2
+        assert runner.ingest_results(inv, "AUTH-AUDIT", [runner.run_proof(files[1])]) == 0
+        
+        evidence = inv.sources["AUTH-AUDIT"].evidence
+        assert all(ev['type'] == "Formal Proof" for ev in evidence)
+        assert all(os.path.exists(ev['source']) for ev in evidence)
+        assert "THEOREM PROVED" not in json.dumps(inv.to_dict())
+        print("✓ Prover9 ingest results test passed")
+        
+    finally:
+        os.environ["PATH"] = old_path
+        shutil.rmtree(test_dir)
+
+
+def test_search_index():
+    """Test phrase, prefix and ranked search maintained by the desk."""
+    from search_index import SearchIndex
+    
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        desk = InvestigatorDesk(data_dir=test_dir)
+        index_dir = os.path.join(test_dir, "search-index")
+        desk.register_index(SearchIndex(index_dir))
+        
+        inv1 = desk.create_investigation("INV-S1", "Miranda research", "Custodial interrogation")
+        inv1.add_authority_source(AuthoritySource("CASE-1", "Miranda v. Arizona", "SCOTUS 1966", "Case Law"))
+        inv1.add_evidence("CASE-1", "Legal Research", "Warnings required before custodial interrogation")
+        inv1.add_note("Compare with Dickerson v. United States")
+        desk.save_investigation(inv1)
+        
+        inv2 = desk.create_investigation("INV-S2", "Arizona property", "Land records in Arizona")
+        inv2.add_authority_source(AuthoritySource("AUTH-AZ", "Arizona Land Dept", "Arizona Arizona", "Agency"))
+        desk.save_investigation(inv2)
+        
+        index = SearchIndex(index_dir)  # reloads persisted segments
+        hits = index.search('"miranda v arizona"')
+        assert [(h['investigation_id'], h['kind'], h['source_id']) for h in hits] == \
+            [("INV-S1", "source", "CASE-1")]
+        assert [h['kind'] for h in index.search("custod* interrogation", investigation_id="INV-S1")] \
+            == ["evidence"]
+        assert index.search("dickerson")[0]['note_index'] == 0
+        assert index.search("arizona")[0]['investigation_id'] == "INV-S2"
+        assert index.search('"arizona miranda"') == []
+        
+        # Re-saving replaces the investigation's postings
+        inv1.notes.clear()
+        desk.save_investigation(inv1)
+        assert desk.indexes[0].search("dickerson") == []
+        print("✓ Search index test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_case_catalog_queries():
+    """Test cross-investigation filters, projections and aggregates."""
+    from desk_query import CaseCatalog
+    
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        desk = InvestigatorDesk(data_dir=test_dir)
+        catalog_dir = os.path.join(test_dir, "catalog")
+        desk.register_index(CaseCatalog(catalog_dir))
+        
+        for n, status in enumerate(["active", "closed"]):
+            inv = desk.create_investigation(f"INV-Q{n}", f"Case {n}", "Query test")
+            inv.status = status
+            for name in ["CEO", "CFO", "BOARD"]:
+                inv.add_authority_source(AuthoritySource(f"AUTH-{name}", name, "Test",
+                                                         "Governance" if name == "BOARD" else "Executive"))
+            inv.add_connections("AUTH-BOARD", ["AUTH-CEO", "AUTH-CFO"])
+            inv.add_evidence("AUTH-CEO", "Charter", f"Appointment {n}")
+            inv.add_evidence("AUTH-BOARD", "Bylaws", f"Oversight {n}")
+            inv.sources["AUTH-CEO"].evidence[0]['timestamp'] = f"2026-0{n + 1}-15T12:00:00"
+            inv.sources["AUTH-BOARD"].evidence[0]['timestamp'] = "2026-02-01T08:00:00"
+            desk.save_investigation(inv)
+        
+        catalog = CaseCatalog(catalog_dir, loader=desk.get_investigation)
+        
+        hubs = list(catalog.sources(min_degree=2, fields=["investigation_id", "source_id"]))
+        assert hubs == [{'investigation_id': "INV-Q0", 'source_id': "AUTH-BOARD"},
+                        {'investigation_id': "INV-Q1", 'source_id': "AUTH-BOARD"}]
+        assert catalog.count_by(catalog.sources(status="active"), "authority_type") == \
+            {"Executive": 2, "Governance": 1}
+        assert [r['investigation_id'] for r in catalog.sources(authority_type="Executive",
+                                                               status="closed")] == ["INV-Q1", "INV-Q1"]
+        
+        rows = list(catalog.evidence(evidence_type="Charter", since="2026-02-01",
+                                     fields=["investigation_id", "description"]))
+        assert rows == [{'investigation_id': "INV-Q1", 'description': "Appointment 1"}]
+        assert catalog.evidence_per_month() == {"2026-01": 1, "2026-02": 3}
+        assert catalog.evidence_per_month(until="2026-01-15") == {"2026-01": 1}
+        assert [r['evidence_count'] for r in catalog.investigations(status="closed")] == [2]
+        print("✓ Case catalog query test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_timeline_index():
+    """Test sorted timelines, range queries and windowed counts."""
+    from timeline_index import TimelineIndex
+    
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        desk = InvestigatorDesk(data_dir=test_dir)
+        timelines = TimelineIndex()
+        desk.register_index(timelines)
+        
+        inv = desk.create_investigation("INV-T1", "Timeline", "Timeline test")
+        inv.add_authority_source(AuthoritySource("AUTH-A", "A", "Test", "Type"))
+        inv.add_evidence_batch("AUTH-A", [
+            {'type': "Doc", 'description': "Late", 'source': "", 'timestamp': "2026-03-10T09:00:00"},
+            {'type': "Doc", 'description': "Early", 'source': "", 'timestamp': "2026-01-05T09:00:00"},
+        ])
+        timeline = inv.timeline()
+        assert [e['evidence_index'] for e in timeline.range()] == [1, 0]
+        
+        # Kept current incrementally, including out-of-order inserts
+        inv.add_evidence_batch("AUTH-A", [
+            {'type': "Doc", 'description': "Middle", 'source': "", 'timestamp': "2026-02-01T09:00:00"}])
+        inv.add_note("Reviewed")
+        assert inv.timeline() is timeline
+        assert len(timeline) == 4
+        assert [e['evidence_index'] for e in timeline.range("2026-01-06", "2026-03-31")] == [2, 0]
+        assert timeline.count(until="2026-02-01") == 2
+        assert timeline.range(kind="note").__next__()['note_index'] == 0
+        desk.save_investigation(inv)
+        
+        other = desk.create_investigation("INV-T2", "Other", "Timeline test")
+        other.add_authority_source(AuthoritySource("AUTH-B", "B", "Test", "Type"))
+        other.add_evidence_batch("AUTH-B", [
+            {'type': "Doc", 'description': "Feb", 'source': "", 'timestamp': "2026-02-15T09:00:00"}])
+        desk.save_investigation(other)
+        
+        merged = [(e['investigation_id'], e['timestamp'][:10])
+                  for e in timelines.range(since="2026-01-01", until="2026-03-31")]
+        assert merged == [("INV-T1", "2026-01-05"), ("INV-T1", "2026-02-01"),
+                          ("INV-T2", "2026-02-15"), ("INV-T1", "2026-03-10")]
+        assert timelines.counts(window="month", until="2026-03-31") == \
+            {"2026-01": 1, "2026-02": 2, "2026-03": 1}
+        print("✓ Timeline index test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_link_graph_export():
+    """Test link-graph layout, cluster cache reuse and export formats."""
+    from link_graph import LinkGraphEngine
+    
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        inv = Investigation("INV-G1", "Graph", "Link graph test")
+        for i in range(6):
+            inv.add_authority_source(AuthoritySource(f"AUTH-{i}", f"Source {i}", "Test", "Type"))
+        # Two triangles joined by nothing
+        inv.add_connections("AUTH-0", ["AUTH-1", "AUTH-2"])
+        inv.add_connection("AUTH-1", "AUTH-2")
+        inv.add_connections("AUTH-3", ["AUTH-4", "AUTH-5"])
+        inv.add_connection("AUTH-4", "AUTH-5")
+        inv.add_connection("AUTH-5", "AUTH-3")
+        
+        engine = LinkGraphEngine(cache_dir=os.path.join(test_dir, "cache"))
+        layout = engine.layout(inv)
+        assert layout['clusters'] == 2
+        assert layout['recomputed'] == 2
+        assert len(layout['edges']) == 6
+        clusters = {n['id']: n['cluster'] for n in layout['nodes']}
+        assert clusters["AUTH-0"] == clusters["AUTH-2"] != clusters["AUTH-3"]
+        assert all(n['degree'] == 2 for n in layout['nodes'])
+        
+        # Only the component the edit touched is clustered again
+        inv.add_authority_source(AuthoritySource("AUTH-6", "Source 6", "Test", "Type"))
+        inv.add_connections("AUTH-6", ["AUTH-3", "AUTH-4"])
+        import link_graph
+        propagate = link_graph.label_propagation
+        calls = []
+        link_graph.label_propagation = lambda n, adj: calls.append(n) or propagate(n, adj)
+        try:
+            assert engine.layout(inv)['recomputed'] == 1
+            assert calls == [4]
+            assert engine.layout(inv)['recomputed'] == 0
+            assert calls == [4]
+        finally:
+            link_graph.label_propagation = propagate
+        
+        out_dir = os.path.join(test_dir, "graphs")
+        paths = engine.write(inv, out_dir, formats=("json", "graphml", "bin"))
+        with open(paths[0]) as f:
+            data = json.load(f)
+        assert sorted(data['adjacency']["AUTH-6"]) == ["AUTH-3", "AUTH-4"]
+        with open(paths[1]) as f:
+            assert f.read().count("<edge ") == 8
+        with open(paths[2], 'rb') as f:
+            decoded = LinkGraphEngine.read_edge_list(f.read())
+        assert [n['id'] for n in decoded['nodes']] == [n['id'] for n in data['nodes']]
+        assert len(decoded['edges']) == 8
+        print("✓ Link graph export test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_site_bundle_incremental():
+    """Test the static-site bundle build and incremental rebuilds."""
+    from site_bundle import SiteBundleBuilder
+    
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        data_dir = os.path.join(test_dir, "cases")
+        out_dir = os.path.join(test_dir, "site")
+        desk = InvestigatorDesk(data_dir=data_dir)
+        inv = desk.create_investigation("INV-S1", "Harbor", "Bundle test")
+        inv.add_authority_source(AuthoritySource("AUTH-A", "Harbor Commission", "Port", "Agency"))
+        desk.save_investigation(inv)
+        desk.create_investigation("INV-S2", "Mill", "Bundle test")
+        
+        builder = SiteBundleBuilder(data_dir, out_dir)
+        assert builder.build() == {'written': 2, 'skipped': 0, 'removed': 0}
+        with open(os.path.join(out_dir, "index.json")) as f:
+            assert [row['investigation_id'] for row in json.load(f)] == ["INV-S1", "INV-S2"]
+        with open(os.path.join(out_dir, "search", "ha.json")) as f:
+            assert json.load(f)["harbor"] == {"INV-S1": 2}
+        assert os.path.exists(os.path.join(out_dir, "graphs", "INV-S1.json"))
+        
+        # Nothing changed: nothing re-emitted
+        assert builder.build() == {'written': 0, 'skipped': 2, 'removed': 0}
+        
+        # One case renamed, one removed
+        inv.title = "Quay"
+        inv.sources["AUTH-A"].name = "Quay Commission"
+        desk.save_investigation(inv)
+        os.remove(desk._get_investigation_file("INV-S2"))
+        assert builder.build() == {'written': 1, 'skipped': 0, 'removed': 1}
+        assert not os.path.exists(os.path.join(out_dir, "search", "ha.json"))
+        with open(os.path.join(out_dir, "search", "qu.json")) as f:
+            assert json.load(f)["quay"] == {"INV-S1": 2}
+        with open(os.path.join(out_dir, "cases", "INV-S1.json")) as f:
+            assert json.load(f)['title'] == "Quay"
+        assert not os.path.exists(os.path.join(out_dir, "cases", "INV-S2.json"))
+        print("✓ Site bundle test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_benchmark_suite():
+    """Test synthetic generators, a tiny benchmark run and baseline comparison."""
+    from benchmarks import make_investigation, make_lexis_text, run_benchmarks, compare
+    
+    inv = make_investigation("BENCH-T", 10, 2, 3, seed=1)
+    assert len(inv.sources) == 10
+    assert sum(len(s.evidence) for s in inv.sources.values()) == 20
+    assert make_investigation("BENCH-T", 10, 2, 3, seed=1).to_dict()['sources'].keys() == \
+        inv.to_dict()['sources'].keys()
+    assert len(make_lexis_text(5000)) >= 5000
+    
+    report = run_benchmarks('tiny', only=['desk', 'parser'])
+    assert set(report['results']) == {'desk_save', 'desk_load', 'generate_report',
+                                      'add_connection_bulk', 'parse_text_content'}
+    assert all(r['seconds'] >= 0 for r in report['results'].values())
+    
+    baseline = json.loads(json.dumps(report))
+    baseline['results']['desk_load']['seconds'] = report['results']['desk_load']['seconds'] / 2
+    rows = {row['name']: row for row in compare(report, baseline, tolerance=0.25)}
+    assert rows['desk_load']['regression']
+    assert not rows['parse_text_content']['regression']
+    print("✓ Benchmark suite test passed")
+
+
+def test_metrics_instrumentation():
+    """Test counters, timers and exports from instrumented desk and parser."""
+    from metrics import METRICS
+    from lexis_nexis_parser import LexisNexisParser
+    
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        # Disabled: nothing is recorded
+        METRICS.reset()
+        desk = InvestigatorDesk(data_dir=test_dir)
+        desk.create_investigation("INV-M0", "Quiet", "Metrics test")
+        assert METRICS.counter_value("desk_bytes_written_total") == 0
+        
+        METRICS.enable()
+        inv = desk.create_investigation("INV-M1", "Metrics", "Metrics test")
+        written = os.path.getsize(desk._get_investigation_file("INV-M1"))
+        assert METRICS.counter_value("desk_bytes_written_total") == written
+        InvestigatorDesk(data_dir=test_dir)
+        assert METRICS.counter_value("desk_investigations_loaded_total") == 2
+        
+        LexisNexisParser()._parse_text_content("Phone Numbers:\n(602) 555-1234\n")
+        snapshot = METRICS.snapshot()
+        extractors = {h['labels']['extractor'] for h in snapshot['histograms']
+                      if h['name'] == "lexis_extractor_seconds"}
+        assert extractors == {'addresses', 'phones', 'associates', 'court_records', 'liens_judgments'}
+        
+        prom = METRICS.to_prometheus()
+        assert "# TYPE desk_save_seconds histogram" in prom
+        assert 'desk_save_seconds_bucket{le="+Inf"} 1' in prom
+        assert f"desk_bytes_written_total {written}" in prom
+        METRICS.write(os.path.join(test_dir, "metrics.snapshot.json"))
+        with open(os.path.join(test_dir, "metrics.snapshot.json")) as f:
+            assert json.load(f)['counters']
+        print("✓ Metrics instrumentation test passed")
+        
+    finally:
+        METRICS.disable()
+        METRICS.reset()
+        shutil.rmtree(test_dir)
+
+
+def test_profiling_mode():
+    """Test --profile flag parsing and the profile reports."""
+    from profiling import parse_profile_flag, profile_call
+    
+    assert parse_profile_flag(["a", "--profile"], "x-profile") == ("x-profile", ["a"])
+    assert parse_profile_flag(["--profile=/tmp/p", "b"], "x") == ("/tmp/p", ["b"])
+    assert parse_profile_flag(["b"], "x") == (None, ["b"])
+    
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        def busy():
+            desk = InvestigatorDesk(data_dir=os.path.join(test_dir, "data"))
+            for i in range(20):
+                desk.create_investigation(f"INV-P{i}", "Profiled", "Profiling test")
+            return 7
+        
+        result, paths = profile_call(busy, prefix=os.path.join(test_dir, "out", "run"))
+        assert result == 7
+        assert [os.path.basename(p) for p in paths] == ["run.txt", "run.pstats", "run.collapsed"]
+        with open(paths[0]) as f:
+            summary = f.read()
+        assert "FUNCTIONS BY CUMULATIVE TIME" in summary and "save_investigation" in summary
+        assert "ALLOCATION SITES" in summary
+        with open(paths[2]) as f:
+            for line in f:
+                stack, count = line.rsplit(" ", 1)
+                assert stack.startswith("busy (") and int(count) > 0
+        print("✓ Profiling mode test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_deferred_imports():
+    """Test that entry-point modules do not load heavy dependencies at import."""
+    from benchmarks import measure_import, measure_script_start, IMPORT_MODULES
+    
+    for module in IMPORT_MODULES:
+        # Both the bare import and the script's __main__ path up to main
+        for result in (measure_import(module), measure_script_start(module)):
+            assert result['loaded'] == [], f"{module} loaded {result['loaded']}"
+            assert result['seconds'] > 0
+    
+    # The Prover9 classes still resolve from investigator, on first use
+    import investigator
+    assert investigator.Prover9Runner is Prover9Runner
+    assert Prover9Runner.__module__ == "prover9"
+    # ...and the investigator classes from the parser and bot
+    from lexis_nexis_parser import AuthoritySource as ParserAuthoritySource
+    from lexis_search_bot import Investigation as BotInvestigation
+    assert ParserAuthoritySource is AuthoritySource
+    assert BotInvestigation is Investigation
+    print("✓ Deferred imports test passed")
+
+
+def test_desk_service():
+    """Test the warm-cache desk service over a Unix socket."""
+    import threading
+    import time
+    from desk_service import DeskService, DeskClient
+    
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        desk = InvestigatorDesk(data_dir=test_dir)
+        inv = desk.create_investigation("INV-D1", "On disk", "Service test")
+        inv.add_authority_source(AuthoritySource("AUTH-A", "A", "Test", "Type"))
+        desk.save_investigation(inv)
+        
+        service = DeskService(test_dir, max_entries=1, flush_interval=60)
+        address = os.path.join(test_dir, "desk.sock")
+        thread = threading.Thread(target=service.serve_forever, args=(address,), daemon=True)
+        thread.start()
+        for _ in range(100):
+            if os.path.exists(address):
+                break
+            time.sleep(0.01)
+        
+        with DeskClient(address) as client:
+            assert client.call('ping') == 'pong'
+            assert client.get_investigation("INV-D1").sources["AUTH-A"].name == "A"
+            client.add_evidence("INV-D1", "AUTH-A", "Doc", "Warm write")
+            assert client.stats()['hits'] == 1
+            # Write-behind: not on disk until flushed or evicted
+            with open(desk._get_investigation_file("INV-D1")) as f:
+                assert json.load(f)['sources']['AUTH-A']['evidence'] == []
+            
+            # max_entries=1: creating a second case evicts and saves the first
+            client.create_investigation("INV-D2", "New", "Service test")
+            with open(desk._get_investigation_file("INV-D1")) as f:
+                assert json.load(f)['sources']['AUTH-A']['evidence'][0]['description'] == "Warm write"
+            assert client.list_investigation_ids() == ["INV-D1", "INV-D2"]
+            assert "INVESTIGATION REPORT: New" in client.generate_report("INV-D2")
+            assert client.stats()['evictions'] == 1
+            # Unsaved cases count towards the memory limit
+            assert client.stats()['bytes'] > 0
+            assert service.desk.investigations == {}
+            try:
+                client.add_note("INV-NONE", "x")
+                assert False, "Expected ValueError"
+            except ValueError as e:
+                assert "not found" in str(e)
+        
+        service.shutdown()
+        thread.join(5)
+        # Dirty cases are saved on shutdown
+        assert os.path.exists(desk._get_investigation_file("INV-D2"))
+        assert not os.path.exists(address)
+        import socketserver
+        assert not socketserver.ThreadingUnixStreamServer.daemon_threads
+        
+        # A flush writes a copy; changes made meanwhile stay dirty
+        from desk_service import WarmCache
+        cache = WarmCache(InvestigatorDesk(data_dir=test_dir, preload=False))
+        inv = cache.get("INV-D1")
+        save = cache.desk.save_investigation
+        def save_and_edit(copy):
+            assert copy is not inv
+            inv.add_note("Added during flush")
+            cache.mark_dirty("INV-D1")
+            save(copy)
+        cache.desk.save_investigation = save_and_edit
+        cache.mark_dirty("INV-D1")
+        assert cache.flush() == 1
+        assert cache.stats()['dirty'] == 1
+        cache.desk.save_investigation = save
+        assert cache.flush() == 1
+        with open(desk._get_investigation_file("INV-D1")) as f:
+            assert json.load(f)['notes'][-1]['note'] == "Added during flush"
+        
+        # In-place growth of unsaved cases is charged against max_bytes
+        cache = WarmCache(InvestigatorDesk(data_dir=test_dir, preload=False), max_bytes=4096)
+        cache.put(Investigation("INV-M1", "Unsaved", "Memory test"))
+        cache.put(Investigation("INV-M2", "Unsaved", "Memory test"))
+        grown = cache.get("INV-M2")
+        for i in range(40):
+            grown.add_note(f"Long note {i} " + "x" * 40)
+        cache.mark_dirty("INV-M2")
+        assert cache.stats()['bytes'] > 4096 and list(cache.entries) == ["INV-M2"]
+        assert os.path.exists(desk._get_investigation_file("INV-M1"))
+        
+        # Concurrent creates of one ID: exactly one succeeds
+        service = DeskService(test_dir, flush_interval=60)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(service.handle(
+            {'op': 'create', 'id': "INV-RACE", 'title': "Race"})['ok'])) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sorted(results) == [False] * 7 + [True]
+        print("✓ Desk service test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_sharded_layout_migration():
+    """Test migration from the flat data directory to shard subdirectories."""
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        # Flat layout as written by older versions
+        for i in range(40):
+            inv = Investigation(f"INV-F{i:03d}", f"Flat {i}", "Migration test")
+            with open(os.path.join(test_dir, f"INV-F{i:03d}.json"), 'w') as f:
+                json.dump(inv.to_dict(), f)
+        
+        desk = InvestigatorDesk(data_dir=test_dir)
+        assert len(desk.investigations) == 40
+        assert not [name for name in os.listdir(test_dir) if name.endswith('.json')]
+        path = desk._get_investigation_file("INV-F007")
+        assert os.path.exists(path)
+        assert os.path.basename(os.path.dirname(path)) == shard_for("INV-F007")
+        assert len({shard_for(f"INV-F{i:03d}") for i in range(40)}) > 1
+        
+        # Listing is the same serially and in parallel
+        serial = InvestigatorDesk(data_dir=test_dir, preload=False, max_workers=1)
+        assert serial.list_investigation_ids() == desk.list_investigation_ids()
+        assert serial.list_investigation_ids()[0] == "INV-F000"
+        assert serial.load_investigation("INV-F039").title == "Flat 39"
+        assert serial.migrate_flat_layout() == 0
+        print("✓ Sharded layout migration test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_blob_store():
+    """Test content-addressed evidence blobs with reference counting and GC."""
+    from blob_store import BlobStore
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        desk = InvestigatorDesk(data_dir=os.path.join(test_dir, "data"))
+        blobs = BlobStore(root=os.path.join(test_dir, "blobs"))
+        desk.register_index(blobs)
+        report = "LEXIS REPORT\n" + "Subject: John Doe\n" * 500
+        
+        invs = []
+        for i in range(2):
+            inv = desk.create_investigation(f"INV-B{i}", f"Blob {i}", "Blob test")
+            inv.add_authority_source(AuthoritySource("SRC-1", "Report", "Raw report", "Background Check"))
+            evidence = blobs.attach(inv, "SRC-1", "Report Text", "Raw report", report)
+            desk.save_investigation(inv)
+            invs.append(inv)
+        
+        # Stored once, compressed, and only the digest is in the case file
+        digest = evidence['blob']
+        assert len(os.listdir(os.path.join(test_dir, "blobs", "objects", digest[:2]))) == 1
+        assert os.path.getsize(blobs._object_path(digest)) < len(report) // 10
+        with open(desk._get_investigation_file("INV-B0")) as f:
+            assert "Subject: John Doe" not in f.read()
+        assert blobs.refcounts[digest] == 2
+        assert blobs.load_evidence(evidence) == report
+        
+        # Counts survive a restart; unreferenced blobs are collected
+        invs[0].sources["SRC-1"].evidence.clear()
+        desk.save_investigation(invs[0])
+        orphan = blobs.put("never referenced")
+        blobs = BlobStore(root=os.path.join(test_dir, "blobs"))
+        assert blobs.refcounts == {digest: 1}
+        assert blobs.gc(desk)['removed'] == 0
+        stats = blobs.gc(desk, grace_seconds=0)
+        assert stats['removed'] == 1 and stats['kept'] == 1
+        assert not blobs.exists(orphan) and blobs.exists(digest)
+        os.remove(desk._get_investigation_file("INV-B1"))
+        assert blobs.gc(desk, grace_seconds=0)['removed'] == 1
+        
+        # Saves made without the store registered are found by the rescan
+        kept = blobs.put("saved elsewhere")
+        invs[1].sources["SRC-1"].evidence[-1]['blob'] = kept
+        InvestigatorDesk(data_dir=os.path.join(test_dir, "data"), preload=False).save_investigation(invs[1])
+        blobs = BlobStore(root=os.path.join(test_dir, "blobs"))
+        try:
+            blobs.gc(grace_seconds=0)
+            assert False, "Expected RuntimeError for gc without a rescan"
+        except RuntimeError:
+            pass
+        assert blobs.gc(desk, grace_seconds=0)['removed'] == 0 and blobs.exists(kept)
+        
+        # Re-attaching an old orphaned blob protects it until the save
+        orphan = blobs.put("old attachment")
+        old = os.path.getmtime(blobs._object_path(orphan)) - 2 * 3600
+        os.utime(blobs._object_path(orphan), (old, old))
+        evidence = blobs.attach(invs[0], "SRC-1", "Report Text", "Again", "old attachment")
+        assert blobs.gc(desk)['removed'] == 0
+        desk.save_investigation(invs[0])
+        assert blobs.load_evidence(evidence) == "old attachment"
+        print("✓ Blob store test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_custody_ledger():
+    """Test hash-chained custody records, tamper detection and resumable verification."""
+    from custody_ledger import CustodyLedger
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        desk = InvestigatorDesk(data_dir=os.path.join(test_dir, "data"))
+        custody = CustodyLedger(root=os.path.join(test_dir, "custody"), actor="tester")
+        desk.register_index(custody)
+        inv = desk.create_investigation("INV-C", "Custody", "Custody test")
+        inv.add_authority_source(AuthoritySource("SRC-1", "Source", "Desc", "Court"))
+        inv.add_evidence("SRC-1", "Document", "Filing A")
+        inv.add_evidence("SRC-1", "Document", "Filing B")
+        desk.save_investigation(inv)
+        inv.sources["SRC-1"].evidence[0]['description'] = "Filing A (amended)"
+        desk.save_investigation(inv)
+        desk.save_investigation(inv)
+        custody.record_export("INV-C", "report.txt")
+        
+        actions = [r['action'] for r in custody.records("INV-C")]
+        assert actions == ['evidence_added', 'evidence_added', 'evidence_modified', 'export']
+        assert custody.tail("INV-C", 1)[0]['actor'] == "tester"
+        result = custody.verify("INV-C")
+        assert result['valid'] and result['seq'] == 4 and result['verified'] == 4
+        
+        # Appends after a restart continue the chain; verification resumes
+        custody = CustodyLedger(root=os.path.join(test_dir, "custody"))
+        custody.record_export("INV-C", "bundle.tar")
+        result = custody.verify("INV-C")
+        assert result['valid'] and result['resumed_from'] == 4 and result['verified'] == 1
+        
+        # Two ledgers on one root (e.g. service and exporter) keep a single chain
+        other = CustodyLedger(root=os.path.join(test_dir, "custody"))
+        custody.record_export("INV-C", "a")
+        other.record_export("INV-C", "b")
+        custody.record_export("INV-C", "c")
+        result = custody.verify("INV-C")
+        assert result['valid'] and result['seq'] == 8
+        
+        # Editing an earlier record breaks the chain
+        path = os.path.join(test_dir, "custody", "INV-C.log")
+        with open(path) as f:
+            text = f.read()
+        with open(path, 'w') as f:
+            f.write(text.replace("Document", "Photo", 1))
+        result = custody.verify("INV-C", resume=False)
+        assert not result['valid'] and result['seq'] == 0
+        assert "hash mismatch" in result['error']
+        print("✓ Custody ledger test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_snapshots_diff_restore():
+    """Test delta-encoded snapshots, structural diff and point-in-time restore."""
+    from snapshots import SnapshotStore
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        desk = InvestigatorDesk(data_dir=os.path.join(test_dir, "data"))
+        snapshots = SnapshotStore(root=os.path.join(test_dir, "snapshots"), keyframe_interval=3)
+        desk.register_index(snapshots)
+        inv = desk.create_investigation("INV-S", "Snapshots", "Snapshot test")
+        for i in range(2):
+            inv.add_authority_source(AuthoritySource(f"SRC-{i}", f"Source {i}", "Desc", "Court"))
+        inv.add_evidence_batch("SRC-0", [{'type': "Document", 'description': f"Item {i}"} for i in range(200)])
+        desk.save_investigation(inv)
+        desk.save_investigation(inv)  # unchanged: no snapshot
+        
+        inv.add_evidence("SRC-0", "Document", "Late filing")
+        inv.sources["SRC-0"].evidence[0]['description'] = "Item 0 (amended)"
+        inv.add_connection("SRC-0", "SRC-1")
+        inv.add_note("Interviewed witness")
+        inv.status = "closed"
+        desk.save_investigation(inv)
+        for i in range(3):
+            inv.add_note(f"Follow-up {i}")
+            desk.save_investigation(inv)
+        
+        listed = snapshots.list_snapshots("INV-S")
+        assert [s['id'] for s in listed] == [1, 2, 3, 4, 5, 6]
+        # The delta stores only the new tail, not the 200 unchanged entries
+        with open(os.path.join(test_dir, "snapshots", "INV-S", "snapshots.jsonl")) as f:
+            records = [json.loads(line) for line in f]
+        assert len(json.dumps(records[2]['delta'])) < 1000
+        
+        changes = snapshots.diff("INV-S", 2, 3)
+        assert changes['meta'] == {'status': ["active", "closed"]}
+        assert [e['evidence']['description'] for e in changes['evidence_added']] == ["Item 0 (amended)", "Late filing"]
+        assert [e['evidence']['description'] for e in changes['evidence_removed']] == ["Item 0"]
+        assert changes['connections_added'] == [["SRC-0", "SRC-1"]]
+        assert [n['note'] for n in changes['notes_added']] == ["Interviewed witness"]
+        
+        # Restore from a fresh store (replays keyframes and deltas from disk)
+        snapshots = SnapshotStore(root=os.path.join(test_dir, "snapshots"), keyframe_interval=3)
+        old = snapshots.restore("INV-S", 2)
+        assert old.status == "active" and len(old.sources["SRC-0"].evidence) == 200
+        assert old.sources["SRC-0"].evidence[0]['description'] == "Item 0"
+        assert snapshots.restore("INV-S").to_dict() == inv.to_dict()
+        assert snapshots.resolve("INV-S", at=listed[3]['timestamp']) == 4
+        try:
+            snapshots.restore("INV-S", at="2000-01-01")
+            assert False, "Expected ValueError for a time before the first snapshot"
+        except ValueError:
+            pass
+        
+        # Blobs only old snapshots reference are pinned against gc
+        from blob_store import BlobStore
+        blobs = BlobStore(root=os.path.join(test_dir, "data", "blobs"))
+        snapshots = SnapshotStore(root=os.path.join(test_dir, "snapshots"), blob_store=blobs)
+        desk.indexes = [blobs, snapshots]
+        evidence = blobs.attach(inv, "SRC-1", "Report Text", "Raw report", "RAW " * 100)
+        desk.save_investigation(inv)
+        inv.sources["SRC-1"].evidence.remove(evidence)
+        desk.save_investigation(inv)
+        assert blobs.gc(desk, grace_seconds=0)['removed'] == 0
+        with_blob = snapshots.list_snapshots("INV-S")[-2]['id']
+        restored = snapshots.restore("INV-S", with_blob)
+        assert blobs.load_evidence(restored.sources["SRC-1"].evidence[-1]).startswith("RAW ")
+        os.remove(blobs._object_path(evidence['blob']))
+        try:
+            snapshots.restore("INV-S", with_blob)
+            assert False, "Expected ValueError for a missing blob"
+        except ValueError as e:
+            assert "missing blob" in str(e)
+        
+        # Snapshot IDs on the command line need a '#'; a bare year is a time
+        from snapshots import main as snapshots_main
+        data_dir = os.path.join(test_dir, "data")
+        shutil.copytree(os.path.join(test_dir, "snapshots"), os.path.join(data_dir, "snapshots"))
+        assert snapshots_main(["--data-dir", data_dir, "restore", "INV-S", "--at", "2000"]) == 1
+        assert snapshots_main(["--data-dir", data_dir, "restore", "INV-S", "--at", "#2"]) == 0
+        assert desk.load_investigation("INV-S").status == "active"
+        print("✓ Snapshots diff and restore test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
+def test_case_bundle_roundtrip():
+    """Test streaming export/import bundles with checksums and ID remapping."""
+    import io
+    import tarfile
+    from blob_store import BlobStore
+    from case_bundle import export_bundle, import_bundle
+    test_dir = tempfile.mkdtemp()
+    
+    try:
+        source_desk = InvestigatorDesk(data_dir=os.path.join(test_dir, "source"))
+        source_blobs = BlobStore(root=os.path.join(test_dir, "source-blobs"))
+        for i in range(3):
+            inv = source_desk.create_investigation(f"INV-E{i}", f"Export {i}", "Bundle test")
+            inv.add_authority_source(AuthoritySource("SRC-1", "Source", "Desc", "Court"))
+            inv.add_evidence_batch("SRC-1", [{'type': "Document", 'description': f"Item {n}"} for n in range(50)])
+            source_blobs.attach(inv, "SRC-1", "Report Text", "Raw report", "RAW REPORT " * 100)
+            source_desk.save_investigation(inv)
+        archive = os.path.join(test_dir, "cases.tar.gz")
+        manifest = export_bundle(source_desk, archive, blob_store=source_blobs)
+        assert [c['investigation_id'] for c in manifest['investigations']] == ["INV-E0", "INV-E1", "INV-E2"]
+        assert len(manifest['blobs']) == 1
+        
+        # Bundled blobs are never dropped for lack of a blob store
+        try:
+            import_bundle(InvestigatorDesk(data_dir=os.path.join(test_dir, "no-blobs")), archive)
+            assert False, "Expected ValueError for a bundle with blobs and no blob store"
+        except ValueError:
+            pass
+        assert import_bundle(InvestigatorDesk(data_dir=os.path.join(test_dir, "no-blobs")),
+                             archive, dry_run=True)['errors'] == []
+        
+        # INV-E1 already exists on the target machine
+        target_desk = InvestigatorDesk(data_dir=os.path.join(test_dir, "target"))
+        target_desk.create_investigation("INV-E1", "Local case", "Unrelated")
+        target_blobs = BlobStore(root=os.path.join(test_dir, "target-blobs"))
+        target_desk.register_index(target_blobs)
+        result = import_bundle(target_desk, archive, blob_store=target_blobs)
+        assert result['errors'] == [] and result['imported'] == 3 and result['blobs'] == 1
+        assert result['renamed'] == {"INV-E1": "INV-E1-2"}
+        assert target_desk.get_investigation("INV-E1").title == "Local case"
+        imported = target_desk.load_investigation("INV-E1-2")
+        assert imported.title == "Export 1" and len(imported.sources["SRC-1"].evidence) == 51
+        assert target_blobs.load_evidence(imported.sources["SRC-1"].evidence[-1]).startswith("RAW REPORT")
+        assert len(target_blobs.refcounts) == 1
+        assert import_bundle(target_desk, archive, on_conflict="skip",
+                             blob_store=target_blobs)['skipped'] == ["INV-E0", "INV-E1", "INV-E2"]
+        
+        # A corrupted member is reported and not imported
+        corrupt = os.path.join(test_dir, "corrupt.tar.gz")
+        with tarfile.open(archive, 'r:gz') as src, tarfile.open(corrupt, 'w:gz') as dst:
+            for member in src:
+                data = src.extractfile(member).read()
+                if member.name == "cases/INV-E2.json":
+                    data = data.replace(b"Export 2", b"Export X")
+                dst.addfile(member, io.BytesIO(data))
+        result = import_bundle(InvestigatorDesk(data_dir=os.path.join(test_dir, "other")), corrupt,
+                               blob_store=BlobStore(root=os.path.join(test_dir, "other-blobs")))
+        assert result['imported'] == 2 and result['errors'] == ["cases/INV-E2.json: checksum mismatch"]
+        
+        # A malformed manifest is rejected with ValueError, not KeyError
+        bad = os.path.join(test_dir, "bad.tar.gz")
+        for broken in ({'investigations': [{'member': "cases/X.json"}], 'blobs': []},
+                       {'investigations': [], 'blobs': None}, ["not", "a", "manifest"]):
+            if isinstance(broken, dict):
+                broken.update(format=manifest['format'], version=manifest['version'])
+            with tarfile.open(bad, 'w:gz') as dst:
+                data = json.dumps(broken).encode('utf-8')
+                info = tarfile.TarInfo("manifest.json")
+                info.size = len(data)
+                dst.addfile(info, io.BytesIO(data))
+            try:
+                import_bundle(InvestigatorDesk(data_dir=os.path.join(test_dir, "bad")), bad, dry_run=True)
+                assert False, "Expected ValueError for a malformed manifest"
+            except ValueError:
+                pass
+        print("✓ Case bundle roundtrip test passed")
+        
+    finally:
+        shutil.rmtree(test_dir)
+
+
 def run_tests():
     """Run all tests."""
     print("=" * 70)
@@ -212,11 +1575,39 @@ def run_tests():
         test_investigation_creation,
         test_add_authority_source,
         test_add_evidence,
+        test_add_evidence_batch,
         test_add_connections,
+        test_add_connections_bulk,
         test_add_notes,
         test_desk_operations,
         test_serialization,
         test_report_generation,
+        test_lexis_import_ledger,
+        test_lexis_lossless_import,
+        test_lexis_structured_import,
+        test_lexis_format_registry,
+        test_entity_normalization,
+        test_entity_index,
+        test_prover9_batch,
+        test_prover9_cache,
+        test_proof_audit_log,
+        test_prover9_supervised,
+        test_prover9_ingest_results,
+        test_search_index,
+        test_case_catalog_queries,
+        test_timeline_index,
+        test_link_graph_export,
+        test_site_bundle_incremental,
+        test_benchmark_suite,
+        test_metrics_instrumentation,
+        test_profiling_mode,
+        test_deferred_imports,
+        test_desk_service,
+        test_sharded_layout_migration,
+        test_blob_store,
+        test_custody_ledger,
+        test_snapshots_diff_restore,
+        test_case_bundle_roundtrip,
     ]
     
     failed = 0
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+TIMELINE INDEX FOR INVESTIGATOR-DESK
+
+Chronologically sorted, bisectable timelines of evidence and notes, per
+investigation and across investigations, with range queries and windowed
+counts.
+
+Usage:
+    from timeline_index import TimelineIndex
+    from investigator import InvestigatorDesk
+
+    desk = InvestigatorDesk()
+    timelines = TimelineIndex()
+    desk.register_index(timelines)
+
+    inv = desk.get_investigation("INV-001")
+    for event in inv.timeline().range("2026-01-01", "2026-03-31"):
+        print(event['timestamp'], event['kind'], event['source_id'])
+
+    per_month = timelines.counts(window="month")
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Optional, Iterator, Tuple
+
+
+# Window name -> length of the ISO timestamp prefix that identifies it
+WINDOWS = {
+    'year': 4,
+    'month': 7,
+    'day': 10,
+    'hour': 13,
+    'minute': 16,
+}
+
+
+def _upper_bound(until: Optional[str]) -> Optional[str]:
+    """Make a date-only upper bound cover the whole day."""
+    if until is not None and len(until) == 10:
+        return until + "T23:59:59.999999"
+    return until
+
+
+class Timeline:
+    """
+    Events of one investigation sorted by ISO timestamp.
+
+    Events are (timestamp, investigation_id, kind, source_id, index)
+    tuples, where kind is 'evidence' (index into the source's evidence) or
+    'note' (index into the notes, source_id None). Appends in time order
+    cost O(log n); the full sort happens only when the timeline is built.
+    """
+
+    def __init__(self, investigation_id: str, events: Optional[List[Tuple]] = None):
+        self.investigation_id = investigation_id
+        self.events: List[Tuple] = sorted(events or [], key=lambda e: e[0])
+        self.timestamps: List[str] = [e[0] for e in self.events]
+
+    @classmethod
+    def from_investigation(cls, investigation) -> 'Timeline':
+        """Build the timeline of every evidence entry and note."""
+        inv_id = investigation.investigation_id
+        events = []
+        for source_id, source in investigation.sources.items():
+            for i, ev in enumerate(source.evidence):
+                events.append((ev.get('timestamp', ''), inv_id, 'evidence', source_id, i))
+        for i, note in enumerate(investigation.notes):
+            events.append((note.get('timestamp', ''), inv_id, 'note', None, i))
+        return cls(inv_id, events)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def add(self, timestamp: str, kind: str, source_id: Optional[str], index: int):
+        """Insert one event, keeping the timeline sorted."""
+        event = (timestamp, self.investigation_id, kind, source_id, index)
+        if not self.timestamps or timestamp >= self.timestamps[-1]:
+            self.timestamps.append(timestamp)
+            self.events.append(event)
+        else:
+            position = bisect_right(self.timestamps, timestamp)
+            self.timestamps.insert(position, timestamp)
+            self.events.insert(position, event)
+
+    def _bounds(self, since: Optional[str], until: Optional[str]) -> Tuple[int, int]:
+        until = _upper_bound(until)
+        start = bisect_left(self.timestamps, since) if since is not None else 0
+        end = bisect_right(self.timestamps, until) if until is not None else len(self.timestamps)
+        return start, end
+
+    def iter_events(self, since: Optional[str] = None,
+                    until: Optional[str] = None) -> Iterator[Tuple]:
+        """Yield raw event tuples in [since, until], oldest first."""
+        start, end = self._bounds(since, until)
+        for i in range(start, end):
+            yield self.events[i]
+
+    def range(self, since: Optional[str] = None, until: Optional[str] = None,
+              source_id: Optional[str] = None, kind: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Yield events in [since, until] (inclusive), oldest first.
+
+        The range is located by bisection; only events inside it are read.
+        """
+        for event in self.iter_events(since, until):
+            if source_id is not None and event[3] != source_id:
+                continue
+            if kind is not None and event[2] != kind:
+                continue
+            yield event_dict(event)
+
+    def count(self, since: Optional[str] = None, until: Optional[str] = None) -> int:
+        """Number of events in [since, until], in O(log n)."""
+        start, end = self._bounds(since, until)
+        return end - start
+
+    def counts(self, window: str = 'day', since: Optional[str] = None,
+               until: Optional[str] = None) -> Dict[str, int]:
+        """Count events per window ('year', 'month', 'day', 'hour', 'minute')."""
+        return window_counts(self.iter_events(since, until), window)
+
+
+def event_dict(event: Tuple) -> Dict:
+    """Convert an event tuple to a dict."""
+    timestamp, inv_id, kind, source_id, index = event
+    result = {'timestamp': timestamp, 'investigation_id': inv_id, 'kind': kind}
+    if kind == 'evidence':
+        result['source_id'] = source_id
+        result['evidence_index'] = index
+    else:
+        result['note_index'] = index
+    return result
+
+
+def window_counts(events: Iterator[Tuple], window: str) -> Dict[str, int]:
+    """Count time-ordered event tuples per window bucket."""
+    if window not in WINDOWS:
+        raise ValueError(f"Unknown window: {window}. Known: {list(WINDOWS)}")
+    width = WINDOWS[window]
+    counts: Dict[str, int] = {}
+    for event in events:
+        bucket = event[0][:width]
+        counts[bucket] = counts.get(bucket, 0) + 1
+    return counts
+
+
+class TimelineIndex:
+    """
+    Cross-investigation timeline built from each investigation's Timeline.
+
+    Investigations keep their own timeline current as evidence and notes
+    are added, so indexing on save only stores a reference. Queries merge
+    the per-investigation ranges lazily with a heap.
+    """
+
+    def __init__(self):
+        self.timelines: Dict[str, Timeline] = {}
+
+    def index_investigation(self, investigation) -> int:
+        """Track an investigation's timeline; returns its event count."""
+        timeline = investigation.timeline()
+        self.timelines[investigation.investigation_id] = timeline
+        return len(timeline)
+
+    def remove_investigation(self, investigation_id: str):
+        """Stop tracking an investigation."""
+        self.timelines.pop(investigation_id, None)
+
+    def __len__(self) -> int:
+        return sum(len(t) for t in self.timelines.values())
+
+    def _merged(self, since: Optional[str], until: Optional[str]) -> Iterator[Tuple]:
+        return heapq.merge(*(t.iter_events(since, until) for t in self.timelines.values()),
+                           key=lambda e: e[0])
+
+    def range(self, since: Optional[str] = None, until: Optional[str] = None,
+              kind: Optional[str] = None) -> Iterator[Dict]:
+        """Yield events of all investigations in [since, until], oldest first."""
+        for event in self._merged(since, until):
+            if kind is not None and event[2] != kind:
+                continue
+            yield event_dict(event)
+
+    def count(self, since: Optional[str] = None, until: Optional[str] = None) -> int:
+        """Number of events across investigations in [since, until]."""
+        return sum(t.count(since, until) for t in self.timelines.values())
+
+    def counts(self, window: str = 'day', since: Optional[str] = None,
+               until: Optional[str] = None) -> Dict[str, int]:
+        """Count events across investigations per window, in time order."""
+        return window_counts(self._merged(since, until), window)